@@ -2,36 +2,46 @@
 Leaderboard Display for game.
 
 This module provides functionality to display a leaderboard in a Pygame application. 
-It reads scores from a file, sorts them, and displays the top entries.
+It reads the top scores from the score store and displays them one page at a time.
+The arrow keys, Page Up/Page Down and the mouse wheel scroll through the pages, and the
+row of the signed-in player is highlighted together with their rank.
 
 Author: Aryaman
 Date: 31/3/2024
 Version: 1.0
 """
 import pygame
-import subprocess
-import sys
+import sceneManager
+import gameStorage
+import scoreClient
+import assetManager
+import fontRegistry
+import textCache
+import headless
+import frameScheduler
+
+# number of players shown on one leaderboard page
+LEADERBOARD_SIZE = 5
 
 def main():
     # Initialize Pygame
     pygame.init()
 
     # Get the screen size
-    screen_info = pygame.display.Info()
-    width, height = screen_info.current_w, screen_info.current_h
+    width, height = headless.screen_size()
 
     # Create the screen
     screen = pygame.display.set_mode((width, height))
 
     # Load background image
-    bg = pygame.transform.scale(pygame.image.load("backgrounds/bg_offwhite.jpg"), (width, height))
+    bg = assetManager.load_image("backgrounds/bg_offwhite.jpg", (width, height))
 
     # Blit the background
     screen.blit(bg, (0, 0))
 
     # Create fonts
-    text_font = pygame.font.SysFont(None, 50)
-    bold_text_font = pygame.font.SysFont(None, 45, bold=True)
+    text_font = fontRegistry.get_font(None, 50)
+    bold_text_font = fontRegistry.get_font(None, 45, bold=True)
 
     def draw_text(text, font, color, x, y):
         """
@@ -43,44 +53,51 @@ def main():
             x, y (int): The x and y coordinates for the text's position.
         """
 
-        img = font.render(text, True, color)
+        img = textCache.render(font, text, True, color)
         screen.blit(img, (x, y))
 
-    def read_leaderboard(file_name):
+    def read_leaderboard(mode, start=0):
         """
-        Reads and parses the leaderboard file, sorts entries by score.
+        Reads one page of scores of a game mode from the score store.
         Args:
-            file_name (str): The file path of the leaderboard data.
+            mode (str): The game mode whose scores are shown.
+            start (int): The position of the first player on the page, 0 for the best score.
         Returns:
-            list[tuple]: A list of tuples (player name, score) sorted by score.
+            list[tuple]: A list of tuples (rank, player name, score) sorted by score.
+            Players with the same score share a rank, as in "Your rank".
         """
-        players = []
-        try:
-            with open(file_name, 'r') as f:
-                lines = [line.strip() for line in f if line.strip()]  # This removes any empty lines
-                # Group lines into pairs (name, score) and convert score to int
-                it = iter(lines)
-                players = [(name, int(score)) for name, score in zip(it, it)]
-        except FileNotFoundError:
-            print(f"The file was not found: {file_name}")
-            return [("None user", 0) for _ in range(5)]
-
-        # Sort the list of players by score in descending order
-        players.sort(key=lambda player: player[1], reverse=True)
-
-        # If there are more than 5 players, keep only the top 5
-        players = players[:5]
-
-        # If there are less than 5 players, fill the remaining positions with "None user" and 0
-        while len(players) < 5:
+        scores = scoreClient.get_scores()
+        players = scores.score_page(mode, start, LEADERBOARD_SIZE)
+
+        # If the first page has less players than places, fill the remaining positions with "None user" and 0
+        while start == 0 and len(players) < LEADERBOARD_SIZE:
             players.append(("None user", 0))
 
-        return players
+        rows = []
+        for i, (player, score) in enumerate(players):
+            if i > 0 and score == players[i - 1][1]:
+                rank = rows[-1][0]
+            elif i == 0 and start > 0:
+                # the first score of the page may be tied with the end of the page before
+                rank = scores.rank(player, mode) or start + 1
+            else:
+                rank = start + i + 1
+            rows.append((rank, player, score))
+        return rows
+
 
 
+    with open('cur_username.txt', 'r') as f:
+        username = f.read()
 
     # Load leaderboard data
-    leaderboard_data = read_leaderboard("scores.txt")
+    scores = scoreClient.get_scores()
+    page_start = 0
+    last_page_start = max(0, scores.score_count(gameStorage.LIGHTNING) - 1) // LEADERBOARD_SIZE * LEADERBOARD_SIZE
+    leaderboard_data = read_leaderboard(gameStorage.LIGHTNING)
+    user_rank = scores.rank(username, gameStorage.LIGHTNING)
+    # shrink the rows when more players are shown than fit on the screen
+    row_height = min(100, (height - 150) // LEADERBOARD_SIZE)
 
     button_width, button_height = 120, 50
     button_x, button_y = width - button_width - 30, 30  
@@ -109,6 +126,8 @@ def main():
         """
         return x < pos[0] < x + width and y < pos[1] < y + height
 
+    # sleeps until the next input while nothing on the screen is moving
+    scheduler = frameScheduler.FrameScheduler()
     # Main game loop
     running = True
     while running:
@@ -122,35 +141,47 @@ def main():
         draw_button(button_x, button_y, button_width, button_height, "Back")
 
         # display leaderboard entries
-        for i, (player, score) in enumerate(leaderboard_data):
+        for i, (rank, player, score) in enumerate(leaderboard_data):
+            # Highlight the signed-in player
+            if player == username:
+                pygame.draw.rect(screen, (255, 220, 120), (60, 95 + i * row_height, 700, text_font.get_height() + 10))
             # Display the position numbering text
-            draw_text(f"Position {i + 1}", text_font, (0, 0, 0), 70, 100 + i * 100)
+            draw_text(f"Position {rank}", text_font, (0, 0, 0), 70, 100 + i * row_height)
             # Display the player name
-            draw_text(player, text_font, (0, 0, 0), 300, 100 + i * 100)
+            draw_text(player, text_font, (0, 0, 0), 300, 100 + i * row_height)
             # Display the player score
-            draw_text(str(score), text_font, (0, 0, 0), 620, 100 + i * 100)
+            draw_text(str(score), text_font, (0, 0, 0), 620, 100 + i * row_height)
 
-        for event in pygame.event.get():
+        # display the rank of the signed-in player
+        if user_rank is not None:
+            draw_text(f"Your rank: {user_rank}", bold_text_font, (0, 0, 0), 70, height - 60)
+
+        new_start = page_start
+        for event in scheduler.events():
             if event.type == pygame.QUIT:
-                running = False
+                sceneManager.quit_game()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
-                    pygame.quit()
                     # go to main menu
-                    path = 'landingPage.py'
-                    subprocess.run([sys.executable, path])
-                    
-                    break
+                    sceneManager.pop()
+                elif event.key in (pygame.K_DOWN, pygame.K_PAGEDOWN):
+                    new_start = page_start + LEADERBOARD_SIZE
+                elif event.key in (pygame.K_UP, pygame.K_PAGEUP):
+                    new_start = page_start - LEADERBOARD_SIZE
+            elif event.type == pygame.MOUSEWHEEL:
+                new_start = page_start - event.y * LEADERBOARD_SIZE
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if button_clicked(event.pos, button_x, button_y, button_width, button_height):
-                    pygame.quit()
-                    path = 'landingPage.py'
-                    subprocess.run([sys.executable, path])
-                    running = False  
+                    sceneManager.pop()
+
+        # load the next page only when the page changes
+        new_start = min(max(new_start, 0), last_page_start)
+        if new_start != page_start:
+            page_start = new_start
+            leaderboard_data = read_leaderboard(gameStorage.LIGHTNING, page_start)
 
         pygame.display.flip()
+        scheduler.tick()
 
-    # Quit Pygame
-    pygame.quit()
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sceneManager.run("Leaderboard")
\ No newline at end of file
@@ -19,8 +19,12 @@ Date: 31/3/2024
 Version: 1.0
 """
 import pygame
-import sys
-import subprocess
+import sceneManager
+import assetManager
+import fontRegistry
+import textCache
+import headless
+import frameScheduler
 
 # Initialize the Pygame
 pygame.init()
@@ -30,13 +34,12 @@ pygame.mixer.init()
 pygame.font.init()
 
 # Get the screen size
-screen_info = pygame.display.Info()
-WIDTH, HEIGHT = screen_info.current_w, screen_info.current_h
+WIDTH, HEIGHT = headless.screen_size()
 
 WIN = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
 pygame.display.set_caption("Logic Quest")
 
-BG = pygame.transform.scale(pygame.image.load("backgrounds/bg_offwhite.jpg"), (WIDTH, HEIGHT))
+BG = assetManager.load_image("backgrounds/bg_offwhite.jpg", (WIDTH, HEIGHT))
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -80,7 +83,7 @@ class Button:
         self.bottom_color = BLACK
 
         # Text
-        self.text_surf = pygame.font.SysFont('Arial', 50).render(text, True, BLACK)
+        self.text_surf = textCache.render(fontRegistry.get_font('Arial', 50), text, True, BLACK)
         self.text_rect = self.text_surf.get_rect(center=self.top_rect.center)
 
     def draw(self, win):
@@ -131,9 +134,7 @@ def decrease_volume():
 
 def main_menu():
     """Navigates back to the main game menu."""
-    path = 'landingPage.py'
-    subprocess.run([sys.executable, path])
-    pygame.quit()
+    sceneManager.pop()
 
 '''
 def draw_controls_info(win, width, height):
@@ -144,7 +145,7 @@ def draw_controls_info(win, width, height):
         width, height (int): The width and height of the window.
     """
     # Set up the font and size for the controls text
-    controls_font = pygame.font.SysFont('Arial', 40)
+    controls_font = fontRegistry.get_font('Arial', 40)
     # Define the controls information text
     controls_text = [
         "Controls:",
@@ -157,7 +158,7 @@ def draw_controls_info(win, width, height):
     line_spacing = 40  # Spacing between lines
 
     for i, text in enumerate(controls_text):
-        text_surface = controls_font.render(text, True, BLACK)
+        text_surface = textCache.render(controls_font, text, True, BLACK)
         # Center align text, adjust x as needed for your layout
         text_rect = text_surface.get_rect(center=(width / 2, start_y + i * line_spacing))
         win.blit(text_surface, text_rect)
@@ -167,7 +168,6 @@ def main():
     global WIN
     run = True
     WIN.blit(BG, (0, 0))
-    clock = pygame.time.Clock()
 
     # Initialize buttons with descriptions
     buttons = [
@@ -176,11 +176,12 @@ def main():
         Button("BACK TO MAIN MENU", '#89CFF0', 460, 80, (WIDTH / 2 - 460 / 2, HEIGHT / 2 + 150), 6, main_menu)
     ]
 
+    # sleeps until the next input while nothing on the screen is moving
+    scheduler = frameScheduler.FrameScheduler()
     while run:
-        for event in pygame.event.get():
+        for event in scheduler.events():
             if event.type == pygame.QUIT:
-                run = False
-                break
+                sceneManager.quit_game()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     run = False
@@ -189,13 +190,13 @@ def main():
                 WIN = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
 
         # draw a title on screen
-        font = pygame.font.SysFont('Arial', 100)
-        text = font.render("SETTINGS", True, BLACK)
+        font = fontRegistry.get_font('Arial', 100)
+        text = textCache.render(font, "SETTINGS", True, BLACK)
         WIN.blit(BG, (0, 0))  # Redraw background for a clean slate
         WIN.blit(text, (WIDTH / 2 - text.get_width() / 2, 100))  # Redraw the title
 
         # Optionally, show current volume on screen
-        volume_text = pygame.font.SysFont('Arial', 50).render(f"Volume: {int(current_volume * 100)}%", True, BLACK)
+        volume_text = textCache.render(fontRegistry.get_font('Arial', 50), f"Volume: {int(current_volume * 100)}%", True, BLACK)
         WIN.blit(volume_text, (WIDTH / 2 - volume_text.get_width() / 0.5, HEIGHT / 3.25))
 
         # Draw each button
@@ -204,11 +205,8 @@ def main():
 
 
         pygame.display.update()
-        clock.tick(40)
-
-    pygame.quit()
-    sys.exit()
+        scheduler.tick()
 
 
 if __name__ == "__main__":
-    main()
+    sceneManager.run("Settings")
@@ -6,6 +6,7 @@ It features text input boxes for username and optional key, with logic to handle
 
 Classes:
     TextInputBox: Manages text input for username and key.
+    SuggestionList: Shows registered usernames that start with the typed text.
     Button: Represents a button in the interface.
 
 Functions:
@@ -16,24 +17,27 @@ Functions:
     main(): Main function to execute the login interface.
 """
 import pygame
-import sys
-import subprocess
+import sceneManager
+import gameStorage
+import assetManager
+import fontRegistry
+import textCache
+import headless
 
 pygame.init()
 
 # Get the screen size
-screen_info = pygame.display.Info()
-WIDTH, HEIGHT = screen_info.current_w, screen_info.current_h
+WIDTH, HEIGHT = headless.screen_size()
 
 WIN = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("logic game")
 
 clock = pygame.time.Clock()
 
-BG = pygame.transform.scale(pygame.image.load("backgrounds/bg_offwhite.jpg"), (WIDTH, HEIGHT))
-font = pygame.font.SysFont("Ariel", 60)
-largefont = pygame.font.SysFont("Ariel", 100)
-smallfont = pygame.font.SysFont("Ariel", 50)
+BG = assetManager.load_image("backgrounds/bg_offwhite.jpg", (WIDTH, HEIGHT))
+font = fontRegistry.get_font("Ariel", 60)
+largefont = fontRegistry.get_font("Ariel", 100)
+smallfont = fontRegistry.get_font("Ariel", 50)
 black = (10, 10, 10)
 grey = (112, 128, 144)
 blue = (0, 0, 255)
@@ -81,13 +85,80 @@ class TextInputBox:
                     self.text += event.unicode
 
     def draw(self, win):
-        txt_surface = self.font.render(self.text, True, self.text_color)
+        txt_surface = textCache.render(self.font, self.text, True, self.text_color)
         width = max(self.rect.w, txt_surface.get_width() + 10)
         self.rect.w = width
         win.blit(txt_surface, (self.rect.x + 5, self.rect.y + 5))
         pygame.draw.rect(win, self.color, self.rect, 2)
 
 
+class SuggestionList:
+    """
+    A dropdown under a text box listing the registered usernames that start with its text.
+    The names are only looked up and rendered again when the text changes.
+
+    Attributes:
+        box (TextInputBox): The text box the names are suggested for.
+        count (int): The most names shown.
+        prefix (str): The text the names were looked up for.
+        names (list[str]): The suggested names.
+        surfaces (list[pygame.Surface]): The rendered names.
+
+    Methods:
+        update(): Looks the names up again if the text of the box changed.
+        visible(): Checks if the dropdown is shown.
+        handle_event(event): Copies a clicked name into the text box and closes the dropdown.
+        draw(win): Draws the dropdown under the text box.
+    """
+    def __init__(self, box, count=3):
+        self.box = box
+        self.count = count
+        self.prefix = None
+        self.names = []
+        self.surfaces = []
+
+    def update(self):
+        if self.box.text == self.prefix:
+            return
+        self.prefix = self.box.text
+        self.names = gameStorage.get_storage().user_suggestions(self.prefix, self.count) if self.prefix else []
+        self.surfaces = [textCache.render(smallfont, name, True, black) for name in self.names]
+
+    def visible(self):
+        return self.box.active and bool(self.names) and self.names != [self.box.text]
+
+    def row_rect(self, i):
+        return pygame.Rect(self.box.rect.x, self.box.rect.bottom + i * 40, self.box.rect.w, 40)
+
+    def handle_event(self, event):
+        """
+        Copies a clicked name into the text box and closes the dropdown.
+
+        Args:
+            event (pygame.event.Event): The event to handle.
+
+        Returns:
+            bool: True if a name was clicked, the click should then not reach other widgets.
+        """
+        if event.type == pygame.MOUSEBUTTONDOWN and self.visible():
+            for i, name in enumerate(self.names):
+                if self.row_rect(i).collidepoint(event.pos):
+                    self.box.text = name
+                    self.box.active = False
+                    self.box.color = self.box.inactive_color
+                    return True
+        return False
+
+    def draw(self, win):
+        if not self.visible():
+            return
+        for i, surface in enumerate(self.surfaces):
+            rect = self.row_rect(i)
+            pygame.draw.rect(win, (235, 235, 235), rect)
+            pygame.draw.rect(win, grey, rect, 1)
+            win.blit(surface, (rect.x + 5, rect.y + 5))
+
+
 def create_button(msg, width, height, x, y, hc, dc, fc):
     """
     Creates a button with specified properties.
@@ -114,7 +185,7 @@ def create_button(msg, width, height, x, y, hc, dc, fc):
     else:
         pygame.draw.rect(WIN, dc, (x, y, button_width, button_height))
 
-    buttontext = smallfont.render(msg, True, fc)
+    buttontext = textCache.render(smallfont, msg, True, fc)
     text_rect = buttontext.get_rect(center=(x + button_width / 2, y + button_height / 2))
     WIN.blit(buttontext, text_rect)
 
@@ -123,26 +194,22 @@ def landing():
     """
     Transitions to the main menu interface for regular users.
     """
-    path = "landingPage.py"
-    subprocess.run([sys.executable, path])
-    pygame.quit()
+    sceneManager.replace("landingPage")
 
 def landing_1():
     """
     Transitions to the main menu interface for instructors or developers.
     """
-    path = "landingPage_1.py"
-    subprocess.run([sys.executable, path])
-    pygame.quit()
+    sceneManager.replace("landingPage_1")
 
 
 def login():
     """
     Manages the login procedure, including user input handling and screen transition.
     """
-    login_text = largefont.render("Login Page", True, black)
-    username_text = smallfont.render("Username: ", True, black)
-    key_text = smallfont.render("Key(Optional): ", True, black)
+    login_text = textCache.render(largefont, "Login Page", True, black)
+    username_text = textCache.render(smallfont, "Username: ", True, black)
+    key_text = textCache.render(smallfont, "Key(Optional): ", True, black)
 
     box_width = 250
     box_height = 50
@@ -150,6 +217,11 @@ def login():
     dark_blue = (0, 0, 128)
     username_box = TextInputBox((WIDTH - box_width) / 2, 320, box_width, box_height, font, black, dark_grey, dark_blue)
     key_box = TextInputBox((WIDTH - box_width) / 2, 420, box_width, box_height, font, black, dark_grey, dark_blue)
+    suggestions = SuggestionList(username_box)
+
+    # the keys are read once, when the login screen opens
+    with open('keys.txt', 'r') as f:
+        keys = {line.strip() for line in f if line.strip()}
 
     while True:
         WIN.blit(BG, (0, 0))
@@ -164,56 +236,43 @@ def login():
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                sceneManager.quit_game()
+            # the dropdown covers the key box, so it gets the clicks first
+            if suggestions.handle_event(event):
+                continue
             username_box.handle_event(event)
             key_box.handle_event(event)
-
-        with open('usernames.txt', 'r') as file:
-            with open('keys.txt', 'r') as file2:
-                content = file.read()
-                content2 = file2.read()
-                if username_box.text == '' and p_button:
-                    err1_msg = smallfont.render("Input Username", True, black)
-                    WIN.blit(err1_msg, ((WIDTH/2) - 20, (HEIGHT/2)))
-                if username_box.text in content and username_box.text != '':
-                    if p_button and key_box.text == '':
-                        print("Proceed to main menu")
-                        with open('cur_username.txt', 'w') as file3:
-                            file3.write(username_box.text)
-                        landing()
-
-                    elif p_button and key_box.text in content2:
-                        print("Proceed to main menu as instructor/developer")
-                        with open('cur_username.txt', 'w') as file3:
-                            file3.write(username_box.text)
-                        landing_1()
-                    elif p_button and key_box.text not in content2:
-                        err2_msg = smallfont.render("Invalid Key", True, black)
-                        WIN.blit(err2_msg, ((WIDTH/2)-20, HEIGHT/2))
-                elif p_button and username_box.text not in content and username_box.text != '':
-                    print("New account added proceed as user")
+        suggestions.update()
+        suggestions.draw(WIN)
+
+        # the players and keys are only checked when Proceed is pressed
+        if p_button:
+            storage = gameStorage.get_storage()
+            if username_box.text == '':
+                err1_msg = textCache.render(smallfont, "Input Username", True, black)
+                WIN.blit(err1_msg, ((WIDTH/2) - 20, (HEIGHT/2)))
+            elif storage.user_exists(username_box.text):
+                if key_box.text == '':
+                    print("Proceed to main menu")
                     with open('cur_username.txt', 'w') as file3:
                         file3.write(username_box.text)
-                    update = False
-                    with open('usernames.txt', 'r') as f:
-                        lines = f.read().split('\n')
-                        length = len(lines)
-                        new_lines = []
-                        for i in range(length):
-                            new_lines.append(lines[i])
-                        new_lines.append(username_box.text)
-                        update = True
-
-                    if update:
-                        with open('usernames.txt', 'w') as f:
-                            for i in range(len(new_lines)):
-                                if new_lines[i] != '':
-                                    f.write(str(new_lines[i]))
-                                    f.write('\n')
-                    print(new_lines)
                     landing()
 
+                elif key_box.text in keys:
+                    print("Proceed to main menu as instructor/developer")
+                    with open('cur_username.txt', 'w') as file3:
+                        file3.write(username_box.text)
+                    landing_1()
+                else:
+                    err2_msg = textCache.render(smallfont, "Invalid Key", True, black)
+                    WIN.blit(err2_msg, ((WIDTH/2)-20, HEIGHT/2))
+            else:
+                print("New account added proceed as user")
+                with open('cur_username.txt', 'w') as file3:
+                    file3.write(username_box.text)
+                storage.add_user(username_box.text)
+                landing()
+
 
         pygame.display.update()
         clock.tick(15)
@@ -241,4 +300,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sceneManager.run("Sign_In")
\ No newline at end of file
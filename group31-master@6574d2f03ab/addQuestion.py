@@ -17,6 +17,10 @@ Functions:
 """
 import pygame
 import os
+import questionBank
+import assetManager
+import fontRegistry
+import textCache
 
 pygame.init()
 
@@ -31,11 +35,10 @@ BLACK = (0, 0, 0)
 GRAY = (200, 200, 200)
 
 # Font
-FONT = pygame.font.SysFont(None, 32)
+FONT = fontRegistry.get_font(None, 32)
 
 # Load and scale the background image
-bg = pygame.image.load("backgrounds/bg_offwhite.jpg")
-bg_rescaled = pygame.transform.scale(bg, (width, height))
+bg_rescaled = assetManager.load_image("backgrounds/bg_offwhite.jpg", (width, height))
 
 # Blit the background
 screen.blit(bg_rescaled, (0, 0))
@@ -65,7 +68,7 @@ class Button:
 
     def draw(self, win):
         pygame.draw.rect(win, GRAY, (self.x, self.y, self.width, self.height))
-        text_surf = FONT.render(self.text, True, BLACK)
+        text_surf = textCache.render(FONT, self.text, True, BLACK)
         win.blit(text_surf, (self.x + (self.width - text_surf.get_width()) / 2, self.y + (self.height - text_surf.get_height()) / 2))
 
     def clicked(self, pos):
@@ -103,9 +106,11 @@ class TextBox:
     def draw(self, win):
         pygame.draw.rect(win, WHITE, self.rect)
         pygame.draw.rect(win, BLACK, self.rect, 2)
-        text_surf = FONT.render(self.text, True, BLACK)
+        text_surf = textCache.render(FONT, self.text, True, BLACK)
         win.blit(text_surf, (self.rect.x + 5, self.rect.y + (self.rect.height - text_surf.get_height()) / 2))
 
+RED = (255, 0, 0)
+
 # Initialize text boxes and labels
 labels = ["Question description", "Question solution", "Question Difficulty", "Option 1", "Option 2", "Option 3", "Option 4", "You must fill in all textboxes before you can click submit"]
 
@@ -115,7 +120,7 @@ def draw_labels():
     Draws labels for each text input box on the screen.
     """
     for i, label in enumerate(labels):
-        label_surf = FONT.render(label, True, BLACK)
+        label_surf = textCache.render(FONT, label, True, BLACK)
         screen.blit(label_surf, (50, 30 + i * 60))
 
 # Function to append data to a file with index management
@@ -127,28 +132,8 @@ def append_to_file(file_path, data):
         file_path (str): Path of the file to which data is appended.
         data (str): Data to be appended to the file.
     """
-    if not os.path.isfile(file_path):
-        with open(file_path, 'w') as f:
-            f.write("1." + data + "\n")
-    else:
-        with open(file_path, 'r') as f:
-            lines = f.readlines()
-
-        # Find the last non-empty line with a valid index
-        index = 0
-        for line in reversed(lines):
-            try:
-                index = int(line.split('.')[0])
-                break
-            except ValueError:
-                continue  # Skip lines that don't start with an integer
-
-        # If no valid index was found, start from 1; otherwise, increment the last index
-        index = index + 1 if index else 1
-        new_line = f"{index}.{data}\n"
-
-        with open(file_path, 'a') as f:
-            f.write(new_line)
+    directory, file_name = os.path.split(file_path)
+    questionBank.append_entries(directory or '.', file_name, [data])
 
 
 # Function to handle submit button click
@@ -158,39 +143,21 @@ def submit_action(text_boxes):
 
     Args:
         text_boxes (list[TextInputBox]): List of text input boxes.
+
+    Returns:
+        str: The error to show under the form, or None if the question was added or a
+        textbox is still empty.
     """
     # Check if all textboxes have input
     if all(box.text.strip() for box in text_boxes):
-        # Append to files
-        append_to_file("questions.txt", text_boxes[0].text)
-        append_to_file("answers.txt", text_boxes[1].text)
-        append_to_file("difficulty.txt", text_boxes[2].text)
-
-        # Format the options.txt file to maintain the correct text format
-        if not os.path.isfile("options.txt"):
-            with open("options.txt", 'w') as f:
-                f.write("1.\n")
-                for i in range(3, 7):
-                    f.write(text_boxes[i].text + "\n")
-                f.write("\n")
-        else:
-            with open("options.txt", 'r') as f:
-                lines = f.readlines()
-
-            index = 0
-            for line in reversed(lines):
-                try:
-                    index = int(line.split('.')[0])
-                    break
-                except ValueError:
-                    continue
-
-            index = index + 1 if index else 1
-            with open("options.txt", 'a') as f:
-                f.write(f"{index}.\n")
-                for i in range(3, 7):
-                    f.write(text_boxes[i].text + "\n")
-                f.write("\n")
+        # The difficulty is the number of points of the question
+        if questionBank.parse_difficulty(text_boxes[2].text.strip()) is None:
+            return "Question Difficulty must be a whole number"
+
+        # Append to files, one write per file
+        question = (text_boxes[0].text, text_boxes[1].text, text_boxes[2].text,
+                    [text_boxes[i].text for i in range(3, 7)])
+        questionBank.append_questions([question])
 
         # Clear the textboxes after submission
         for box in text_boxes:
@@ -211,6 +178,8 @@ def main():
     text_boxes = [TextBox(50, 50 + i * 60, 140, 30) for i in range(7)]
     return_button = Button('Return', 50, height - 60, 100, 50)
     submit_button = Button('Submit', width - 150, height - 60, 100, 50)
+    # the error of the last submit, shown under the labels
+    error = None
 
     while run:
         for event in pygame.event.get():
@@ -220,7 +189,7 @@ def main():
             if event.type == pygame.VIDEORESIZE:
                 width, height = event.w, event.h
                 screen = pygame.display.set_mode((width, height), pygame.RESIZABLE)
-                bg_rescaled = pygame.transform.scale(bg, (width, height))
+                bg_rescaled = assetManager.load_image("backgrounds/bg_offwhite.jpg", (width, height))
 
             for box in text_boxes:
                 box.handle_event(event)
@@ -228,7 +197,7 @@ def main():
             if event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_pos = pygame.mouse.get_pos()
                 if submit_button.clicked(mouse_pos):
-                    submit_action(text_boxes)
+                    error = submit_action(text_boxes)
                 elif return_button.clicked(mouse_pos):
                     run = False  # This will close the window when the return button is clicked
 
@@ -236,6 +205,9 @@ def main():
         screen.blit(bg_rescaled, (0, 0))
 
         draw_labels()
+        if error:
+            error_surf = textCache.render(FONT, error, True, RED)
+            screen.blit(error_surf, (50, 30 + len(labels) * 60))
 
         for box in text_boxes:
             box.draw(screen)
@@ -0,0 +1,213 @@
+"""
+Asset Manager for Logic Quest
+
+This module loads the images of the game once for the whole process. Every screen asks it
+for an image at the size it needs, for example the background at full screen size, and
+gets back a surface that is already scaled and converted to the pixel format of the
+display. Blitting such a surface is a plain copy, where an unconverted surface is
+converted again on every blit of every frame.
+
+Scaled images are kept in a small LRU cache keyed by (path, size), so going back to a
+screen or opening another screen of the same size reuses the surface.
+
+Scaled images are also written as raw pixels to the surface_cache folder next to this
+module, named after the full path of the image file, its modification time and size, the
+scaled size and the pixel format. On later launches they are read back from a
+memory-mapped file with pygame.image.frombuffer, which skips decoding and scaling the
+JPEG. Changing an image file changes its modification time, so its old cache files are
+no longer used and are deleted when the new ones are written.
+
+Classes:
+    AssetManager: Loads, scales, converts and caches images.
+
+Functions:
+    get_assets(): Returns the asset manager shared by the whole process.
+    load_image(path, size): Returns an image from the shared asset manager.
+"""
+import hashlib
+import mmap
+import os
+from collections import OrderedDict
+
+import pygame
+
+# how many scaled images are kept
+CACHE_SIZE = 8
+
+# folder of the raw pixel files, None to turn the disk cache off
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'surface_cache')
+
+
+class AssetManager:
+    """
+    Loads, scales, converts and caches images.
+
+    Attributes:
+        cache_size (int): How many scaled images are kept.
+        cache_dir (str): The folder of the raw pixel files, or None.
+        originals (dict[str, pygame.Surface]): The decoded images, by path.
+        scaled (OrderedDict[tuple, pygame.Surface]): The scaled and converted images by
+            (path, size), least recently used first.
+
+    Methods:
+        original(path): Returns the decoded image as loaded from disk.
+        image(path, size): Returns an image scaled and converted for the display.
+        cache_file(path, size, pixel_format): Returns the raw pixel file of a scaled image.
+        read_cached(path, size, pixel_format): Reads a scaled image from the disk cache.
+        write_cached(path, surface, pixel_format): Writes a scaled image to the disk cache.
+    """
+    def __init__(self, cache_size=CACHE_SIZE, cache_dir=CACHE_DIR):
+        self.cache_size = cache_size
+        self.cache_dir = cache_dir
+        self.originals = {}
+        self.scaled = OrderedDict()
+
+    def original(self, path):
+        if path not in self.originals:
+            self.originals[path] = pygame.image.load(path)
+        return self.originals[path]
+
+    def scale(self, surface, size):
+        return surface if size == surface.get_size() else pygame.transform.scale(surface, size)
+
+    def cache_file(self, path, size, pixel_format):
+        """
+        Returns the raw pixel file of a scaled image. Its name holds the name of the image
+        file and a hash of its full path, so images with the same name in different folders
+        do not share files, then the modification time and size of the image file.
+
+        Args:
+            path (str): The path of the image file.
+            size (tuple[int, int]): The size of the scaled image.
+            pixel_format (str): The pygame.image.tobytes() format of the pixels.
+
+        Returns:
+            str: The path of the file, which may not exist yet.
+
+        Raises:
+            OSError: If the image file cannot be read.
+        """
+        stat = os.stat(path)
+        name = os.path.splitext(os.path.basename(path))[0]
+        source = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]
+        version = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+        return os.path.join(self.cache_dir, f"{name}-{source}.{version}.{size[0]}x{size[1]}.{pixel_format}.raw")
+
+    def read_cached(self, path, size, pixel_format):
+        """
+        Reads a scaled image from the disk cache.
+
+        Args:
+            path (str): The path of the image file.
+            size (tuple[int, int]): The size of the scaled image.
+            pixel_format (str): The pygame.image.tobytes() format of the pixels.
+
+        Returns:
+            pygame.Surface: The image, or None if it is not in the cache.
+        """
+        try:
+            with open(self.cache_file(path, size, pixel_format), 'rb') as f:
+                if os.fstat(f.fileno()).st_size != size[0] * size[1] * 4:
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as pixels:
+                    # converting copies the pixels, so the map can be closed afterwards
+                    return pygame.image.frombuffer(pixels, size, pixel_format).convert()
+        except (OSError, ValueError):
+            return None
+
+    def write_cached(self, path, surface, pixel_format):
+        """
+        Writes a scaled image to the disk cache and deletes the cache files of older
+        versions of the image file.
+
+        Args:
+            path (str): The path of the image file.
+            surface (pygame.Surface): The scaled image.
+            pixel_format (str): The pygame.image.tobytes() format of the pixels.
+        """
+        try:
+            file_name = self.cache_file(path, surface.get_size(), pixel_format)
+            name, version = os.path.basename(file_name).rsplit('.', 4)[:2]
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for old in os.listdir(self.cache_dir):
+                parts = old.rsplit('.', 4)
+                if len(parts) == 5 and parts[0] == name and parts[1] != version:
+                    os.remove(os.path.join(self.cache_dir, old))
+            # write to a temporary file first so no other game window reads half a file
+            with open(file_name + '.tmp', 'wb') as f:
+                f.write(pygame.image.tobytes(surface, pixel_format))
+            os.replace(file_name + '.tmp', file_name)
+        except OSError:
+            pass
+
+    def image(self, path, size=None):
+        """
+        Returns an image scaled and converted to the pixel format of the display.
+
+        Args:
+            path (str): The path of the image file.
+            size (tuple[int, int]): The width and height to scale to, the size of the file if None.
+
+        Returns:
+            pygame.Surface: The image. It is shared, so it must not be drawn on.
+        """
+        size = tuple(size) if size is not None else self.original(path).get_size()
+        key = (path, size)
+        if key in self.scaled:
+            self.scaled.move_to_end(key)
+            return self.scaled[key]
+
+        display = pygame.display.get_surface()
+        # converting needs a display, without one the image is returned but not kept
+        if display is None:
+            return self.scale(self.original(path), size)
+
+        # the disk cache holds 32-bit pixels in the byte order of the usual displays
+        pixel_format = None
+        if self.cache_dir is not None and display.get_masks()[:3] == (0xff0000, 0xff00, 0xff):
+            pixel_format = 'BGRA'
+        surface = self.read_cached(path, size, pixel_format) if pixel_format else None
+        if surface is None:
+            original = self.original(path)
+            surface = self.scale(original, size)
+            if surface.get_flags() & pygame.SRCALPHA:
+                surface = surface.convert_alpha()
+            else:
+                surface = surface.convert()
+                # images with transparency are not written, frombuffer would lose it
+                if pixel_format:
+                    self.write_cached(path, surface, pixel_format)
+        self.scaled[key] = surface
+        if len(self.scaled) > self.cache_size:
+            self.scaled.popitem(last=False)
+        return surface
+
+
+_assets = None
+
+
+def get_assets():
+    """
+    Returns the asset manager shared by the whole process.
+
+    Returns:
+        AssetManager: The shared asset manager.
+    """
+    global _assets
+    if _assets is None:
+        _assets = AssetManager()
+    return _assets
+
+
+def load_image(path, size=None):
+    """
+    Returns an image from the shared asset manager, scaled and converted for the display.
+
+    Args:
+        path (str): The path of the image file.
+        size (tuple[int, int]): The width and height to scale to, the size of the file if None.
+
+    Returns:
+        pygame.Surface: The image. It is shared, so it must not be drawn on.
+    """
+    return get_assets().image(path, size)
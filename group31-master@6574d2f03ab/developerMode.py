@@ -21,24 +21,33 @@ Version: 1.0
 import pygame
 import sys
 import time
-import subprocess
+import sceneManager
+import questionBank
+import gameStorage
+import scoreClient
+import assetManager
+import fontRegistry
+import textCache
+import headless
+import dirtyRenderer
+import glyphAtlas
+import frameProfiler
 
 def main():
     pygame.init()
 
     # Get the screen size
-    screen_info = pygame.display.Info()
-    WIDTH, HEIGHT = screen_info.current_w, screen_info.current_h
+    WIDTH, HEIGHT = headless.screen_size()
 
     WIN = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
     pygame.display.set_caption("developer Mode")
 
     clock = pygame.time.Clock()
 
-    BG = pygame.transform.scale(pygame.image.load("backgrounds/bg_offwhite.jpg"), (WIDTH, HEIGHT))
-    font = pygame.font.SysFont("arial", 45)
-    mediumfont = pygame.font.SysFont("arial", 30)
-    smallfont = pygame.font.SysFont("arial", 20)
+    BG = assetManager.load_image("backgrounds/bg_offwhite.jpg", (WIDTH, HEIGHT))
+    font = fontRegistry.get_font("arial", 45)
+    mediumfont = fontRegistry.get_font("arial", 30)
+    smallfont = fontRegistry.get_font("arial", 20)
     black = (10, 10, 10)
     grey = (112, 128, 144)
     red = (255, 0, 0)
@@ -64,47 +73,23 @@ def main():
     with open('cur_username.txt', 'r') as f:
         username = f.read()
 
-    with open('questions.txt', 'r') as f:
-        questions = []
-        for line in f:
-            if '.' in line:
-                # Split line at the first dot and take the second part
-                line_text = line.split('.', 1)[1].strip()
-                questions.append(line_text)
-
-    with open('options.txt', 'r') as f:
-        raw_options = f.read().split('\n\n')
-        options = [option.strip().split('\n') for option in raw_options]
-
-    with open('answers.txt', 'r') as f:
-        answers = []
-        for line in f:
-            if '.' in line:
-                # Split line at the first dot and take the second part
-                line_text = line.split('.', 1)[1].strip()
-                answers.append(line_text)
-
-    with open('difficulty.txt', 'r') as f:
-        difficulties = []
-        for line in f:
-            dif = line.strip().split('.')[1]
-            difficulties.append(int(dif))
+    bank = questionBank.get_bank()
 
 
     def get_question_text():
-        return mediumfont.render(questions[current_question_index], True, black)
+        return textCache.render(mediumfont, bank.question(current_question_index), True, black)
 
 
     def get_question_number_text():
-        return font.render(f"Question Number: {current_question_index + 1}", True, black)
+        return textCache.render(font, f"Question Number: {current_question_index + 1}", True, black)
 
 
     def get_current_options():
-        return options[current_question_index]
+        return bank.options(current_question_index)
 
 
     def get_current_answer():
-        return options[current_question_index]
+        return bank.answer(current_question_index)
 
 
     def print_to_console(text):
@@ -113,14 +98,6 @@ def main():
         if len(console_output) * font.get_height() > HEIGHT:
             del console_output[0]
 
-    def modemenu():
-        path = 'modemenu.py'
-        subprocess.run([sys.executable, path])
-        pygame.quit()
-
-    sys.stdout.write = print_to_console
-    sys.stderr.write = print_to_console
-
 
     class Button:
         """
@@ -159,13 +136,13 @@ def main():
 
         def draw(self, win, outline=None):
             if outline:
-                pygame.draw.rect(win, outline, (self.x - 2, self.y - 2, self.width + 4, self.height + 4), 0)
+                win.fill(outline, (self.x - 2, self.y - 2, self.width + 4, self.height + 4))
 
-            pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.height), 0)
+            win.fill(self.color, (self.x, self.y, self.width, self.height))
 
             if self.text != '':
-                font = pygame.font.SysFont('arial', 20)
-                text = font.render(self.text, 1, (0, 0, 0))
+                font = fontRegistry.get_font('arial', 20)
+                text = textCache.render(font, self.text, 1, (0, 0, 0))
                 win.blit(text, (
                 self.x + (self.width / 2 - text.get_width() / 2), self.y + (self.height / 2 - text.get_height() / 2)))
 
@@ -225,9 +202,9 @@ def main():
 
         def draw(self, win):
 
-            pygame.draw.rect(win, grey, self.rect)
+            win.fill(grey, self.rect)
 
-            text_surface = self.font.render(self.text, True, black)
+            text_surface = textCache.render(self.font, self.text, True, black)
 
             win.blit(text_surface, (self.rect.x + 5, self.rect.y + 5))
 
@@ -263,12 +240,9 @@ def main():
 
 
     def create_draggable_items():
-        answer = answers[current_question_index]
+        answer = bank.answer(current_question_index)
         current_options = get_current_options()
 
-        if current_options[0].strip().endswith('.'):
-            current_options = current_options[1:]
-
         item_width = 100  # Adjust the width as needed to fit the text
         total_width = (len(current_options) - 1) * ANSWER_ITEM_SPACING + len(current_options) * item_width
         start_x = (WIDTH - total_width) // 2  # Center the options
@@ -296,113 +270,119 @@ def main():
     ]
 
     def modemenu():
-        path = 'modemenu_1.py'
-        subprocess.run([sys.executable, path])
-        pygame.quit()
-
-    run = True
-    timer = 500
-    while run:
-
-        answer = answers[current_question_index]
-
-
-        time_msg = font.render("Times UP", True, red)
-
-        score_str = str(player_score)
-        timer_str = str(timer / 50)
-        num_ans_str = str(num_correct)
-        score_text = smallfont.render(score_str, True, black)
-        timer_text = smallfont.render(timer_str, True, black)
-        round_score = smallfont.render("Round Score:", True, black)
-        tot_round_score = smallfont.render("Total Round Score:", True, black)
-        tot_correct_ans = smallfont.render("Total Questions Answered:", True, black)
-        num_ans = smallfont.render(num_ans_str, True, black)
-        time_rmn = smallfont.render("Time Remaining:", True, black)
-        font = pygame.font.SysFont('Arial', 35)
-        text = font.render("ESC to quit", True, black)
-        WIN.blit(BG, (0, 0))
-        text_width = text.get_width()
-        WIN.blit(text, (WIDTH - text_width - 10, 10))
-        WIN.blit(question_number_text, (LEFT_MARGIN, TOP_MARGIN))
-        WIN.blit(question_description_text, ((WIDTH - BLANK_WIDTH) // 2, (HEIGHT - BLANK_HEIGHT) // 2 - 50))
-        WIN.blit(time_rmn, (750, 50))
-        WIN.blit(timer_text, (950, 50))
-        WIN.blit(round_score, (750, 100))
-        WIN.blit(score_text, (950, 100))
-        # next_question_button.draw(WIN, black)
-
-        y = 200
-        for line in console_output:
-            text_surface = smallfont.render(line, True, (0, 0, 0))
-            WIN.blit(text_surface, (10, y))
-            y += font.get_height()
-
-        if timer == 0:
-            WIN.blit(time_msg, ((WIDTH - 200) / 2, ((HEIGHT - 100) / 2) - 200))
-            WIN.blit(time_msg, ((WIDTH - 200) / 2, ((HEIGHT - 100) / 2) - 200))
-            WIN.blit(tot_round_score, (((WIDTH - 200) / 2) - 25, ((HEIGHT - 150) / 2) - 100))
-            WIN.blit(score_text, (((WIDTH - 200) / 2) + 150, (((HEIGHT - 150) / 2) - 100)))
-            WIN.blit(tot_correct_ans, (((WIDTH - 250) / 2) - 65, ((HEIGHT - 150) / 2) - 50))
-            WIN.blit(num_ans, (((WIDTH - 200) / 2) + 150, (((HEIGHT - 150) / 2) - 50)))
-            update = False
-            with open('scores.txt', 'r') as f:
-                lines = f.read().split('\n')
-                length = len(lines)
-                for i in range(length):
-                    if lines[i] == username:
-                        print(int(lines[i + 1]))
-                        if int(lines[i + 1]) < player_score:
-                            lines[i + 1] = player_score
-                            update = True
-
-            if update:
-                with open('scores.txt', 'w') as f:
-                    for i in range(length):
-                        f.write(str(lines[i]))
-                        f.write("\n")
-            run = False
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+        sceneManager.pop()
+
+    # the timer and scores change every frame, so they are drawn from prerendered digits
+    digits = glyphAtlas.GlyphAtlas(smallfont, black)
+
+    # only what changed since the previous frame is drawn again and sent to the display
+    screen = dirtyRenderer.DirtyRenderer(WIN, BG)
+    # F3 shows where the time of each frame goes
+    profiler = frameProfiler.FrameProfiler()
+    # keep the real writers so they are put back however developer mode is left
+    stdout_write = sys.stdout.write
+    stderr_write = sys.stderr.write
+    sys.stdout.write = print_to_console
+    sys.stderr.write = print_to_console
+    try:
+        run = True
+        timer = 500
+        while run:
+            profiler.begin_frame()
+
+            answer = bank.answer(current_question_index)
+
+
+            time_msg = textCache.render(font, "Times UP", True, red)
+
+            score_str = str(player_score)
+            timer_str = str(timer / 50)
+            num_ans_str = str(num_correct)
+            round_score = textCache.render(smallfont, "Round Score:", True, black)
+            tot_round_score = textCache.render(smallfont, "Total Round Score:", True, black)
+            tot_correct_ans = textCache.render(smallfont, "Total Questions Answered:", True, black)
+            time_rmn = textCache.render(smallfont, "Time Remaining:", True, black)
+            font = fontRegistry.get_font('Arial', 35)
+            text = textCache.render(font, "ESC to quit", True, black)
+            text_width = text.get_width()
+            screen.blit(text, (WIDTH - text_width - 10, 10))
+            screen.blit(question_number_text, (LEFT_MARGIN, TOP_MARGIN))
+            screen.blit(question_description_text, ((WIDTH - BLANK_WIDTH) // 2, (HEIGHT - BLANK_HEIGHT) // 2 - 50))
+            screen.blit(time_rmn, (750, 50))
+            digits.draw(screen, timer_str, (950, 50))
+            screen.blit(round_score, (750, 100))
+            digits.draw(screen, score_str, (950, 100))
+            # next_question_button.draw(screen, black)
+
+            y = 200
+            for line in console_output:
+                text_surface = textCache.render(smallfont, line, True, (0, 0, 0))
+                screen.blit(text_surface, (10, y))
+                y += font.get_height()
+            profiler.mark('draw')
+
+            if timer == 0:
+                screen.blit(time_msg, ((WIDTH - 200) / 2, ((HEIGHT - 100) / 2) - 200))
+                screen.blit(time_msg, ((WIDTH - 200) / 2, ((HEIGHT - 100) / 2) - 200))
+                screen.blit(tot_round_score, (((WIDTH - 200) / 2) - 25, ((HEIGHT - 150) / 2) - 100))
+                digits.draw(screen, score_str, (((WIDTH - 200) / 2) + 150, (((HEIGHT - 150) / 2) - 100)))
+                screen.blit(tot_correct_ans, (((WIDTH - 250) / 2) - 65, ((HEIGHT - 150) / 2) - 50))
+                digits.draw(screen, num_ans_str, (((WIDTH - 200) / 2) + 150, (((HEIGHT - 150) / 2) - 50)))
+                scoreClient.get_scores().submit_best(username, gameStorage.LIGHTNING, player_score)
                 run = False
-
-            for item in items:
-                item.handle_event(event)
-                if event.type == pygame.MOUSEBUTTONUP:
-                    if item.check_collision_with_ans() and item.is_ans():
-                        num_correct = num_correct + 1
-                        current_question_index = (current_question_index + 1) % len(questions)
+            profiler.mark('logic')
+
+            for event in pygame.event.get():
+                screen.handle_event(event)
+                if event.type == pygame.QUIT:
+                    sceneManager.quit_game()
+
+                for item in items:
+                    item.handle_event(event)
+                    if event.type == pygame.MOUSEBUTTONUP:
+                        if item.check_collision_with_ans() and item.is_ans():
+                            num_correct = num_correct + 1
+                            current_question_index = (current_question_index + 1) % len(bank)
+                            question_description_text = get_question_text()
+                            question_number_text = get_question_number_text()
+                            items = create_draggable_items()
+                            player_score = player_score + bank.difficulty(current_question_index)
+                            timer = 500
+
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    if next_question_button.is_over(pygame.mouse.get_pos()):
+                        current_question_index = (current_question_index + 1) % len(bank)
                         question_description_text = get_question_text()
                         question_number_text = get_question_number_text()
                         items = create_draggable_items()
-                        player_score = player_score + difficulties[current_question_index]
                         timer = 500
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        modemenu()
+                        break
+                    elif event.key == pygame.K_F3:
+                        profiler.toggle()
+            profiler.mark('events')
+            timer = timer - 1
+            profiler.mark('logic')
 
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if next_question_button.is_over(pygame.mouse.get_pos()):
-                    current_question_index = (current_question_index + 1) % len(questions)
-                    question_description_text = get_question_text()
-                    question_number_text = get_question_number_text()
-                    items = create_draggable_items()
-                    timer = 500
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    modemenu()
-                    break
-        timer = timer - 1
-
-        for item in items:
-            item.draw(WIN)
-
-        for blank in blanks:
-            pygame.draw.rect(WIN, (0, 0, 0), (SOL_BOX_X, SOL_BOX_Y, 100, 50), 2)  # Draw a rectangle with an outline
-
-        pygame.display.update()
-        clock.tick(60)
-    time.sleep(3)
-    modemenu()
-    sys.exit()
+            for item in items:
+                item.draw(screen)
+
+            for blank in blanks:
+                screen.rect((0, 0, 0), (SOL_BOX_X, SOL_BOX_Y, 100, 50), 2)  # Draw a rectangle with an outline
+
+            profiler.draw(screen, (WIDTH - frameProfiler.PANEL_SIZE[0] - 10, 60))
+            profiler.mark('draw')
+            screen.update()
+            profiler.mark('update')
+            profiler.end_frame()
+            clock.tick(60)
+        time.sleep(3)
+        modemenu()
+    finally:
+        sys.stdout.write = stdout_write
+        sys.stderr.write = stderr_write
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sceneManager.run("developerMode")
\ No newline at end of file
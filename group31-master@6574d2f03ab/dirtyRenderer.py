@@ -0,0 +1,160 @@
+"""
+Dirty Rectangle Renderer for Logic Quest
+
+The game screens used to blit the full screen background, draw every widget and send the
+whole window to the display 60 times a second, even when only the timer changed or one
+answer was being dragged. At 4K that is tens of megabytes of pixels per frame.
+
+A DirtyRenderer is drawn on like the window: the screens call blit(), fill() and rect()
+on it every frame as before, but nothing is drawn yet. update() compares the frame with
+the previous one. Only where something was added, removed, moved or changed is the
+background restored and the frame drawn again, and only those rectangles are passed to
+pygame.display.update(). A frame where nothing changed costs no pixel work at all.
+
+Classes:
+    DirtyRenderer: Draws a frame by redrawing only what changed since the previous frame.
+"""
+import pygame
+
+# when the changed area is more than this fraction of the window, the whole window is redrawn
+FULL_REDRAW_FRACTION = 0.5
+
+# events after which the window has to be drawn again completely
+REDRAW_EVENTS = (pygame.VIDEORESIZE, pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)
+
+
+def merge_rects(rects):
+    """
+    Merges the overlapping rectangles of a list, so no area is redrawn twice.
+
+    Args:
+        rects (list[pygame.Rect]): The rectangles.
+
+    Returns:
+        list[pygame.Rect]: Rectangles covering the same area, none of which overlap.
+    """
+    merged = []
+    for rect in rects:
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect = rect.union(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class DirtyRenderer:
+    """
+    Draws a frame by redrawing only what changed since the previous frame.
+
+    Every drawing call is recorded as a command with the area it covers. Two frames are
+    compared command by command, in order, and the areas of the commands that differ
+    are redrawn: first the background, then every command of the new frame that
+    touches the area, clipped to it. Surfaces are compared by identity, so a surface
+    must not be drawn on once it has been given to blit(), which is already true of
+    the surfaces of textCache and glyphAtlas.
+
+    Attributes:
+        window (pygame.Surface): The display surface.
+        background (pygame.Surface): What is shown where nothing is drawn.
+        commands (list[tuple]): The commands of the frame being recorded.
+        previous (list[tuple]): The commands of the frame on the screen.
+        full (bool): Whether the next update() redraws the whole window.
+
+    Methods:
+        blit(source, dest, area, special_flags): Records drawing a surface.
+        fill(color, rect, special_flags): Records filling a rectangle.
+        rect(color, rect, width): Records drawing a rectangle or its outline.
+        invalidate(): Makes the next update() redraw the whole window.
+        handle_event(event): Redraws the whole window after it was resized or uncovered.
+        update(): Draws the recorded frame and sends the changed areas to the display.
+    """
+    def __init__(self, window, background):
+        self.window = window
+        self.background = background
+        self.commands = []
+        self.previous = []
+        self.full = True
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        size = pygame.Rect(area).size if area else source.get_size()
+        rect = pygame.Rect((dest[0], dest[1]), size)
+        self.commands.append((('blit', source, rect.topleft, area and tuple(area), special_flags), rect))
+        return rect
+
+    def fill(self, color, rect=None, special_flags=0):
+        rect = pygame.Rect(rect) if rect else self.window.get_rect()
+        self.commands.append((('fill', tuple(color), tuple(rect), special_flags), rect))
+        return rect
+
+    def rect(self, color, rect, width=0):
+        rect = pygame.Rect(rect)
+        self.commands.append((('rect', tuple(color), tuple(rect), width), rect))
+        return rect
+
+    def invalidate(self):
+        self.full = True
+
+    def handle_event(self, event):
+        if event.type in REDRAW_EVENTS:
+            self.full = True
+
+    def draw(self, command):
+        kind = command[0]
+        if kind == 'blit':
+            self.window.blit(*command[1:])
+        elif kind == 'fill':
+            self.window.fill(*command[1:])
+        else:
+            pygame.draw.rect(self.window, *command[1:])
+
+    def dirty_rects(self):
+        """
+        Returns the areas where the recorded frame differs from the one on the screen.
+
+        Returns:
+            list[pygame.Rect]: The changed areas, merged so they do not overlap.
+        """
+        dirty = []
+        for i in range(max(len(self.commands), len(self.previous))):
+            old = self.previous[i] if i < len(self.previous) else None
+            new = self.commands[i] if i < len(self.commands) else None
+            if old is not None and new is not None and old[0] == new[0]:
+                continue
+            if old is not None:
+                dirty.append(old[1])
+            if new is not None:
+                dirty.append(new[1])
+        return merge_rects(dirty)
+
+    def update(self):
+        """
+        Draws the recorded frame, sends the changed areas to the display and starts
+        recording the next frame.
+
+        Returns:
+            list[pygame.Rect]: The areas that were redrawn.
+        """
+        screen = self.window.get_rect()
+        rects = [] if self.full else [rect.clip(screen) for rect in self.dirty_rects()]
+        rects = [rect for rect in rects if rect.w and rect.h]
+        if self.full or sum(rect.w * rect.h for rect in rects) > FULL_REDRAW_FRACTION * screen.w * screen.h:
+            self.window.blit(self.background, (0, 0))
+            for command, _ in self.commands:
+                self.draw(command)
+            pygame.display.update()
+            rects = [screen]
+        else:
+            for rect in rects:
+                self.window.set_clip(rect)
+                self.window.blit(self.background, rect, rect)
+                for command, area in self.commands:
+                    if area.colliderect(rect):
+                        self.draw(command)
+            self.window.set_clip(None)
+            if rects:
+                pygame.display.update(rects)
+        self.previous = self.commands
+        self.commands = []
+        self.full = False
+        return rects
@@ -0,0 +1,49 @@
+"""
+Font Registry for Logic Quest
+
+This module keeps one pygame font for every (name, size, bold, italic) the game uses.
+pygame.font.SysFont searches the installed fonts each time it is called, and several
+screens called it inside their frame loops. Every module asks this registry instead, so
+a font is only built the first time it is asked for.
+
+The fonts are dropped when pygame is shut down, because using a font created before
+pygame.quit() crashes the interpreter.
+
+Functions:
+    get_font(name, size, bold, italic): Returns the shared font.
+    clear(): Forgets every font.
+"""
+import pygame
+
+# fonts by (name, size, bold, italic)
+_fonts = {}
+
+
+def clear():
+    """
+    Forgets every font. Called by pygame.quit().
+    """
+    _fonts.clear()
+
+
+def get_font(name, size, bold=False, italic=False):
+    """
+    Returns the shared font, building it with pygame.font.SysFont the first time.
+
+    Args:
+        name (str): The font family, for example 'Arial', or None for the pygame default font.
+        size (int): The font size.
+        bold (bool): Whether the font is bold.
+        italic (bool): Whether the font is italic.
+
+    Returns:
+        pygame.font.Font: The font. It is shared, so its style must not be changed.
+    """
+    key = (name.lower() if name else None, size, bold, italic)
+    font = _fonts.get(key)
+    if font is None:
+        if not _fonts:
+            # pygame forgets the registered function once it has called it
+            pygame.register_quit(clear)
+        font = _fonts[key] = pygame.font.SysFont(name, size, bold, italic)
+    return font
@@ -0,0 +1,186 @@
+"""
+Frame Profiler for Logic Quest
+
+This module measures where the time of each frame goes in a game screen. A screen marks
+the end of every phase of its main loop (handling events, game logic, drawing and sending
+the frame to the display) and a FrameProfiler keeps the last few seconds of those times.
+Marking a phase is one time.perf_counter() call and a few additions, so the profiler can
+stay in the loop all the time.
+
+The profiler also draws them as an overlay: the mean time of every phase, the p50, p95
+and p99 frame times, how many frames missed the 60 frames a second budget and a histogram
+of the frame times. The overlay is hidden until it is toggled, and while it is hidden
+nothing is drawn or rendered. While it is shown the text is only rendered a few times a
+second.
+
+Classes:
+    FrameProfiler: Times the phases of each frame and draws them as an overlay.
+"""
+import collections
+import time
+
+import pygame
+
+import fontRegistry
+import timingStats
+
+# the phases of a frame, in the order they are shown
+PHASES = ('events', 'logic', 'draw', 'update')
+
+# how many frames the statistics cover
+HISTORY = 240
+
+# the time one frame may take at 60 frames a second, in seconds
+BUDGET = 1 / 60
+
+# the overlay is rendered again every this many frames
+REFRESH_FRAMES = 10
+
+# the width of a histogram bar, in seconds of frame time
+BIN_WIDTH = 0.001
+
+PANEL_SIZE = (380, 210)
+PANEL_COLOR = (255, 255, 255, 220)
+TEXT_COLOR = (10, 10, 10)
+BAR_COLOR = (70, 130, 180)
+DROPPED_COLOR = (255, 0, 0)
+
+
+class FrameProfiler:
+    """
+    Times the phases of each frame and draws them as an overlay.
+
+    A frame is timed by calling begin_frame() at the top of the loop, mark(phase) after
+    each part of it and end_frame() at the bottom, before the wait for the next frame.
+    A phase can be marked more than once a frame and its times are added up.
+
+    Attributes:
+        history (int): How many frames the statistics cover.
+        budget (float): The time one frame may take, in seconds.
+        timer (callable): Returns the current time in seconds.
+        visible (bool): Whether the overlay is shown.
+        frames (collections.deque[float]): The time of each recent frame, in seconds.
+        phases (dict[str, collections.deque[float]]): The time of each phase of each recent frame.
+        count (int): How many frames were timed since the profiler was made.
+        dropped (int): How many of them took longer than the budget.
+        panel (pygame.Surface): The rendered overlay.
+
+    Methods:
+        begin_frame(): Starts timing a frame.
+        mark(phase): Ends a phase of the frame.
+        end_frame(): Ends timing a frame.
+        toggle(): Shows or hides the overlay.
+        stats(): Returns the statistics of the recent frames.
+        histogram(bins): Counts the recent frames by frame time.
+        draw(target, pos): Draws the overlay if it is shown.
+    """
+    def __init__(self, history=HISTORY, budget=BUDGET, timer=time.perf_counter):
+        self.history = history
+        self.budget = budget
+        self.timer = timer
+        self.visible = False
+        self.frames = collections.deque(maxlen=history)
+        self.phases = {phase: collections.deque(maxlen=history) for phase in PHASES}
+        self.count = 0
+        self.dropped = 0
+        self.panel = None
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.start = self.last = 0.0
+        self.rendered_at = 0
+
+    def begin_frame(self):
+        self.start = self.last = self.timer()
+
+    def mark(self, phase):
+        now = self.timer()
+        self.current[phase] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        frame = self.timer() - self.start
+        self.frames.append(frame)
+        self.count += 1
+        if frame > self.budget:
+            self.dropped += 1
+        for phase in PHASES:
+            self.phases[phase].append(self.current[phase])
+            self.current[phase] = 0.0
+
+    def toggle(self):
+        self.visible = not self.visible
+        self.panel = None
+
+    def stats(self):
+        """
+        Returns the statistics of the recent frames, in seconds.
+
+        Returns:
+            dict: The mean of every phase by name, the 'p50', 'p95' and 'p99' frame times
+            and the number of recent frames that took longer than the budget as 'dropped'.
+        """
+        frames = sorted(self.frames)
+        stats = {phase: sum(times) / len(times) if times else 0.0 for phase, times in self.phases.items()}
+        stats['p50'] = timingStats.percentile(frames, 0.5)
+        stats['p95'] = timingStats.percentile(frames, 0.95)
+        stats['p99'] = timingStats.percentile(frames, 0.99)
+        stats['dropped'] = sum(1 for frame in frames if frame > self.budget)
+        return stats
+
+    def histogram(self, bins):
+        """
+        Counts the recent frames by frame time, in bins of BIN_WIDTH. Frames longer than
+        the last bin are counted in it.
+
+        Args:
+            bins (int): The number of bins.
+
+        Returns:
+            list[int]: The number of frames in each bin.
+        """
+        counts = [0] * bins
+        for frame in self.frames:
+            counts[min(int(frame / BIN_WIDTH), bins - 1)] += 1
+        return counts
+
+    def render(self, font):
+        stats = self.stats()
+        lines = [
+            "  ".join(f"{phase} {stats[phase] * 1000:.2f}" for phase in PHASES) + " ms",
+            f"p50 {stats['p50'] * 1000:.2f}  p95 {stats['p95'] * 1000:.2f}  p99 {stats['p99'] * 1000:.2f} ms",
+            f"dropped {stats['dropped']} of {len(self.frames)}, {self.dropped} in total (F3 to hide)",
+        ]
+        panel = pygame.Surface(PANEL_SIZE, pygame.SRCALPHA)
+        panel.fill(PANEL_COLOR)
+        y = 5
+        for line in lines:
+            panel.blit(font.render(line, True, TEXT_COLOR), (5, y))
+            y += font.get_linesize()
+
+        # one bar per millisecond up to twice the budget, the bars past the budget in red
+        bins = int(2 * self.budget / BIN_WIDTH) + 1
+        counts = self.histogram(bins)
+        bar_width = (PANEL_SIZE[0] - 10) // bins
+        bottom = PANEL_SIZE[1] - 5
+        tallest = max(max(counts), 1)
+        for i, count in enumerate(counts):
+            height = count * (bottom - y - 5) // tallest
+            color = DROPPED_COLOR if i * BIN_WIDTH >= self.budget else BAR_COLOR
+            panel.fill(color, (5 + i * bar_width, bottom - height, bar_width - 1, height))
+        return panel
+
+    def draw(self, target, pos):
+        """
+        Draws the overlay if it is shown. The overlay is rendered again every
+        REFRESH_FRAMES frames and a new surface is made each time, so a DirtyRenderer
+        can tell it changed.
+
+        Args:
+            target: The surface or DirtyRenderer to draw on.
+            pos (tuple[int, int]): The top left corner of the overlay.
+        """
+        if not self.visible:
+            return
+        if self.panel is None or self.count - self.rendered_at >= REFRESH_FRAMES:
+            self.panel = self.render(fontRegistry.get_font('arial', 18))
+            self.rendered_at = self.count
+        target.blit(self.panel, pos)
@@ -0,0 +1,76 @@
+"""
+Frame Scheduler for Logic Quest
+
+The menu screens (landing page, mode menu, settings, tutorial and leaderboard) only
+change when the player moves the mouse, clicks or presses a key, but they redrew as fast
+as they could, or at a fixed 40 frames a second, keeping a core busy on the shared lab
+machines. A FrameScheduler ends each frame by sleeping in pygame.event.wait() until the
+next input arrives, so a menu nobody touches uses almost no CPU. While the mouse button
+is held down, for example during a drag, frames run at the full rate instead.
+
+A screen calls events() instead of pygame.event.get() and tick() instead of clock.tick()
+at the end of every frame. The event that woke tick() is kept and handed out by the next
+events() call, so no input is lost.
+
+Classes:
+    FrameScheduler: Runs a screen at full rate only while the mouse button is held.
+"""
+import pygame
+
+# frames per second while the mouse button is held
+FPS = 60
+
+# the longest a still screen sleeps, in milliseconds, so it still redraws now and then
+IDLE_TIMEOUT = 1000
+
+
+class FrameScheduler:
+    """
+    Runs a screen at full rate only while the mouse button is held, and waits for input
+    otherwise.
+
+    Attributes:
+        fps (int): Frames per second while the mouse button is held.
+        idle_timeout (int): The longest a still screen sleeps, in milliseconds.
+        clock (pygame.time.Clock): Paces the frames while the mouse button is held.
+        pending (list[pygame.event.Event]): The events that woke the last tick().
+
+    Methods:
+        busy(): Returns whether frames should run at full rate.
+        events(): Returns the events of this frame.
+        tick(): Ends a frame.
+    """
+    def __init__(self, fps=FPS, idle_timeout=IDLE_TIMEOUT):
+        self.fps = fps
+        self.idle_timeout = idle_timeout
+        self.clock = pygame.time.Clock()
+        self.pending = []
+
+    def busy(self):
+        return any(pygame.mouse.get_pressed())
+
+    def events(self):
+        """
+        Returns the events of this frame, starting with the ones that woke the last tick().
+
+        Returns:
+            list[pygame.event.Event]: The events.
+        """
+        events = self.pending + pygame.event.get()
+        self.pending = []
+        return events
+
+    def tick(self):
+        """
+        Ends a frame. While busy() it waits for the next frame at the full rate, otherwise
+        it sleeps until an event arrives or idle_timeout has passed.
+
+        Returns:
+            int: The milliseconds since the previous tick().
+        """
+        if self.busy():
+            return self.clock.tick(self.fps)
+        event = pygame.event.wait(self.idle_timeout)
+        if event.type != pygame.NOEVENT:
+            self.pending.append(event)
+        return self.clock.tick()
@@ -0,0 +1,502 @@
+"""
+Game Storage for Logic Quest
+
+This module keeps the players, their high scores and their saved games in one SQLite
+database (logicquest.db) instead of the usernames.txt, scores.txt and progress.txt text
+files. Every table is keyed, so finding or updating one player does not read or rewrite
+the data of all the others. The database runs in WAL mode so several game windows can
+read it while one of them is writing.
+
+The first time the database is created, the players, scores and saved games already in
+the text files are copied into it.
+
+Classes:
+    ScoreRanks: Counts the high scores of one game mode by distinct score.
+    GameStorage: Reads and writes players, scores and saved games.
+
+Functions:
+    read_pairs(file_name, errors): Reads a text file made of name/number line pairs.
+    get_storage(): Returns the storage shared by the whole process.
+"""
+import bisect
+import os
+import sqlite3
+import sys
+
+DATABASE_FILE = 'logicquest.db'
+
+# game modes that keep a high score
+LIGHTNING = 'lightning'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    name TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS scores (
+    name TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    PRIMARY KEY (name, mode)
+) WITHOUT ROWID;
+
+-- kept in leaderboard order so the top scores of a mode are read without sorting
+CREATE INDEX IF NOT EXISTS scores_by_rank ON scores (mode, score DESC, name);
+
+CREATE TABLE IF NOT EXISTS saves (
+    name TEXT NOT NULL,
+    slot INTEGER NOT NULL DEFAULT 0,
+    question_index INTEGER NOT NULL,
+    PRIMARY KEY (name, slot)
+) WITHOUT ROWID;
+"""
+
+# keeps the higher of the stored and the submitted score
+SUBMIT_BEST = ("INSERT INTO scores (name, mode, score) VALUES (?, ?, ?) "
+               "ON CONFLICT (name, mode) DO UPDATE SET score = max(score, excluded.score)")
+
+
+def read_pairs(file_name, errors=sys.stderr):
+    """
+    Reads a text file where every name line is followed by a number line, such as
+    scores.txt or progress.txt. Blank lines are skipped. A name line followed by a line
+    that is not a whole number is a broken record: both lines are reported and skipped,
+    so a number glued onto the next name (like "1kassem") does not become a player.
+    A number line without a name is reported and skipped on its own.
+
+    Args:
+        file_name (str): The path of the text file.
+        errors (file): Where to report broken records.
+
+    Returns:
+        list[tuple[str, int]]: The (name, number) pairs in file order.
+    """
+    try:
+        with open(file_name, 'r') as f:
+            lines = [(number, line.strip()) for number, line in enumerate(f, 1) if line.strip()]
+    except FileNotFoundError:
+        return []
+    pairs = []
+    i = 0
+    while i < len(lines):
+        line_number, name = lines[i]
+        if is_number(name):
+            print(f"{file_name}:{line_number}: skipped a number without a name: {name}", file=errors)
+            i += 1
+        elif i + 1 == len(lines) or not is_number(lines[i + 1][1]):
+            print(f"{file_name}:{line_number}: skipped {name} with no number after it", file=errors)
+            i += 2
+        else:
+            pairs.append((name, int(lines[i + 1][1])))
+            i += 2
+    return pairs
+
+
+def is_number(text):
+    digits = text[1:] if text.startswith('-') else text
+    return digits.isdecimal()
+
+
+class ScoreRanks:
+    """
+    Counts the high scores of one game mode in a Fenwick tree with one slot per distinct
+    score, so the rank of a score and the score found at a leaderboard position are both
+    answered in O(log n) steps, where n is the number of distinct scores. The tree does
+    not depend on how far apart the scores are, so one huge score costs one slot.
+
+    A score that has no slot yet only marks the tree as out of date. The tree is built
+    again in O(n) steps before the next question, so a batch of new scores costs one
+    rebuild instead of one each.
+
+    Attributes:
+        counts (dict[int, int]): How many players have each score.
+        scores (list[int]): The score of every slot of the tree, sorted.
+        tree (list[int]): The Fenwick tree, indexed from 1.
+        total (int): How many scores are counted.
+        dirty (bool): Whether the tree must be built again before it is used.
+
+    Methods:
+        add(score, amount): Adds to the number of players with a score.
+        count_above(score): Returns how many scores are higher than a score.
+        find(position): Returns the score at a leaderboard position.
+    """
+    def __init__(self, counts=()):
+        self.counts = {}
+        for score, amount in counts:
+            self.counts[score] = self.counts.get(score, 0) + amount
+        self.total = sum(self.counts.values())
+        self.rebuild()
+
+    def __len__(self):
+        return self.total
+
+    def rebuild(self):
+        # one slot per score, keeping a power of two size for find()
+        self.scores = sorted(self.counts)
+        size = 1
+        while size < len(self.scores):
+            size *= 2
+        self.tree = [0] + [self.counts[score] for score in self.scores] + [0] * (size - len(self.scores))
+        for i in range(1, size + 1):
+            # every slot adds itself to the next slot that covers it
+            parent = i + (i & -i)
+            if parent <= size:
+                self.tree[parent] += self.tree[i]
+        self.dirty = False
+
+    def update(self, i, amount):
+        while i < len(self.tree):
+            self.tree[i] += amount
+            i += i & -i
+
+    def add(self, score, amount=1):
+        """
+        Adds to the number of players with a score. Use a negative amount to remove them.
+        A score that has no slot yet marks the tree to be built again.
+
+        Args:
+            score (int): The score.
+            amount (int): How many players to add.
+        """
+        self.counts[score] = self.counts.get(score, 0) + amount
+        if self.counts[score] == 0:
+            # the slot stays until the next rebuild, with a count of 0
+            del self.counts[score]
+        self.total += amount
+        if self.dirty:
+            return
+        i = bisect.bisect_left(self.scores, score)
+        if i < len(self.scores) and self.scores[i] == score:
+            self.update(i + 1, amount)
+        else:
+            self.dirty = True
+
+    def count_above(self, score):
+        """
+        Returns how many scores are higher than a score.
+
+        Args:
+            score (int): The score.
+
+        Returns:
+            int: The number of higher scores.
+        """
+        if self.dirty:
+            self.rebuild()
+        i = bisect.bisect_right(self.scores, score)
+        at_most = 0
+        while i > 0:
+            at_most += self.tree[i]
+            i -= i & -i
+        return self.total - at_most
+
+    def find(self, position):
+        """
+        Returns the score at a leaderboard position, counting from the highest score.
+
+        Args:
+            position (int): The position, 0 for the highest score. Must be below len(self).
+
+        Returns:
+            tuple[int, int]: The score and how many scores are higher than it.
+        """
+        if self.dirty:
+            self.rebuild()
+        # walk down the tree to the last slot with no more than `before` lower scores
+        before = self.total - position - 1
+        i = 0
+        step = len(self.tree) - 1
+        while step:
+            if i + step < len(self.tree) and self.tree[i + step] <= before:
+                i += step
+                before -= self.tree[i]
+            step //= 2
+        score = self.scores[i]
+        return score, self.count_above(score)
+
+
+class GameStorage:
+    """
+    Reads and writes players, high scores and saved games in the SQLite database.
+
+    Attributes:
+        path (str): The path of the database file.
+        connection (sqlite3.Connection): The open database connection.
+        ranks (dict[str, ScoreRanks]): The score counts of each mode, built the first time
+            a mode is ranked and kept up to date by submit_best().
+        ranks_version (int): The SQLite data_version when ranks were read.
+        user_names (set[str]): The registered players, read the first time they are needed.
+        data_version (int): The SQLite data_version when user_names was read.
+
+    Methods:
+        users(): Returns the names of all registered players.
+        user_exists(name): Checks if a player is registered.
+        user_suggestions(prefix, count): Returns the first player names starting with a prefix.
+        add_user(name): Registers a player.
+        get_score(name, mode): Returns the high score of a player.
+        submit_best(name, mode, score): Stores a score if it beats the high score of a player.
+        submit_scores(scores): Stores many scores in one transaction.
+        score_ranks(mode): Returns the score counts of a mode.
+        score_count(mode): Returns how many players have a score in a mode.
+        rank(name, mode): Returns the leaderboard rank of a player.
+        score_page(mode, start, count): Returns the high scores from a leaderboard position.
+        save_progress(name, question_index, slot): Saves the question a player reached.
+        load_progress(name, slot): Returns the question a player saved.
+        close(): Closes the database.
+    """
+    def __init__(self, path=DATABASE_FILE, check_same_thread=True):
+        self.path = path
+        new = not os.path.isfile(path)
+        # the score server uses its storage from a worker thread, one call at a time
+        self.connection = sqlite3.connect(path, timeout=10, check_same_thread=check_same_thread)
+        self.ranks = {}
+        self.ranks_version = None
+        self.user_names = None
+        self.data_version = None
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        if new:
+            self.import_text_files(os.path.dirname(path))
+
+    def import_text_files(self, directory):
+        """
+        Copies the players, scores and saved games of the old text files into the database.
+
+        Args:
+            directory (str): The folder that holds the text files.
+        """
+        users = []
+        try:
+            with open(os.path.join(directory, 'usernames.txt'), 'r') as f:
+                users = [line.strip() for line in f if line.strip()]
+        except FileNotFoundError:
+            pass
+        scores = read_pairs(os.path.join(directory, 'scores.txt'))
+        saves = read_pairs(os.path.join(directory, 'progress.txt'))
+
+        with self.connection:
+            self.connection.executemany("INSERT OR IGNORE INTO users (name) VALUES (?)",
+                                        [(name,) for name in users])
+            self.connection.executemany(SUBMIT_BEST, [(name, LIGHTNING, score) for name, score in scores])
+            # later saves in progress.txt replace earlier ones
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO saves (name, slot, question_index) VALUES (?, 0, ?)", saves)
+
+    def close(self):
+        self.connection.close()
+
+    def users(self):
+        """
+        Returns the names of all registered players. They are kept in memory and only read
+        again when another connection, such as a second game window, changed the database.
+
+        Returns:
+            set[str]: The player names.
+        """
+        version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        if self.user_names is None or version != self.data_version:
+            self.user_names = {name for name, in self.connection.execute("SELECT name FROM users")}
+            self.data_version = version
+        return self.user_names
+
+    def user_exists(self, name):
+        return name in self.users()
+
+    def user_suggestions(self, prefix, count):
+        """
+        Returns the first player names, in alphabetical order, that start with a prefix.
+        The names are read as one range of the users primary key, so the cost depends on
+        the prefix and count and not on how many players there are.
+
+        Args:
+            prefix (str): The start of the names.
+            count (int): The most names to return.
+
+        Returns:
+            list[str]: The matching names.
+        """
+        rows = self.connection.execute(
+            "SELECT name FROM users WHERE name >= ? AND name < ? ORDER BY name LIMIT ?",
+            (prefix, prefix + '\U0010ffff', count))
+        return [name for name, in rows]
+
+    def add_user(self, name):
+        with self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO users (name) VALUES (?)", (name,))
+        # changes made by this connection do not move data_version
+        if self.user_names is not None:
+            self.user_names.add(name)
+
+    def get_score(self, name, mode):
+        """
+        Returns the high score of a player.
+
+        Args:
+            name (str): The player name.
+            mode (str): The game mode, for example LIGHTNING.
+
+        Returns:
+            int: The high score, or None if the player has no score in that mode.
+        """
+        row = self.connection.execute("SELECT score FROM scores WHERE name = ? AND mode = ?",
+                                      (name, mode)).fetchone()
+        return row[0] if row else None
+
+    def submit_best(self, name, mode, score):
+        """
+        Stores a score if it beats the high score of the player, in one keyed statement
+        that only touches the row of that player.
+
+        Args:
+            name (str): The player name.
+            mode (str): The game mode, for example LIGHTNING.
+            score (int): The score of the finished game.
+
+        Returns:
+            int: The high score of the player after the update.
+        """
+        return self.submit_scores([(name, mode, score)])[0]
+
+    def submit_scores(self, scores):
+        """
+        Stores many scores in one transaction, keeping the higher score of every player.
+
+        Args:
+            scores (list[tuple[str, str, int]]): (player name, game mode, score) triples.
+
+        Returns:
+            list[int]: The high score of each player after the update, in the same order.
+        """
+        bests = []
+        changes = []
+        with self.connection:
+            for name, mode, score in scores:
+                old = self.get_score(name, mode)
+                self.connection.execute(SUBMIT_BEST, (name, mode, score))
+                best = score if old is None else max(old, score)
+                bests.append(best)
+                if best != old:
+                    changes.append((mode, old, best))
+        # only count the new scores once they are committed
+        for mode, old, best in changes:
+            if mode in self.ranks:
+                if old is not None:
+                    self.ranks[mode].add(old, -1)
+                self.ranks[mode].add(best)
+        return bests
+
+    def score_ranks(self, mode):
+        """
+        Returns the score counts of a mode, reading them from the database the first time.
+        They are read again when another connection, such as the score server or a second
+        game window, changed the database.
+
+        Args:
+            mode (str): The game mode, for example LIGHTNING.
+
+        Returns:
+            ScoreRanks: The score counts of the mode.
+        """
+        version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        if version != self.ranks_version:
+            self.ranks = {}
+            self.ranks_version = version
+        if mode not in self.ranks:
+            self.ranks[mode] = ScoreRanks(self.connection.execute(
+                "SELECT score, count(*) FROM scores WHERE mode = ? GROUP BY score", (mode,)))
+        return self.ranks[mode]
+
+    def score_count(self, mode):
+        return len(self.score_ranks(mode))
+
+    def rank(self, name, mode):
+        """
+        Returns the leaderboard rank of a player. Players with the same score share a rank.
+
+        Args:
+            name (str): The player name.
+            mode (str): The game mode, for example LIGHTNING.
+
+        Returns:
+            int: The rank, 1 for the best score, or None if the player has no score.
+        """
+        score = self.get_score(name, mode)
+        if score is None:
+            return None
+        return self.score_ranks(mode).count_above(score) + 1
+
+    def score_page(self, mode, start, count):
+        """
+        Returns the high scores from a leaderboard position on. The score counts give the
+        score found at the start position, so the rows are read from the scores_by_rank
+        index from there instead of skipping over every higher score.
+
+        Args:
+            mode (str): The game mode, for example LIGHTNING.
+            start (int): The first position, 0 for the highest score.
+            count (int): How many scores to return.
+
+        Returns:
+            list[tuple[str, int]]: (player name, score) pairs, highest score first.
+
+        Raises:
+            ValueError: If start or count is negative.
+        """
+        if start < 0 or count < 0:
+            raise ValueError(f"invalid page: start {start}, count {count}")
+        ranks = self.score_ranks(mode)
+        if start >= len(ranks):
+            return []
+        score, above = ranks.find(start)
+        return self.connection.execute(
+            "SELECT name, score FROM scores WHERE mode = ? AND score <= ? "
+            "ORDER BY score DESC, name LIMIT ? OFFSET ?",
+            (mode, score, count, start - above)).fetchall()
+
+    def save_progress(self, name, question_index, slot=0):
+        """
+        Saves the question a player reached, replacing the game saved before in the same
+        slot, so a player only ever has one row per slot.
+
+        Args:
+            name (str): The player name.
+            question_index (int): The index of the question the player reached.
+            slot (int): The save slot, 0 for the one used by Load Game.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO saves (name, slot, question_index) VALUES (?, ?, ?)",
+                (name, slot, question_index))
+
+    def load_progress(self, name, slot=0):
+        """
+        Returns the question a player saved. Only the exact player name matches.
+
+        Args:
+            name (str): The player name.
+            slot (int): The save slot, 0 for the one used by Load Game.
+
+        Returns:
+            int: The saved question index, or None if the player has no saved game in the slot.
+        """
+        row = self.connection.execute("SELECT question_index FROM saves WHERE name = ? AND slot = ?",
+                                      (name, slot)).fetchone()
+        return row[0] if row else None
+
+
+_storage = None
+
+
+def get_storage():
+    """
+    Returns the storage shared by the whole process, opening the database the first
+    time it is called.
+
+    Returns:
+        GameStorage: The shared storage.
+    """
+    global _storage
+    if _storage is None:
+        _storage = GameStorage()
+    return _storage
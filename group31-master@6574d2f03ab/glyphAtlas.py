@@ -0,0 +1,77 @@
+"""
+Glyph Atlas for Logic Quest
+
+This module draws numbers that change every frame, like the lightning mode timer. The
+text cache cannot help with those, because "9.98", "9.96", ... are all different texts,
+so font.render() would build a new surface 60 times a second. A GlyphAtlas renders every
+digit and punctuation mark once, and then draws a number by blitting those glyphs one
+after another, which needs no new surface at all.
+
+Classes:
+    GlyphAtlas: The prerendered glyphs of one font and color.
+"""
+import pygame
+
+# the characters rendered when the atlas is built, others are rendered the first time they are drawn
+CHARACTERS = "0123456789.-:"
+
+
+class GlyphAtlas:
+    """
+    The prerendered glyphs of one font and color.
+
+    Attributes:
+        font (pygame.font.Font): The font of the glyphs.
+        color: The color of the glyphs.
+        glyphs (dict[str, pygame.Surface]): The glyph of every character.
+        height (int): The height of a line of glyphs.
+
+    Methods:
+        width(text): Returns the width of a text.
+        draw(target, text, pos): Draws a text with the glyphs.
+    """
+    def __init__(self, font, color, characters=CHARACTERS):
+        self.font = font
+        self.color = color
+        self.glyphs = {}
+        self.height = font.get_height()
+        for character in characters:
+            self.glyph(character)
+
+    def glyph(self, character):
+        glyph = self.glyphs.get(character)
+        if glyph is None:
+            glyph = self.glyphs[character] = self.font.render(character, True, self.color)
+        return glyph
+
+    def width(self, text):
+        """
+        Returns the width of a text drawn with the glyphs.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            int: The width in pixels.
+        """
+        return sum(self.glyph(character).get_width() for character in text)
+
+    def draw(self, target, text, pos):
+        """
+        Draws a text by blitting its glyphs straight onto target.
+
+        Args:
+            target (pygame.Surface): The surface to draw on.
+            text (str): The text, usually a number.
+            pos (tuple[int, int]): The top left corner of the text.
+
+        Returns:
+            pygame.Rect: The area drawn on.
+        """
+        x, y = int(pos[0]), int(pos[1])
+        left = x
+        for character in text:
+            glyph = self.glyph(character)
+            target.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return pygame.Rect(left, y, x - left, self.height)
@@ -0,0 +1,170 @@
+"""
+Headless Mode for Logic Quest
+
+This module lets every screen of the game run without a display or a sound card, for
+example on the test and benchmark machines, which have no GPU. Headless mode uses the SDL
+dummy drivers (SDL_VIDEODRIVER=dummy and SDL_AUDIODRIVER=dummy). The window then has a
+fixed virtual size instead of the size of the desktop, so every run draws the same frames.
+The size is 1920x1080 unless LOGICQUEST_RESOLUTION is set, for example to "1280x720".
+
+Headless mode is on whenever SDL_VIDEODRIVER is "dummy", so it can be chosen from the
+shell, or from Python with enable() before the first screen is imported.
+
+A SceneDriver runs the main() of one screen for a number of frames, posting scripted
+events before chosen frames, so a screen can be driven and checked from a test.
+
+Classes:
+    SceneStopped: Raised to leave a screen once it has drawn its frames.
+    SceneDriver: Runs a screen headless for a number of frames.
+
+Functions:
+    enable(size): Makes pygame use the SDL dummy drivers with a fixed window size.
+    enabled(): Returns whether the game runs headless.
+    screen_size(): Returns the size the screens open their window with.
+    run_scene(name, frames, events): Runs a screen headless for a number of frames.
+"""
+import importlib
+import os
+import sys
+
+import pygame
+
+import sceneManager
+
+RESOLUTION_VARIABLE = 'LOGICQUEST_RESOLUTION'
+
+# the window size of headless runs
+RESOLUTION = (1920, 1080)
+
+
+def enable(size=None):
+    """
+    Makes pygame use the SDL dummy drivers with a fixed window size. It must be called
+    before the first screen module is imported, because those open their window then.
+
+    Args:
+        size (tuple[int, int]): The window size, LOGICQUEST_RESOLUTION or RESOLUTION by default.
+    """
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    if size is not None:
+        os.environ[RESOLUTION_VARIABLE] = f"{size[0]}x{size[1]}"
+
+
+def enabled():
+    return os.environ.get('SDL_VIDEODRIVER') == 'dummy'
+
+
+def screen_size():
+    """
+    Returns the size the screens open their window with: the fixed virtual size when
+    headless, the size of the desktop otherwise.
+
+    Returns:
+        tuple[int, int]: The width and height.
+    """
+    if enabled():
+        resolution = os.environ.get(RESOLUTION_VARIABLE)
+        if not resolution:
+            return RESOLUTION
+        width, _, height = resolution.lower().partition('x')
+        return int(width), int(height)
+    screen_info = pygame.display.Info()
+    return screen_info.current_w, screen_info.current_h
+
+
+class SceneStopped(Exception):
+    """
+    Raised by a SceneDriver to leave a screen once it has drawn its frames.
+    """
+
+
+class SceneDriver:
+    """
+    Runs the main() of a screen headless for a number of frames. A frame ends every time
+    the screen calls pygame.display.update() or pygame.display.flip().
+
+    Attributes:
+        frames (int): How many frames to run the screen for.
+        events (dict[int, list[pygame.event.Event]]): The events posted before each frame,
+            by frame number starting at 0.
+        frame (int): How many frames the screen has drawn.
+        left (bool): Whether the screen left on its own, by changing the scene stack.
+        changed_to (str): The screen on top of the scene stack after it left, or None.
+        window (pygame.Surface): The window as the screen left it.
+
+    Methods:
+        run(name): Runs a screen.
+    """
+    def __init__(self, frames, events=None):
+        self.frames = frames
+        self.events = events or {}
+        self.frame = 0
+        self.left = False
+        self.changed_to = None
+        self.window = None
+
+    def post_events(self):
+        for event in self.events.get(self.frame, ()):
+            pygame.event.post(event)
+
+    def end_frame(self, show):
+        def present(*args):
+            show(*args)
+            self.frame += 1
+            if self.frame >= self.frames:
+                raise SceneStopped()
+            self.post_events()
+        return present
+
+    def run(self, name):
+        """
+        Runs a screen until it has drawn its frames or it leaves.
+
+        Args:
+            name (str): Module name of the screen, for example 'lightningMode'.
+
+        Returns:
+            pygame.Surface: The window as the screen left it.
+
+        Raises:
+            RuntimeError: If the game is not running headless.
+        """
+        if not enabled():
+            raise RuntimeError("screens can only be driven in headless mode")
+        # screens open their window and fonts when imported, which must not be older than pygame.init()
+        scene = importlib.reload(sys.modules[name]) if name in sys.modules else importlib.import_module(name)
+        update, flip = pygame.display.update, pygame.display.flip
+        pygame.display.update, pygame.display.flip = self.end_frame(update), self.end_frame(flip)
+        try:
+            pygame.init()
+            pygame.event.clear()
+            self.post_events()
+            scene.main()
+        except SceneStopped:
+            pass
+        except sceneManager.SceneChange as change:
+            self.left = True
+            self.changed_to = change.name
+        finally:
+            pygame.display.update, pygame.display.flip = update, flip
+        self.window = pygame.display.get_surface()
+        return self.window
+
+
+def run_scene(name, frames=1, events=None):
+    """
+    Runs a screen headless for a number of frames.
+
+    Args:
+        name (str): Module name of the screen, for example 'lightningMode'.
+        frames (int): How many frames to run the screen for.
+        events (dict[int, list[pygame.event.Event]]): The events posted before each frame,
+            by frame number starting at 0.
+
+    Returns:
+        SceneDriver: The driver, with the frames drawn and the screen opened on leaving.
+    """
+    driver = SceneDriver(frames, events)
+    driver.run(name)
+    return driver
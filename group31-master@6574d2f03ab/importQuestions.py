@@ -0,0 +1,162 @@
+"""
+Bulk Question Import for Logic Quest
+
+This module is a command line tool that imports questions from a CSV or JSON Lines file
+into the question files of the game. Rows are read one at a time, checked, and written
+to questions.txt, answers.txt, difficulty.txt and options.txt in large batches, with one
+write per file per batch.
+
+CSV files need a header row with the columns question, answer, difficulty, option1,
+option2, option3 and option4. JSON Lines files hold one object per line with the keys
+question, answer, difficulty and options (a list of four options); option1 to option4
+are accepted instead of options.
+
+Usage:
+    python importQuestions.py questions.csv [--directory DIR] [--batch-size N]
+
+Functions:
+    read_rows(file_name): Yields the raw rows of a CSV or JSON Lines file.
+    validate(row): Checks a row and turns it into a question for the bank.
+    import_questions(file_name, directory, batch_size): Imports every valid row of a file.
+    main(argv): Runs the command line tool.
+"""
+import argparse
+import csv
+import json
+import sys
+
+import questionBank
+
+OPTION_COUNT = 4
+
+
+def read_rows(file_name):
+    """
+    Yields the raw rows of a CSV or JSON Lines file, picking the format from the file
+    extension (.jsonl or .json for JSON Lines, CSV otherwise).
+
+    Args:
+        file_name (str): The path of the file to import.
+
+    Yields:
+        tuple[int, dict]: The line number and the fields of every row.
+    """
+    with open(file_name, 'r', newline='', encoding='utf-8') as f:
+        if file_name.lower().endswith(('.jsonl', '.json')):
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    row = {'error': f"invalid JSON: {e.msg}"}
+                yield line_number, row
+        else:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def validate(row):
+    """
+    Checks a row and turns it into a question for the bank.
+
+    Args:
+        row (dict): The fields of the row.
+
+    Returns:
+        tuple: (question, answer, difficulty, options) ready for questionBank.append_questions().
+
+    Raises:
+        ValueError: If a field is missing or empty, the difficulty is not an integer in
+            questionBank.DIFFICULTY_RANGE, or the answer is not one of the four options.
+    """
+    if not isinstance(row, dict):
+        raise ValueError("row is not an object")
+    if 'error' in row:
+        raise ValueError(row['error'])
+
+    options = row.get('options')
+    if options is None:
+        options = [row.get(f'option{i}') for i in range(1, OPTION_COUNT + 1)]
+    if not isinstance(options, list) or len(options) != OPTION_COUNT:
+        raise ValueError(f"expected {OPTION_COUNT} options")
+
+    fields = [row.get('question'), row.get('answer'), row.get('difficulty')] + options
+    names = ['question', 'answer', 'difficulty'] + [f'option{i}' for i in range(1, OPTION_COUNT + 1)]
+    values = []
+    for name, value in zip(names, fields):
+        value = '' if value is None else str(value).strip()
+        if value == '':
+            raise ValueError(f"{name} is empty")
+        if '\n' in value or '\r' in value:
+            raise ValueError(f"{name} spans more than one line")
+        values.append(value)
+
+    question, answer, difficulty = values[:3]
+    options = values[3:]
+    if questionBank.parse_difficulty(difficulty) is None:
+        raise ValueError(f"difficulty is not an integer the bank can hold: {difficulty}")
+    if answer not in options:
+        raise ValueError(f"answer {answer} is not one of the options")
+    return (question, answer, difficulty, options)
+
+
+def import_questions(file_name, directory='.', batch_size=5000, errors=sys.stderr):
+    """
+    Imports every valid row of a file into the question files. Invalid rows are
+    reported and skipped.
+
+    Args:
+        file_name (str): The path of the CSV or JSON Lines file.
+        directory (str): The folder that holds the question files.
+        batch_size (int): How many questions to write at once.
+        errors (file): Where to report invalid rows.
+
+    Returns:
+        tuple[int, int]: The number of imported and rejected rows.
+    """
+    imported = 0
+    rejected = 0
+    batch = []
+    for line_number, row in read_rows(file_name):
+        try:
+            batch.append(validate(row))
+        except ValueError as e:
+            rejected += 1
+            print(f"{file_name}:{line_number}: {e}", file=errors)
+            continue
+        if len(batch) >= batch_size:
+            imported += questionBank.append_questions(batch, directory)
+            batch = []
+    imported += questionBank.append_questions(batch, directory)
+    return imported, rejected
+
+
+def main(argv=None):
+    """
+    Runs the command line tool.
+
+    Args:
+        argv (list[str]): The command line arguments, sys.argv[1:] by default.
+
+    Returns:
+        int: The exit status, 1 if any row was rejected.
+    """
+    parser = argparse.ArgumentParser(description="Import questions from a CSV or JSON Lines file.")
+    parser.add_argument('files', nargs='+', help="CSV or JSON Lines files to import")
+    parser.add_argument('--directory', default='.', help="folder that holds the question files")
+    parser.add_argument('--batch-size', type=int, default=5000, help="questions written per batch")
+    args = parser.parse_args(argv)
+
+    status = 0
+    for file_name in args.files:
+        imported, rejected = import_questions(file_name, args.directory, max(1, args.batch_size))
+        print(f"{file_name}: imported {imported} questions, rejected {rejected} rows")
+        if rejected:
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+"""
+Input Recording and Replay for Logic Quest
+
+This module records the input of a real session of a game screen, for example dragging
+answers in trainingMode or lightningMode, clicking Next Question or pressing P, and
+replays it later without a display. Replays are driven frame by frame with the frame
+pacing turned off, so a recorded session becomes a repeatable benchmark of the frame
+time and a regression test of the game logic: the same recording always ends on the
+same frame with the same picture.
+
+A recording is a text file. Its first line is a JSON header with the screen, the window
+size and the number of frames. Every other line is one JSON list for a frame in which the
+screen read events or the mouse changed:
+
+    [frame, milliseconds since the start, [mouse x, mouse y], [pressed buttons], [[type, attributes], ...]]
+
+pygame only updates the mouse position and buttons for real input, so a replay answers
+pygame.mouse.get_pos() and pygame.mouse.get_pressed() from the recording instead.
+
+Usage:
+    python inputReplay.py record SCREEN FILE
+    python inputReplay.py replay FILE [--runs N]
+
+Classes:
+    Recording: The recorded input of one session.
+    InputRecorder: Records the events a screen reads, frame by frame.
+    UnpacedClock: A pygame clock whose tick() never waits.
+    ReplayDriver: Replays a recording on its screen without a display.
+
+Functions:
+    record(name, path): Runs a screen and records its input.
+    replay(path): Replays a recording without a display.
+    main(argv): Runs the command line tool.
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+
+import pygame
+
+import headless
+import sceneManager
+import timingStats
+
+FORMAT_VERSION = 1
+
+# the input that is recorded. Closing the window is left out, a replay just stops on that frame
+RECORDED_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT, pygame.MOUSEMOTION,
+                   pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL)
+
+# event attributes that cannot be written to a recording
+SKIPPED_ATTRIBUTES = ('window',)
+
+
+def encode_event(event):
+    attributes = {}
+    for name, value in event.dict.items():
+        if name in SKIPPED_ATTRIBUTES:
+            continue
+        if isinstance(value, tuple):
+            value = list(value)
+        elif not isinstance(value, (int, float, str, bool, type(None))):
+            continue
+        attributes[name] = value
+    return [event.type, attributes]
+
+
+def decode_event(item):
+    event_type, attributes = item
+    return pygame.event.Event(event_type, {name: tuple(value) if isinstance(value, list) else value
+                                           for name, value in attributes.items()})
+
+
+class Recording:
+    """
+    The recorded input of one session.
+
+    Attributes:
+        scene (str): Module name of the recorded screen.
+        size (tuple[int, int]): The window size during the session.
+        frames (int): How many frames the session lasted.
+        entries (list[list]): The recorded frames, see the module description.
+
+    Methods:
+        save(path): Writes the recording to a file.
+        load(path): Reads a recording from a file.
+    """
+    def __init__(self, scene, size, frames=0, entries=None):
+        self.scene = scene
+        self.size = tuple(size)
+        self.frames = frames
+        self.entries = entries if entries is not None else []
+
+    def save(self, path):
+        header = {'version': FORMAT_VERSION, 'scene': self.scene, 'size': list(self.size), 'frames': self.frames}
+        with open(path, 'w') as f:
+            f.write(json.dumps(header) + '\n')
+            for entry in self.entries:
+                f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a recording from a file.
+
+        Args:
+            path (str): The recording file.
+
+        Returns:
+            Recording: The recording.
+
+        Raises:
+            ValueError: If the file was written by an unknown version of this module.
+        """
+        with open(path, 'r') as f:
+            header = json.loads(f.readline())
+            if header.get('version') != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} recording")
+            entries = [json.loads(line) for line in f if line.strip()]
+        return cls(header['scene'], header['size'], header['frames'], entries)
+
+
+class InputRecorder:
+    """
+    Records the events a screen reads, frame by frame. While it is recording it stands in
+    for pygame.event.get(), pygame.display.update() and pygame.display.flip().
+
+    Attributes:
+        recording (Recording): What has been recorded.
+        start_time (float): The time.perf_counter() time recording started at.
+        mouse (list): The last recorded mouse position and buttons.
+
+    Methods:
+        start(): Starts recording.
+        stop(): Stops recording.
+    """
+    def __init__(self, scene, size):
+        self.recording = Recording(scene, size)
+        self.start_time = 0.0
+        self.mouse = None
+        self.originals = None
+
+    def start(self):
+        self.originals = pygame.event.get, pygame.display.update, pygame.display.flip
+        pygame.event.get = self.get
+        pygame.display.update = self.end_frame(pygame.display.update)
+        pygame.display.flip = self.end_frame(pygame.display.flip)
+        self.start_time = time.perf_counter()
+
+    def stop(self):
+        pygame.event.get, pygame.display.update, pygame.display.flip = self.originals
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def end_frame(self, show):
+        def present(*args):
+            show(*args)
+            self.recording.frames += 1
+        return present
+
+    def get(self, *args, **kwargs):
+        events = self.originals[0](*args, **kwargs)
+        recorded = [encode_event(event) for event in events if event.type in RECORDED_EVENTS]
+        mouse = [list(pygame.mouse.get_pos()), [int(pressed) for pressed in pygame.mouse.get_pressed()]]
+        if recorded or mouse != self.mouse:
+            milliseconds = round((time.perf_counter() - self.start_time) * 1000)
+            self.recording.entries.append([self.recording.frames, milliseconds] + mouse + [recorded])
+            self.mouse = mouse
+        return events
+
+
+class UnpacedClock:
+    """
+    A pygame clock whose tick() never waits, so a replay runs as fast as it can.
+    pygame.time.Clock cannot be subclassed, so this wraps one.
+    """
+    def __init__(self, clock):
+        self.clock = clock
+
+    def tick(self, framerate=0):
+        return self.clock.tick()
+
+    def __getattr__(self, name):
+        return getattr(self.clock, name)
+
+
+class ReplayDriver(headless.SceneDriver):
+    """
+    Replays a recording on its screen without a display and with the frame pacing off.
+
+    Attributes:
+        recording (Recording): The recording being replayed.
+        mouse (dict[int, tuple]): The mouse position and buttons recorded for each frame.
+        mouse_pos (tuple[int, int]): What pygame.mouse.get_pos() answers.
+        mouse_pressed (tuple[bool, ...]): What pygame.mouse.get_pressed() answers.
+        frame_times (list[float]): Seconds taken by each replayed frame.
+    """
+    def __init__(self, recording):
+        events = {}
+        mouse = {}
+        for frame, _, pos, pressed, items in recording.entries:
+            events.setdefault(frame, []).extend(decode_event(item) for item in items)
+            mouse[frame] = (tuple(pos), tuple(bool(button) for button in pressed))
+        # one frame more than recorded, so the input of the last frame is read
+        super().__init__(recording.frames + 1, events)
+        self.recording = recording
+        self.mouse = mouse
+        self.mouse_pos = (0, 0)
+        self.mouse_pressed = (False, False, False)
+        self.frame_times = []
+        self.frame_start = 0.0
+
+    def post_events(self):
+        if self.frame in self.mouse:
+            self.mouse_pos, self.mouse_pressed = self.mouse[self.frame]
+        super().post_events()
+
+    def end_frame(self, show):
+        present = super().end_frame(show)
+
+        def timed(*args):
+            try:
+                present(*args)
+            finally:
+                now = time.perf_counter()
+                self.frame_times.append(now - self.frame_start)
+                self.frame_start = now
+        return timed
+
+    def get_pos(self):
+        return self.mouse_pos
+
+    def get_pressed(self, num_buttons=3):
+        return self.mouse_pressed[:num_buttons]
+
+    def run(self, name=None):
+        """
+        Replays the recording.
+
+        Args:
+            name (str): Module name of the screen, the recorded screen by default.
+
+        Returns:
+            pygame.Surface: The window after the last replayed frame.
+        """
+        resolution = os.environ.get(headless.RESOLUTION_VARIABLE)
+        headless.enable(self.recording.size)
+        originals = pygame.mouse.get_pos, pygame.mouse.get_pressed, pygame.time.Clock
+        pygame.mouse.get_pos, pygame.mouse.get_pressed = self.get_pos, self.get_pressed
+        pygame.time.Clock = lambda: UnpacedClock(originals[2]())
+        self.frame_start = time.perf_counter()
+        try:
+            return super().run(name or self.recording.scene)
+        finally:
+            pygame.mouse.get_pos, pygame.mouse.get_pressed, pygame.time.Clock = originals
+            if resolution is None:
+                del os.environ[headless.RESOLUTION_VARIABLE]
+            else:
+                os.environ[headless.RESOLUTION_VARIABLE] = resolution
+
+    def checksum(self):
+        """
+        Returns a checksum of the window after the replay, to compare two replays.
+
+        Returns:
+            str: The SHA-1 of the pixels of the window.
+        """
+        return hashlib.sha1(pygame.image.tobytes(self.window, 'RGB')).hexdigest()
+
+
+def record(name, path):
+    """
+    Runs a screen with a display and records its input until the screen is left or
+    the window is closed.
+
+    Args:
+        name (str): Module name of the screen, for example 'trainingMode'.
+        path (str): The recording file to write.
+
+    Returns:
+        Recording: The recording.
+    """
+    scene = importlib.import_module(name)
+    recorder = InputRecorder(name, headless.screen_size())
+    try:
+        with recorder:
+            scene.main()
+    except (sceneManager.SceneChange, SystemExit):
+        pass
+    recorder.recording.save(path)
+    return recorder.recording
+
+
+def replay(path):
+    """
+    Replays a recording without a display.
+
+    Args:
+        path (str): The recording file.
+
+    Returns:
+        ReplayDriver: The driver, with the frame times and the window after the replay.
+    """
+    driver = ReplayDriver(Recording.load(path))
+    driver.run()
+    return driver
+
+
+def main(argv=None):
+    """
+    Runs the command line tool.
+
+    Args:
+        argv (list[str]): The command line arguments, sys.argv[1:] by default.
+    """
+    parser = argparse.ArgumentParser(description="Record the input of a game screen, or replay it as a benchmark.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_parser = commands.add_parser('record', help="play a screen and record the input")
+    record_parser.add_argument('screen', help="module name of the screen, for example trainingMode")
+    record_parser.add_argument('file', help="the recording file to write")
+    replay_parser = commands.add_parser('replay', help="replay a recording without a display")
+    replay_parser.add_argument('file', help="the recording file")
+    replay_parser.add_argument('--runs', type=int, default=1, help="how many times to replay it")
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        recording = record(args.screen, args.file)
+        print(f"recorded {recording.frames} frames of {recording.scene} into {args.file}")
+        return
+
+    headless.enable()
+    checksums = set()
+    for run in range(args.runs):
+        driver = replay(args.file)
+        times = sorted(driver.frame_times)
+        checksums.add(driver.checksum())
+        print(f"run {run + 1}: {driver.frame} frames, mean {sum(times) / len(times) * 1000:.2f} ms, "
+              f"p50 {timingStats.percentile(times, 0.5) * 1000:.2f} ms, p95 {timingStats.percentile(times, 0.95) * 1000:.2f} ms, "
+              f"p99 {timingStats.percentile(times, 0.99) * 1000:.2f} ms, max {times[-1] * 1000:.2f} ms")
+    if len(checksums) > 1:
+        print("the replays did not end on the same picture")
+        sys.exit(1)
+    print(f"final picture {checksums.pop()}")
+
+
+if __name__ == "__main__":
+    main()
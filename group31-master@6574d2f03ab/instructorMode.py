@@ -22,9 +22,14 @@ Date: 31/3/2024
 version: 1.0
 """
 import pygame
-import sys
 import os
-import subprocess   
+import sceneManager
+import questionBank
+import assetManager
+import fontRegistry
+import textCache
+import headless
+import dirtyRenderer
 
 def main():
     """
@@ -34,17 +39,16 @@ def main():
     pygame.init()
 
     # Get the screen size
-    screen_info = pygame.display.Info()
-    WIDTH, HEIGHT = screen_info.current_w, screen_info.current_h
+    WIDTH, HEIGHT = headless.screen_size()
     WIN = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
 
     pygame.display.set_caption("Instructor Mode")
 
     clock = pygame.time.Clock()
 
-    BG = pygame.transform.scale(pygame.image.load("backgrounds/bg_offwhite.jpg"),(WIDTH, HEIGHT))
-    font = pygame.font.SysFont("arial", 45)
-    smallfont = pygame.font.SysFont("arial", 20)
+    BG = assetManager.load_image("backgrounds/bg_offwhite.jpg", (WIDTH, HEIGHT))
+    font = fontRegistry.get_font("arial", 45)
+    smallfont = fontRegistry.get_font("arial", 20)
     black = (10, 10, 10)
     grey = (112, 128, 144)
     red = (255, 0, 0)
@@ -67,42 +71,22 @@ def main():
 
     current_question_index = 0
 
-    with open('questions.txt', 'r') as f:
-        questions = []
-        for line in f:
-            if '.' in line:
-                # Split line at the first dot and take the second part
-                line_text = line.split('.', 1)[1].strip()
-                questions.append(line_text)
-
-    with open('options.txt', 'r') as f:
-        raw_options = f.read().split('\n\n')
-        options = [option.strip().split('\n') for option in raw_options]
-
-    with open('answers.txt', 'r') as f:
-        answers = []
-        for line in f:
-            if '.' in line:
-                # Split line at the first dot and take the second part
-                line_text = line.split('.', 1)[1].strip()
-                answers.append(line_text)
+    bank = questionBank.get_bank()
 
     def get_question_text():
-        return smallfont.render(questions[current_question_index], True, black)
+        return textCache.render(smallfont, bank.question(current_question_index), True, black)
 
     def get_question_number_text():
-        return font.render(f"Question Number: {current_question_index + 1}", True, black)
+        return textCache.render(font, f"Question Number: {current_question_index + 1}", True, black)
 
     def get_current_options():
-        return options[current_question_index]
+        return bank.options(current_question_index)
 
     def get_current_answer():
-        return options[current_question_index]
+        return bank.answer(current_question_index)
 
     def main_menu():
-        path = 'landingPage_1.py'
-        subprocess.run([sys.executable, path])
-        pygame.quit()
+        sceneManager.pop_to("landingPage_1")
 
 
     class Button:
@@ -129,13 +113,13 @@ def main():
 
         def draw(self, win, outline=None):
             if outline:
-                pygame.draw.rect(win, outline, (self.x-2, self.y-2, self.width+4, self.height+4), 0)
+                win.fill(outline, (self.x-2, self.y-2, self.width+4, self.height+4))
 
-            pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.height), 0)
+            win.fill(self.color, (self.x, self.y, self.width, self.height))
 
             if self.text != '':
-                font = pygame.font.SysFont('arial', 20)
-                text = font.render(self.text, 1, (0, 0, 0))
+                font = fontRegistry.get_font('arial', 20)
+                text = textCache.render(font, self.text, 1, (0, 0, 0))
                 win.blit(text, (self.x + (self.width/2 - text.get_width()/2), self.y + (self.height/2 - text.get_height()/2)))
 
         def is_over(self, pos):
@@ -171,9 +155,9 @@ def main():
 
         def draw(self, win):
 
-            pygame.draw.rect(win, grey, self.rect)
+            win.fill(grey, self.rect)
 
-            text_surface = self.font.render(self.text, True, black)
+            text_surface = textCache.render(self.font, self.text, True, black)
 
             win.blit(text_surface, (self.rect.x + 5, self.rect.y + 5))
 
@@ -212,12 +196,9 @@ def main():
     back_button = Button(grey, WIDTH - 1350, HEIGHT - 160, 160, 40, 'Back')
 
     def create_draggable_items():
-        answer = answers[current_question_index]
+        answer = bank.answer(current_question_index)
         current_options = get_current_options()
 
-        if current_options[0].strip().endswith('.'):
-            current_options = current_options[1:]
-
         item_width = 100  # Adjust the width as needed to fit the text
         total_width = (len(current_options) - 1) * ANSWER_ITEM_SPACING + len(current_options) * item_width
         start_x = (WIDTH - total_width) // 2  # Center the options
@@ -258,26 +239,39 @@ def main():
 
     show_answer = False
 
+    # only what changed since the previous frame is drawn again and sent to the display
+    screen = dirtyRenderer.DirtyRenderer(WIN, BG)
     run = True
     # Inside the game loop
+    last_refresh = pygame.time.get_ticks()
     while run:
 
-        answer = answers[current_question_index]
+        # pick up questions added with addQuestion while this mode is open
+        if pygame.time.get_ticks() - last_refresh >= questionBank.REFRESH_INTERVAL:
+            last_refresh = pygame.time.get_ticks()
+            if bank.refresh() < 0:
+                # the files were rewritten and the bank got shorter
+                current_question_index = min(current_question_index, len(bank) - 1)
+                question_description_text = get_question_text()
+                question_number_text = get_question_number_text()
+                items = create_draggable_items()
+
+        answer = bank.answer(current_question_index)
 
-        WIN.blit(BG, (0, 0))
-        WIN.blit(question_number_text, (LEFT_MARGIN, TOP_MARGIN))
-        WIN.blit(question_description_text, (LEFT_MARGIN, TOP_MARGIN + 60))
+        screen.blit(question_number_text, (LEFT_MARGIN, TOP_MARGIN))
+        screen.blit(question_description_text, (LEFT_MARGIN, TOP_MARGIN + 60))
 
         # Draw the  buttons
-        next_question_button.draw(WIN, black)
-        prev_question_button.draw(WIN, black)
-        add_question_button.draw(WIN, black)
-        see_answer_button.draw(WIN,black)
-        back_button.draw(WIN, black)
+        next_question_button.draw(screen, black)
+        prev_question_button.draw(screen, black)
+        add_question_button.draw(screen, black)
+        see_answer_button.draw(screen, black)
+        back_button.draw(screen, black)
 
         for event in pygame.event.get():
+            screen.handle_event(event)
             if event.type == pygame.QUIT:
-                run = False
+                sceneManager.quit_game()
 
             for item in items:
                 item.handle_event(event)
@@ -297,8 +291,11 @@ def main():
                     main_menu()
                 if add_question_button.is_over(pygame.mouse.get_pos()):
                     run_script('addQuestion.py')
+                    screen.invalidate()
+                    # check for the new questions on the next frame
+                    last_refresh -= questionBank.REFRESH_INTERVAL
                 if next_question_button.is_over(mouse_pos):
-                    current_question_index = (current_question_index + 1) % len(questions)
+                    current_question_index = (current_question_index + 1) % len(bank)
                     question_description_text = get_question_text()
                     question_number_text = get_question_number_text()
                     items = create_draggable_items()
@@ -306,7 +303,7 @@ def main():
                     feedback_text = ""
 
                 if prev_question_button.is_over(mouse_pos):  # Check if 'Prev Question' button is clicked
-                    current_question_index = (current_question_index - 1) % len(questions)
+                    current_question_index = (current_question_index - 1) % len(bank)
                     question_description_text = get_question_text()
                     question_number_text = get_question_number_text()
                     items = create_draggable_items()
@@ -314,28 +311,26 @@ def main():
                     show_answer = not show_answer
 
         for item in items:
-            item.draw(WIN)
+            item.draw(screen)
 
         for blank in blanks:
-            pygame.draw.rect(WIN, black, (SOL_BOX_X, SOL_BOX_Y, 100, 50), outline_thickness)
+            screen.rect(black, (SOL_BOX_X, SOL_BOX_Y, 100, 50), outline_thickness)
 
         if feedback_text != "":
             if feedback_update:
-                feedback_message = font.render("Correct", True,(0, 255, 0))
+                feedback_message = textCache.render(font, "Correct", True,(0, 255, 0))
             else:
-                feedback_message = font.render("Wrong", True, red)
-            WIN.blit(feedback_message, (WIDTH // 2 - feedback_message.get_width() // 2, HEIGHT // 2))
+                feedback_message = textCache.render(font, "Wrong", True, red)
+            screen.blit(feedback_message, (WIDTH // 2 - feedback_message.get_width() // 2, HEIGHT // 2))
 
         if show_answer:
-            answer_text = smallfont.render(f"Answer: {answers[current_question_index]}", True, black)
-            WIN.blit(answer_text, (LEFT_MARGIN, ANSWER_BANK_Y-150))
+            answer_text = textCache.render(smallfont, f"Answer: {bank.answer(current_question_index)}", True, black)
+            screen.blit(answer_text, (LEFT_MARGIN, ANSWER_BANK_Y-150))
 
 
 
-        pygame.display.update()
+        screen.update()
         clock.tick(60)
 
-    pygame.quit()
-    sys.exit()
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sceneManager.run("instructorMode")
\ No newline at end of file
@@ -16,8 +16,13 @@ Date: 30/3/2024
 Version: 1.0
 """
 import pygame
-import sys
-import subprocess
+import sceneManager
+import gameStorage
+import assetManager
+import fontRegistry
+import textCache
+import headless
+import frameScheduler
 
 # Initialize the Pygame
 pygame.init()
@@ -32,14 +37,13 @@ pygame.mixer.music.play(-1, fade_ms=1000)
 
 
 # Get the screen size
-screen_info = pygame.display.Info()
-WIDTH, HEIGHT = screen_info.current_w, screen_info.current_h
+WIDTH, HEIGHT = headless.screen_size()
 
 WIN = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
 pygame.display.set_caption("Logic Quest")
 
 # load background image
-BG = pygame.transform.scale(pygame.image.load("backgrounds/bg_offwhite.jpg"),(WIDTH, HEIGHT))
+BG = assetManager.load_image("backgrounds/bg_offwhite.jpg", (WIDTH, HEIGHT))
 
 # colors
 WHITE = (255, 255, 255)
@@ -88,7 +92,7 @@ class Button:
 
 
         #text
-        self.text_surf = pygame.font.SysFont('Arial', 50).render(text, True, BLACK)
+        self.text_surf = textCache.render(fontRegistry.get_font('Arial', 50), text, True, BLACK)
         self.text_rect = self.text_surf.get_rect(center = self.top_rect.center)
 
 
@@ -122,80 +126,64 @@ class Button:
             self.top_color = self.main_color
 
         if self.pressed:
+            self.pressed = False
             if self.action:
                 self.action()
-            self.pressed = False
 
 def quit_game():
     """
     Quits the game and closes the application.
     """
-    pygame.quit()
-    sys.exit()
+    sceneManager.quit_game()
 
 def play_game():
     """
     Takes you to choose the game mode.
     """
     pygame.mixer.music.stop()
-    path = 'modemenu.py'
-    subprocess.run([sys.executable, path])
-    pygame.quit()
+    sceneManager.push("modemenu")
 
 def settings():
     """
     Opens the settings menu.
     """
     pygame.mixer.music.stop()
-    path = 'Settings.py'
-    subprocess.run([sys.executable, path])
-    pygame.quit()
+    sceneManager.push("Settings")
 
 def leaderboard():
     """
     Opens the leaderboard.
     """
     pygame.mixer.music.stop()
-    path = 'Leaderboard.py'
-    subprocess.run([sys.executable, path])
-    pygame.quit()
+    sceneManager.push("Leaderboard")
 
 def loadGame():
     """
     Loads the game.
     """
-    pygame.mixer.music.stop()
     current_user = None
     current_level = None
     with open('cur_username.txt', 'r') as file:
         current_user = file.read()
     
-    #parse through progress.txt until you find the current user
-    with open('progress.txt', 'r') as file:
-        for line in file:
-            if line.startswith(current_user):
-                #go to next line
-                line = file.readline()
-                current_level = line
-
-    # if current_user is still None 
-    if current_user == None:
+    current_level = gameStorage.get_storage().load_progress(current_user)
+
+    # if the current user has never saved a game
+    if current_level is None:
         #print error message on screen 
-        font = pygame.font.SysFont('Arial', 35)
-        text = font.render("No saved game found", True, BLACK)
+        font = fontRegistry.get_font('Arial', 35)
+        text = textCache.render(font, "No saved game found", True, BLACK)
         WIN.blit(text, (WIDTH/2 - text.get_width()/2, HEIGHT - 50))
         pygame.display.update()
         # break out of method
         return
     
+    pygame.mixer.music.stop()
     #write the current level to load.txt
     with open('load.txt', 'w') as file:
-        if current_level != None: 
-            file.write(current_level)
+        file.write(str(current_level))
     
-    path = 'trainingMode.py'
-    subprocess.run([sys.executable, path])
-    pygame.quit()
+    sceneManager.push("trainingMode")
 
 
 
@@ -214,12 +202,16 @@ def main():
     global WIN
     run = True
     WIN.blit(BG, (0,0))
+    # the music is stopped when another screen is opened, start it again on return
+    if not pygame.mixer.music.get_busy():
+        pygame.mixer.music.play(-1, fade_ms=1000)
 
+    # sleeps until the next input while nothing on the screen is moving
+    scheduler = frameScheduler.FrameScheduler()
     while run:
-        for event in pygame.event.get():
+        for event in scheduler.events():
             if event.type == pygame.QUIT:
-                run = False
-                break
+                sceneManager.quit_game()
             '''
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
@@ -230,8 +222,8 @@ def main():
                 WIN = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
 
         # draw a title on screen
-        font = pygame.font.SysFont('Arial', 100)
-        text = font.render("LOGIC QUEST", True, BLACK)
+        font = fontRegistry.get_font('Arial', 100)
+        text = textCache.render(font, "LOGIC QUEST", True, BLACK)
         WIN.blit(text, (WIDTH/2 - text.get_width()/2, 100))
 
         # draw the buttons
@@ -242,28 +234,25 @@ def main():
         quit_button.draw()
 
         # write text
-        font = pygame.font.SysFont('Arial', 35)
-        text = font.render("Authors: Kassem Kanjo, Muzzammil Mudathir, Aryaman Arora, Michael Peter Timothy Turkstra", True, BLACK)
+        font = fontRegistry.get_font('Arial', 35)
+        text = textCache.render(font, "Authors: Kassem Kanjo, Muzzammil Mudathir, Aryaman Arora, Michael Peter Timothy Turkstra", True, BLACK)
         WIN.blit(text, (WIDTH/2 - text.get_width()+1200/2, HEIGHT - 250))
         # make second half of the text
-        text = font.render("Mohammad Shayaan Shahid", True, BLACK)
+        text = textCache.render(font, "Mohammad Shayaan Shahid", True, BLACK)
         WIN.blit(text, (WIDTH/2 - text.get_width()/2, HEIGHT - 210))
-        text = font.render("Team 31", True, BLACK)
+        text = textCache.render(font, "Team 31", True, BLACK)
         WIN.blit(text, (WIDTH/2 - text.get_width()/2, HEIGHT - 165))
-        text = font.render("Winter 2023-2024", True, BLACK)
+        text = textCache.render(font, "Winter 2023-2024", True, BLACK)
         WIN.blit(text, (WIDTH/2 - text.get_width()/2, HEIGHT - 120))
-        text = font.render("Created as part of CS 2212 at Western University", True, BLACK)
+        text = textCache.render(font, "Created as part of CS 2212 at Western University", True, BLACK)
         WIN.blit(text, (WIDTH/2 - text.get_width()/2, HEIGHT - 75))
         # write 'ESC to quit' text
-        font = pygame.font.SysFont('Arial', 35)
-        text = font.render("ESC to quit", True, BLACK)
+        font = fontRegistry.get_font('Arial', 35)
+        text = textCache.render(font, "ESC to quit", True, BLACK)
         WIN.blit(text, (10, 10))
 
         pygame.display.update()
-    pygame.quit()
-    #stop the music
-    pygame.mixer.music.stop()
-    sys.exit()
+        scheduler.tick()
 
 if __name__ == "__main__":
-    main()
+    sceneManager.run("landingPage")
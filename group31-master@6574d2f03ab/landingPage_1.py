@@ -16,8 +16,12 @@ Date: 30/3/2024
 Version: 1.0
 """
 import pygame
-import sys
-import subprocess
+import sceneManager
+import assetManager
+import fontRegistry
+import textCache
+import headless
+import frameScheduler
 
 # Initialize the Pygame
 pygame.init()
@@ -32,14 +36,13 @@ pygame.mixer.music.play(-1, fade_ms=1000)
 
 
 # Get the screen size
-screen_info = pygame.display.Info()
-WIDTH, HEIGHT = screen_info.current_w, screen_info.current_h
+WIDTH, HEIGHT = headless.screen_size()
 
 WIN = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
 pygame.display.set_caption("Logic Quest")
 
 # load background image
-BG = pygame.transform.scale(pygame.image.load("backgrounds/bg_offwhite.jpg"),(WIDTH, HEIGHT))
+BG = assetManager.load_image("backgrounds/bg_offwhite.jpg", (WIDTH, HEIGHT))
 
 # colors
 WHITE = (255, 255, 255)
@@ -88,7 +91,7 @@ class Button:
 
 
         #text
-        self.text_surf = pygame.font.SysFont('Arial', 50).render(text, True, BLACK)
+        self.text_surf = textCache.render(fontRegistry.get_font('Arial', 50), text, True, BLACK)
         self.text_rect = self.text_surf.get_rect(center = self.top_rect.center)
 
 
@@ -122,43 +125,36 @@ class Button:
             self.top_color = self.main_color
 
         if self.pressed:
+            self.pressed = False
             if self.action:
                 self.action()
-            self.pressed = False
 
 def quit_game():
     """
     Quits the game and closes the application.
     """
-    pygame.quit()
-    sys.exit()
+    sceneManager.quit_game()
 
 def play_game():
     """
     Takes you to choose the game mode.
     """
     pygame.mixer.music.stop()
-    path = 'modemenu_1.py'
-    subprocess.run([sys.executable, path])
-    pygame.quit()
+    sceneManager.push("modemenu_1")
 
 def settings():
     """
     Opens the settings menu.
     """
     pygame.mixer.music.stop()
-    path = 'Settings.py'
-    subprocess.run([sys.executable, path])
-    pygame.quit()
+    sceneManager.push("Settings")
 
 def leaderboard():
     """
     Opens the leaderboard.
     """
     pygame.mixer.music.stop()
-    path = 'Leaderboard.py'
-    subprocess.run([sys.executable, path])
-    pygame.quit()
+    sceneManager.push("Leaderboard")
 
 
 
@@ -176,12 +172,16 @@ def main():
     global WIN
     run = True
     WIN.blit(BG, (0,0))
+    # the music is stopped when another screen is opened, start it again on return
+    if not pygame.mixer.music.get_busy():
+        pygame.mixer.music.play(-1, fade_ms=1000)
 
+    # sleeps until the next input while nothing on the screen is moving
+    scheduler = frameScheduler.FrameScheduler()
     while run:
-        for event in pygame.event.get():
+        for event in scheduler.events():
             if event.type == pygame.QUIT:
-                run = False
-                break
+                sceneManager.quit_game()
             '''
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
@@ -192,8 +192,8 @@ def main():
                 WIN = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
 
         # draw a title on screen
-        font = pygame.font.SysFont('Arial', 100)
-        text = font.render("LOGIC QUEST", True, BLACK)
+        font = fontRegistry.get_font('Arial', 100)
+        text = textCache.render(font, "LOGIC QUEST", True, BLACK)
         WIN.blit(text, (WIDTH/2 - text.get_width()/2, 100))
 
         # draw the buttons
@@ -204,26 +204,25 @@ def main():
         quit_button.draw()
 
         # write text
-        font = pygame.font.SysFont('Arial', 35)
-        text = font.render("Authors: Kassem Kanjo, Muzzammil Mudathir, Aryaman Arora, Michael Peter Timothy Turkstra", True, BLACK)
+        font = fontRegistry.get_font('Arial', 35)
+        text = textCache.render(font, "Authors: Kassem Kanjo, Muzzammil Mudathir, Aryaman Arora, Michael Peter Timothy Turkstra", True, BLACK)
         WIN.blit(text, (WIDTH/2 - text.get_width()+1200/2, HEIGHT - 250))
         # make second half of the text
-        text = font.render("Mohammad Shayaan Shahid", True, BLACK)
+        text = textCache.render(font, "Mohammad Shayaan Shahid", True, BLACK)
         WIN.blit(text, (WIDTH/2 - text.get_width()/2, HEIGHT - 210))
-        text = font.render("Team 31", True, BLACK)
+        text = textCache.render(font, "Team 31", True, BLACK)
         WIN.blit(text, (WIDTH/2 - text.get_width()/2, HEIGHT - 165))
-        text = font.render("Winter 2023-2024", True, BLACK)
+        text = textCache.render(font, "Winter 2023-2024", True, BLACK)
         WIN.blit(text, (WIDTH/2 - text.get_width()/2, HEIGHT - 120))
-        text = font.render("Created as part of CS 2212 at Western University", True, BLACK)
+        text = textCache.render(font, "Created as part of CS 2212 at Western University", True, BLACK)
         WIN.blit(text, (WIDTH/2 - text.get_width()/2, HEIGHT - 75))
         # write 'ESC to quit' text
-        font = pygame.font.SysFont('Arial', 35)
-        text = font.render("ESC to quit", True, BLACK)
+        font = fontRegistry.get_font('Arial', 35)
+        text = textCache.render(font, "ESC to quit", True, BLACK)
         WIN.blit(text, (10, 10))
 
         pygame.display.update()
-    pygame.quit()
-    sys.exit()
+        scheduler.tick()
 
 if __name__ == "__main__":
-    main()
+    sceneManager.run("landingPage_1")
@@ -0,0 +1,261 @@
+"""
+Score Server Load Test for Logic Quest
+
+This module is a command line tool that simulates many lightning mode players using the
+score server at the same time. Every simulated player waits a random think time, submits
+a score, then reads the first leaderboard page and its own rank, like the game does at
+the end of a round. At the end it reports the throughput, the p50 and p99 latency and
+the errors of every kind of request.
+
+By default it starts its own score server on localhost with a temporary database, so it
+needs nothing else to run. That server runs in its own thread with its own event loop, so
+the simulated players do not slow it down. Use --host and --port to load an already
+running server. A request that gets no reply within --timeout seconds counts as an error.
+
+Usage:
+    python loadTest.py [--clients N] [--duration SECONDS] [--think-time SECONDS]
+                       [--timeout SECONDS] [--host HOST --port PORT]
+
+Classes:
+    LoadStats: Collects the latency and errors of every kind of request.
+
+Functions:
+    run_client(host, port, number, stop_at, think_time, stats, timeout): Simulates one player.
+    run_load(host, port, clients, duration, think_time, timeout): Simulates many players at once.
+    start_server(storage): Starts a score server in its own thread.
+    run_local(clients, duration, think_time, timeout): Runs the load against a temporary local server.
+    main(argv): Runs the command line tool.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+import gameStorage
+import scoreServer
+import timingStats
+
+OPERATIONS = ('submit', 'page', 'rank')
+
+# seconds a request may take before it counts as an error
+REQUEST_TIMEOUT = 5.0
+
+
+class LoadStats:
+    """
+    Collects the latency and errors of every kind of request.
+
+    Attributes:
+        latencies (dict[str, list[float]]): Seconds taken by each successful request.
+        errors (dict[str, int]): The number of failed requests.
+
+    Methods:
+        record(op, seconds): Records a successful request.
+        fail(op): Records a failed request.
+        report(duration): Returns the results as text.
+    """
+    def __init__(self):
+        self.latencies = {op: [] for op in OPERATIONS}
+        self.errors = {op: 0 for op in OPERATIONS}
+
+    def record(self, op, seconds):
+        self.latencies[op].append(seconds)
+
+    def fail(self, op):
+        self.errors[op] += 1
+
+    def report(self, duration):
+        """
+        Returns the results as text, one line per kind of request.
+
+        Args:
+            duration (float): The length of the run in seconds.
+
+        Returns:
+            str: The report.
+        """
+        lines = [f"{'request':<8}{'count':>8}{'per s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}"]
+        for op in OPERATIONS:
+            values = sorted(self.latencies[op])
+            lines.append(f"{op:<8}{len(values):>8}{len(values) / duration:>10.1f}"
+                         f"{timingStats.percentile(values, 0.5) * 1000:>10.2f}{timingStats.percentile(values, 0.99) * 1000:>10.2f}"
+                         f"{self.errors[op]:>8}")
+        return '\n'.join(lines)
+
+
+async def exchange(reader, writer, line):
+    writer.write(line)
+    await writer.drain()
+    return await reader.readline()
+
+
+async def run_client(host, port, number, stop_at, think_time, stats, timeout=REQUEST_TIMEOUT):
+    """
+    Simulates one lightning mode player until stop_at. A request that takes longer than
+    timeout is recorded as failed and the connection is opened again.
+
+    Args:
+        host (str): The address of the score server.
+        port (int): The port of the score server.
+        number (int): The number of the player, used for its name.
+        stop_at (float): The time.monotonic() time to stop at.
+        think_time (float): The average seconds between two rounds.
+        stats (LoadStats): Where the results are recorded.
+        timeout (float): Seconds to wait for the connection and for each reply.
+    """
+    name = f"load{number}"
+    reader = writer = None
+    while time.monotonic() < stop_at:
+        await asyncio.sleep(random.uniform(0, 2 * think_time))
+        requests = [
+            ('submit', {'name': name, 'mode': gameStorage.LIGHTNING, 'score': random.randint(0, 100)}),
+            ('page', {'mode': gameStorage.LIGHTNING, 'start': 0, 'count': 5}),
+            ('rank', {'name': name, 'mode': gameStorage.LIGHTNING}),
+        ]
+        for op, arguments in requests:
+            start = time.perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+                line = json.dumps(dict(arguments, op=op)).encode() + b'\n'
+                reply = json.loads(await asyncio.wait_for(exchange(reader, writer, line), timeout))
+                if not reply.get('ok'):
+                    raise ValueError(reply.get('error'))
+            except (OSError, ValueError, asyncio.TimeoutError):
+                stats.fail(op)
+                if writer is not None:
+                    writer.close()
+                reader = writer = None
+                continue
+            stats.record(op, time.perf_counter() - start)
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(host, port, clients, duration, think_time, timeout=REQUEST_TIMEOUT):
+    """
+    Simulates many lightning mode players at once.
+
+    Args:
+        host (str): The address of the score server.
+        port (int): The port of the score server.
+        clients (int): How many players to simulate.
+        duration (float): How many seconds to run for.
+        think_time (float): The average seconds between two rounds of a player.
+        timeout (float): Seconds to wait for each reply.
+
+    Returns:
+        LoadStats: The results.
+    """
+    stats = LoadStats()
+    stop_at = time.monotonic() + duration
+    await asyncio.gather(*(run_client(host, port, i, stop_at, think_time, stats, timeout) for i in range(clients)))
+    return stats
+
+
+def start_server(storage):
+    """
+    Starts a score server on localhost in its own thread with its own event loop, so it
+    does not share the event loop of the simulated players.
+
+    Args:
+        storage (gameStorage.GameStorage): The database of the server, opened with
+            check_same_thread=False.
+
+    Returns:
+        tuple[int, callable]: The port the server listens on, and a function that stops
+        the server and waits for its thread.
+
+    Raises:
+        RuntimeError: If the server could not start.
+    """
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    ports = []
+
+    def started(server):
+        ports.append(server.sockets[0].getsockname()[1])
+        ready.set()
+
+    task = loop.create_task(scoreServer.serve(scoreServer.ScoreService(storage), port=0, started=started))
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            loop.close()
+            ready.set()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    ready.wait()
+
+    def stop():
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(task.cancel)
+        thread.join()
+
+    if not ports:
+        stop()
+        raise RuntimeError("the score server could not start")
+    return ports[0], stop
+
+
+async def run_local(clients, duration, think_time, timeout=REQUEST_TIMEOUT):
+    """
+    Runs the load against a score server started on localhost with a temporary database.
+
+    Args:
+        clients (int): How many players to simulate.
+        duration (float): How many seconds to run for.
+        think_time (float): The average seconds between two rounds of a player.
+        timeout (float): Seconds to wait for each reply.
+
+    Returns:
+        LoadStats: The results.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        storage = gameStorage.GameStorage(os.path.join(directory, 'load.db'), check_same_thread=False)
+        try:
+            port, stop = await asyncio.to_thread(start_server, storage)
+            try:
+                return await run_load('127.0.0.1', port, clients, duration, think_time, timeout)
+            finally:
+                await asyncio.to_thread(stop)
+        finally:
+            storage.close()
+
+
+def main(argv=None):
+    """
+    Runs the command line tool.
+
+    Args:
+        argv (list[str]): The command line arguments, sys.argv[1:] by default.
+    """
+    parser = argparse.ArgumentParser(description="Simulate many players using the score server.")
+    parser.add_argument('--clients', type=int, default=200, help="players to simulate")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds to run for")
+    parser.add_argument('--think-time', type=float, default=1.0, help="average seconds between two rounds")
+    parser.add_argument('--timeout', type=float, default=REQUEST_TIMEOUT, help="seconds a request may take")
+    parser.add_argument('--host', help="address of a running score server, a local one is started if omitted")
+    parser.add_argument('--port', type=int, default=scoreServer.DEFAULT_PORT, help="port of the running score server")
+    args = parser.parse_args(argv)
+
+    if args.host:
+        stats = asyncio.run(run_load(args.host, args.port, args.clients, args.duration, args.think_time,
+                                     args.timeout))
+    else:
+        stats = asyncio.run(run_local(args.clients, args.duration, args.think_time, args.timeout))
+    print(f"{args.clients} clients for {args.duration:g} s, think time {args.think_time:g} s")
+    print(stats.report(args.duration))
+
+
+if __name__ == "__main__":
+    main()
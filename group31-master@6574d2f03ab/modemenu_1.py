@@ -14,8 +14,12 @@ Date: 30/3/2024
 Version: 1.0
 """
 import pygame
-import sys
-import subprocess
+import sceneManager
+import assetManager
+import fontRegistry
+import textCache
+import headless
+import frameScheduler
 
 # Initialize the Pygame
 pygame.init()
@@ -23,14 +27,13 @@ pygame.init()
 pygame.font.init()
 
 # Get the screen size
-screen_info = pygame.display.Info()
-WIDTH, HEIGHT = screen_info.current_w, screen_info.current_h
+WIDTH, HEIGHT = headless.screen_size()
 
 WIN = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
 pygame.display.set_caption("Logic Quest")
 
 # load background image
-BG = pygame.transform.scale(pygame.image.load("backgrounds/bg_offwhite.jpg"), (WIDTH, HEIGHT))
+BG = assetManager.load_image("backgrounds/bg_offwhite.jpg", (WIDTH, HEIGHT))
 
 # colors
 WHITE = (255, 255, 255)
@@ -83,7 +86,7 @@ class Button:
         self.bottom_color = BLACK
 
         # text
-        self.text_surf = pygame.font.SysFont('Arial', 50).render(text, True, BLACK)
+        self.text_surf = textCache.render(fontRegistry.get_font('Arial', 50), text, True, BLACK)
         self.text_rect = self.text_surf.get_rect(center=self.top_rect.center)
 
     def draw(self, win):
@@ -123,14 +126,14 @@ class Button:
             if current_description == self.description:
                 current_description = ""
         if self.pressed:
+            self.pressed = False
             if self.action:
                 self.action()
-            self.pressed = False
 
     def show_description(self, win):
         # Display description text on hover
         if self.description:
-            description_surf = pygame.font.SysFont('Arial', 30).render(self.description, True, BLACK)
+            description_surf = textCache.render(fontRegistry.get_font('Arial', 30), self.description, True, BLACK)
             description_rect = description_surf.get_rect(center=(WIDTH / 2, HEIGHT - 200))
             pygame.draw.rect(win, '#0096FF', description_rect.inflate(30, 10), border_radius=5)
             win.blit(description_surf, description_rect)
@@ -140,9 +143,7 @@ def main_menu():
     """
     Returns to the main menu of the application.
     """
-    path = "landingPage_1.py"
-    subprocess.run([sys.executable, path])
-    pygame.quit()
+    sceneManager.pop()
 
 
 def tutorial():
@@ -150,21 +151,15 @@ def tutorial():
     Starts the tutorial of the game.
     """
     pygame.mixer.music.stop()
-    path = 'tutorial.py'
-    subprocess.run([sys.executable, path])
-    pygame.quit()
+    sceneManager.push("tutorial")
 
 
 def instructor_mode():
-    path = "instructorMode.py"
-    subprocess.run([sys.executable, path])
-    pygame.quit()
+    sceneManager.push("instructorMode")
 
 
 def developer_mode():
-    path = "developerMode.py"
-    subprocess.run([sys.executable, path])
-    pygame.quit()
+    sceneManager.push("developerMode")
 
 
 def main():
@@ -174,7 +169,6 @@ def main():
     global WIN, current_description
     run = True
     WIN.blit(BG, (0, 0))
-    clock = pygame.time.Clock()
 
     # Initialize buttons with descriptions
     buttons = [
@@ -186,11 +180,12 @@ def main():
         Button("BACK TO MAIN MENU", '#89CFF0', 460, 80, (WIDTH / 2 - 460 / 2, HEIGHT / 2 + 150), 6, action=main_menu)
     ]
 
+    # sleeps until the next input while nothing on the screen is moving
+    scheduler = frameScheduler.FrameScheduler()
     while run:
-        for event in pygame.event.get():
+        for event in scheduler.events():
             if event.type == pygame.QUIT:
-                run = False
-                break
+                sceneManager.quit_game()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     run = False
@@ -200,8 +195,8 @@ def main():
                 # draw()
 
         # draw a title on screen
-        font = pygame.font.SysFont('Arial', 100)
-        text = font.render("GAME MODES", True, BLACK)
+        font = fontRegistry.get_font('Arial', 100)
+        text = textCache.render(font, "GAME MODES", True, BLACK)
         WIN.blit(text, (WIDTH / 2 - text.get_width() / 2, 100))
 
         # Clear the screen before drawing buttons
@@ -213,11 +208,8 @@ def main():
             button.draw(WIN)
 
         pygame.display.update()
-        clock.tick(40)
-
-    pygame.quit()
-    sys.exit()
+        scheduler.tick()
 
 
 if __name__ == "__main__":
-    main()
+    sceneManager.run("modemenu_1")
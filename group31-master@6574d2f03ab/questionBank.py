@@ -0,0 +1,701 @@
+"""
+Question Bank for Logic Quest
+
+This module reads the question files (questions.txt, options.txt, answers.txt and
+difficulty.txt) once per process and keeps them in memory, so every game mode shares
+the same parsed questions instead of reading the files again each time it starts.
+
+Questions are addressed by their position in questions.txt, starting at 0, which is the
+same number the game modes keep in current_question_index.
+
+The bank remembers how much of each file it has read and a CRC-32 of the last
+CHECK_BYTES bytes of that part. Calling refresh() on it reads only the entries appended
+since then, for example by addQuestion, so a running game mode picks up new questions
+without reading the whole bank again. A file that got shorter, or whose last read bytes
+changed, is read again from the start. Only those last bytes are checked, so an append
+costs the same whatever the size of the file.
+
+The text files can also be compiled into one binary file (questions.bank) by running
+this module as a script. The compiled bank is opened with mmap and only the questions
+that are shown are decoded, so opening it takes the same time whatever the size of the
+bank. get_bank() uses the compiled bank while it matches the text files it was built
+from, and falls back to reading the text files otherwise.
+
+New questions are appended with append_questions(). The next free index of every text
+file is kept in a small sidecar file (bank_index.txt) together with the size and
+modification time of the file, so adding questions is one write per text file instead
+of reading each file to find its last index. The sidecar is rebuilt from the end of a
+file whenever the file was changed by something else.
+
+Compiled bank layout (little endian):
+    header: magic, version, record/option set/option item/string counts, the number of
+        entries of each text file, then the number of bytes read and the modification
+        time of each text file it was built from, then the CRC-32 of the last
+        CHECK_BYTES of those bytes
+    records: (question string, option set, answer string, difficulty) per entry of the
+        longest text file
+    option sets: (first option item, option count) per distinct option set
+    option items: string number of every option of every option set
+    string offsets: start of every string in the pool, plus the end of the pool
+    string pool: every distinct string, UTF-8 encoded
+
+Classes:
+    QuestionBank: Holds the question, options, answer and difficulty of every question.
+    MappedQuestionBank: Reads questions from a compiled bank file on demand.
+
+Functions:
+    read_indexed(file_name): Reads a file made of "index.text" lines.
+    parse_difficulty(text): Parses the difficulty of one question.
+    read_options(file_name): Reads the blank line separated option sets of options.txt.
+    entry_boundary(data, offset, file_name): Checks that an offset falls between two entries.
+    compile_bank(directory, bank_file): Compiles the text files into a binary bank.
+    open_bank(directory): Opens the compiled bank, or the text files if it is out of date.
+    get_bank(): Returns the question bank shared by the whole process.
+    last_index(file_name): Finds the index of the last entry of a text file.
+    read_index(directory): Reads the next free index of every text file from the sidecar.
+    append_entries(directory, file_name, entries, index): Appends entries to one text file.
+    append_questions(questions, directory): Appends whole questions to the text files.
+"""
+import mmap
+import os
+import struct
+import zlib
+
+QUESTIONS_FILE = 'questions.txt'
+OPTIONS_FILE = 'options.txt'
+ANSWERS_FILE = 'answers.txt'
+DIFFICULTY_FILE = 'difficulty.txt'
+BANK_FILE = 'questions.bank'
+INDEX_FILE = 'bank_index.txt'
+
+# how often (ms) a running game mode checks the text files for new questions
+REFRESH_INTERVAL = 1000
+
+# the difficulties a question can have, the range of the signed 32 bit field of the compiled bank
+DIFFICULTY_RANGE = (-2 ** 31, 2 ** 31 - 1)
+
+SOURCE_FILES = (QUESTIONS_FILE, OPTIONS_FILE, ANSWERS_FILE, DIFFICULTY_FILE)
+
+# how many bytes before the end of the read part of a text file are checked for changes
+CHECK_BYTES = 4096
+
+BANK_MAGIC = b'LQB\0'
+BANK_VERSION = 4
+HEADER = struct.Struct('<4sHHIIII' + 'I' * len(SOURCE_FILES) + 'qq' * len(SOURCE_FILES) + 'I' * len(SOURCE_FILES))
+RECORD = struct.Struct('<IIIi')
+OPTION_SET = struct.Struct('<II')
+INDEX = struct.Struct('<I')
+
+
+def parse_indexed(text):
+    """
+    Parses lines made of "index.text", such as the lines of questions.txt or answers.txt.
+
+    Args:
+        text (str): The lines to parse.
+
+    Returns:
+        list[str]: The text after the first dot of every line that has one.
+    """
+    entries = []
+    for line in text.splitlines():
+        if '.' in line:
+            # Split line at the first dot and take the second part
+            entries.append(line.split('.', 1)[1].strip())
+    return entries
+
+
+def parse_difficulty(text):
+    """
+    Parses the difficulty of one question.
+
+    Args:
+        text (str): The difficulty as written in difficulty.txt.
+
+    Returns:
+        int: The difficulty, or None if it is not an integer the compiled bank can hold.
+    """
+    try:
+        difficulty = int(text)
+    except ValueError:
+        return None
+    return difficulty if DIFFICULTY_RANGE[0] <= difficulty <= DIFFICULTY_RANGE[1] else None
+
+
+def parse_options(text):
+    """
+    Parses option sets, where every set is an "index." line followed by one option per
+    line, and sets are separated by a blank line.
+
+    Args:
+        text (str): The option sets to parse.
+
+    Returns:
+        list[list[str]]: The options of every set, without the index line. A set that
+        is only an index line has no options, but still takes its place.
+    """
+    options = []
+    for option in text.split('\n\n'):
+        lines = option.strip().split('\n')
+        if lines[0].strip().endswith('.'):
+            options.append(lines[1:])
+        elif lines != ['']:
+            options.append(lines)
+    return options
+
+
+def entry_boundary(data, offset, file_name):
+    """
+    Checks that an offset falls between two entries of a text file, so the text after it
+    can be parsed on its own. Entries are lines, or blank line separated sets in options.txt.
+
+    Args:
+        data (bytes): The start of the file, at least up to offset.
+        offset (int): The offset to check.
+        file_name (str): The name of the text file.
+
+    Returns:
+        bool: True if the offset is the start or end of the file or touches a separator.
+    """
+    separator = b'\n\n' if file_name == OPTIONS_FILE else b'\n'
+    if offset == 0 or offset >= len(data):
+        return True
+    return separator in data[max(0, offset - len(separator)):offset + len(separator)]
+
+
+def read_indexed(file_name):
+    """
+    Reads a file made of "index.text" lines, such as questions.txt or answers.txt.
+
+    Args:
+        file_name (str): The path of the file.
+
+    Returns:
+        list[str]: The text after the first dot of every line that has one.
+    """
+    with open(file_name, 'r') as f:
+        return parse_indexed(f.read())
+
+
+def read_options(file_name):
+    """
+    Reads the blank line separated option sets of options.txt.
+
+    Args:
+        file_name (str): The path of the options file.
+
+    Returns:
+        list[list[str]]: The options of every set, without the index line.
+    """
+    with open(file_name, 'r') as f:
+        return parse_options(f.read())
+
+
+class QuestionBank:
+    """
+    Holds every question of the game in memory.
+
+    Every text file is kept as one list of entries, so looking a question up by its
+    number is a single list index. Identical option sets are stored once and shared
+    between the questions that use them.
+
+    The bank remembers how far it has read each file. refresh() checks the size and
+    modification time of the files and only parses what was appended since the last
+    read, so questions added with addQuestion show up without reading the whole bank
+    again. When a file changed, the last CHECK_BYTES of the part already read are
+    compared with their CRC-32 first: a file that got shorter or was edited there is read
+    again from the start.
+
+    Attributes:
+        directory (str): The folder that holds the question files.
+        columns (list[list]): Entries read from each text file, in SOURCE_FILES order.
+        offsets (list[int]): How many bytes of each text file have been read.
+        stamps (list[tuple]): Size and modification time of each file when it was read.
+        checksums (list[int]): CRC-32 of the last CHECK_BYTES read from each text file.
+
+    Methods:
+        load(): Reads the question files into the bank from the start.
+        refresh(): Reads the entries appended to the question files since the last read.
+        rewritten(): Checks if a question file was changed other than by appending.
+        question(index): Returns the text of a question.
+        options(index): Returns the answer options of a question.
+        answer(index): Returns the correct answer of a question.
+        difficulty(index): Returns the difficulty (points) of a question.
+    """
+    def __init__(self, directory='.'):
+        self.directory = directory
+        self.load()
+
+    def path(self, file_name):
+        return os.path.join(self.directory, file_name)
+
+    def load(self):
+        self.base_counts = [0] * len(SOURCE_FILES)
+        self.columns = [[] for _ in SOURCE_FILES]
+        self.offsets = [0] * len(SOURCE_FILES)
+        self.stamps = [(0, 0)] * len(SOURCE_FILES)
+        self.checksums = [0] * len(SOURCE_FILES)
+        self.shared_options = {}
+        self.refresh()
+
+    def stat(self, column):
+        try:
+            stat = os.stat(self.path(SOURCE_FILES[column]))
+        except FileNotFoundError:
+            return (0, 0)
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def rewritten(self):
+        """
+        Checks if a question file was changed other than by appending to it.
+
+        Returns:
+            bool: True if a file got shorter, the end of the part already read was
+            changed, or the read part no longer ends between two entries.
+        """
+        for column, file_name in enumerate(SOURCE_FILES):
+            stamp = self.stat(column)
+            if stamp == self.stamps[column]:
+                continue
+            offset = self.offsets[column]
+            if stamp[0] < offset:
+                return True
+            if offset == 0:
+                continue
+            start = max(0, offset - CHECK_BYTES)
+            with open(self.path(file_name), 'rb') as f:
+                f.seek(start)
+                # two bytes past the read part show whether it still ends between entries
+                data = f.read(offset - start + 2)
+            if (zlib.crc32(data[:offset - start]) != self.checksums[column]
+                    or not entry_boundary(data, offset - start, file_name)):
+                return True
+        return False
+
+    def refresh(self):
+        """
+        Reads the entries appended to the question files since they were last read.
+
+        Returns:
+            int: The number of questions added to the bank.
+        """
+        before = len(self)
+        if self.rewritten():
+            self.load()
+            return len(self) - before
+
+        for column, file_name in enumerate(SOURCE_FILES):
+            stamp = self.stat(column)
+            if stamp == self.stamps[column]:
+                continue
+            offset = self.offsets[column]
+            start = max(0, offset - CHECK_BYTES)
+            with open(self.path(file_name), 'rb') as f:
+                f.seek(start)
+                data = f.read()
+            tail = data[offset - start:]
+            self.offsets[column] += len(tail)
+            self.stamps[column] = stamp
+            self.checksums[column] = zlib.crc32(data[-CHECK_BYTES:])
+            text = tail.decode('utf-8').replace('\r\n', '\n')
+
+            if file_name == OPTIONS_FILE:
+                for option in parse_options(text):
+                    option = tuple(option)
+                    self.columns[column].append(self.shared_options.setdefault(option, option))
+            elif file_name == DIFFICULTY_FILE:
+                for dif in parse_indexed(text):
+                    difficulty = parse_difficulty(dif)
+                    if difficulty is None:
+                        # keep the entry, so the difficulties of later questions stay in line
+                        print(f"Invalid difficulty in {file_name}: {dif!r}, using 0")
+                        difficulty = 0
+                    self.columns[column].append(difficulty)
+            else:
+                self.columns[column] += parse_indexed(text)
+        return len(self) - before
+
+    def base_value(self, column, index):
+        raise IndexError("question index out of range")
+
+    def value(self, column, index, default):
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("question index out of range")
+        if index < self.base_counts[column]:
+            return self.base_value(column, index)
+        index -= self.base_counts[column]
+        entries = self.columns[column]
+        return entries[index] if index < len(entries) else default
+
+    def __len__(self):
+        return self.base_counts[0] + len(self.columns[0])
+
+    def __getitem__(self, index):
+        return (self.question(index), self.options(index), self.answer(index), self.difficulty(index))
+
+    def question(self, index):
+        return self.value(0, index, '')
+
+    def options(self, index):
+        return self.value(1, index, ())
+
+    def answer(self, index):
+        return self.value(2, index, '')
+
+    def difficulty(self, index):
+        return self.value(3, index, 0)
+
+
+def compile_bank(directory='.', bank_file=None):
+    """
+    Compiles the text files of the bank into one binary file. Strings and option sets
+    that appear more than once are stored only once.
+
+    Args:
+        directory (str): The folder that holds the question files.
+        bank_file (str): Where to write the compiled bank, questions.bank by default.
+
+    Returns:
+        int: The number of questions written.
+    """
+    if bank_file is None:
+        bank_file = os.path.join(directory, BANK_FILE)
+    bank = QuestionBank(directory)
+    stamps = [value for offset, (_, mtime) in zip(bank.offsets, bank.stamps) for value in (offset, mtime)]
+    counts = [len(entries) for entries in bank.columns]
+    rows = max(counts)
+
+    strings = {}
+    set_ids = {}
+    option_sets = []
+    option_items = []
+
+    def string_id(text):
+        return strings.setdefault(text, len(strings))
+
+    def entry(column, index, default):
+        entries = bank.columns[column]
+        return entries[index] if index < len(entries) else default
+
+    # a row is written for every entry of the longest file, so that a question appended
+    # later lines up with the answer or difficulty that is already waiting for it
+    records = []
+    for i in range(rows):
+        options = entry(1, i, ())
+        if options not in set_ids:
+            set_ids[options] = len(option_sets)
+            option_sets.append((len(option_items), len(options)))
+            option_items.extend(string_id(option) for option in options)
+        records.append((string_id(entry(0, i, '')), set_ids[options],
+                        string_id(entry(2, i, '')), entry(3, i, 0)))
+
+    pool = [text.encode('utf-8') for text in strings]
+
+    # write to a temporary file first, running games may have the old bank mapped
+    with open(bank_file + '.tmp', 'wb') as f:
+        f.write(HEADER.pack(BANK_MAGIC, BANK_VERSION, 0, rows, len(option_sets),
+                            len(option_items), len(pool), *counts, *stamps, *bank.checksums))
+        for record in records:
+            f.write(RECORD.pack(*record))
+        for start, count in option_sets:
+            f.write(OPTION_SET.pack(start, count))
+        for item in option_items:
+            f.write(INDEX.pack(item))
+        offset = 0
+        for data in pool:
+            f.write(INDEX.pack(offset))
+            offset += len(data)
+        f.write(INDEX.pack(offset))
+        for data in pool:
+            f.write(data)
+    os.replace(bank_file + '.tmp', bank_file)
+    return counts[0]
+
+
+class MappedQuestionBank(QuestionBank):
+    """
+    Reads questions from a compiled bank file. The file is mapped into memory and a
+    question is only decoded when it is asked for, so opening the bank does not depend
+    on how many questions it holds.
+
+    Entries appended to the text files after the bank was compiled are read by
+    refresh() and kept in memory after the compiled ones, like in QuestionBank.
+
+    Attributes:
+        bank_file (str): The path of the compiled bank.
+        compiled_counts (list[int]): Number of entries of each text file in the compiled bank.
+
+    Methods:
+        close(): Releases the mapped file.
+    """
+    def __init__(self, bank_file, directory='.'):
+        self.bank_file = bank_file
+        self.directory = directory
+        self.file = open(bank_file, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"Empty question bank file: {bank_file}")
+
+        try:
+            header = HEADER.unpack_from(self.data, 0)
+        except struct.error:
+            header = (None, None)
+        magic, version = header[0], header[1]
+        if magic != BANK_MAGIC or version != BANK_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported question bank file: {bank_file}")
+        rows, set_count, item_count, string_count = header[3:7]
+        columns = len(SOURCE_FILES)
+        self.compiled_counts = list(header[7:7 + columns])
+        stamps = header[7 + columns:7 + 3 * columns]
+
+        self.records_at = HEADER.size
+        self.sets_at = self.records_at + rows * RECORD.size
+        self.items_at = self.sets_at + set_count * OPTION_SET.size
+        self.offsets_at = self.items_at + item_count * INDEX.size
+        self.pool_at = self.offsets_at + (string_count + 1) * INDEX.size
+
+        self.base_counts = list(self.compiled_counts)
+        self.columns = [[] for _ in SOURCE_FILES]
+        self.offsets = list(stamps[0::2])
+        self.stamps = list(zip(stamps[0::2], stamps[1::2]))
+        self.checksums = list(header[7 + 3 * columns:])
+        self.shared_options = {}
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def string(self, string_id):
+        start, end = struct.unpack_from('<II', self.data, self.offsets_at + string_id * INDEX.size)
+        return self.data[self.pool_at + start:self.pool_at + end].decode('utf-8')
+
+    def base_value(self, column, index):
+        record = RECORD.unpack_from(self.data, self.records_at + index * RECORD.size)
+        if column == 1:
+            start, count = OPTION_SET.unpack_from(self.data, self.sets_at + record[1] * OPTION_SET.size)
+            items = struct.unpack_from(f'<{count}I', self.data, self.items_at + start * INDEX.size)
+            return tuple(self.string(item) for item in items)
+        if column == 3:
+            return record[3]
+        return self.string(record[column])
+
+
+def open_bank(directory='.'):
+    """
+    Opens the compiled bank, reading any questions appended since it was compiled
+    from the text files. Reads the text files instead when there is no compiled bank
+    or a text file was changed other than by appending to it.
+
+    Args:
+        directory (str): The folder that holds the question files.
+
+    Returns:
+        MappedQuestionBank or QuestionBank: The opened question bank.
+    """
+    bank_file = os.path.join(directory, BANK_FILE)
+    if os.path.isfile(bank_file):
+        try:
+            bank = MappedQuestionBank(bank_file, directory)
+        except ValueError as e:
+            print(e)
+        else:
+            if not bank.rewritten():
+                bank.refresh()
+                return bank
+            bank.close()
+    return QuestionBank(directory)
+
+
+_bank = None
+
+
+def get_bank():
+    """
+    Returns the question bank shared by the whole process, opening it the first time
+    it is called.
+
+    Returns:
+        MappedQuestionBank or QuestionBank: The shared question bank.
+    """
+    global _bank
+    if _bank is None:
+        _bank = open_bank()
+    return _bank
+
+
+def last_index(file_name):
+    """
+    Finds the index of the last entry of a text file by reading it from the end.
+
+    Args:
+        file_name (str): The path of the text file.
+
+    Returns:
+        int: The index of the last entry, 0 if the file has none.
+    """
+    with open(file_name, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        chunk = 4096
+        while True:
+            start = max(0, size - chunk)
+            f.seek(start)
+            lines = f.read().decode('utf-8', 'replace').splitlines()
+            if start > 0:
+                # the first line may have been cut in half
+                lines = lines[1:]
+            for line in reversed(lines):
+                try:
+                    return int(line.split('.')[0])
+                except ValueError:
+                    continue  # Skip lines that don't start with an integer
+            if start == 0:
+                return 0
+            chunk *= 4
+
+
+def read_index(directory='.'):
+    """
+    Reads the sidecar file that keeps the next free index of every text file.
+
+    Args:
+        directory (str): The folder that holds the question files.
+
+    Returns:
+        dict: (next index, size, modification time) of every text file in the sidecar.
+    """
+    index = {}
+    try:
+        with open(os.path.join(directory, INDEX_FILE), 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 4:
+                    index[parts[0]] = tuple(int(part) for part in parts[1:])
+    except (FileNotFoundError, ValueError):
+        return {}
+    return index
+
+
+def write_index(directory, index):
+    with open(os.path.join(directory, INDEX_FILE), 'w') as f:
+        for file_name, (number, size, mtime) in index.items():
+            f.write(f"{file_name} {number} {size} {mtime}\n")
+
+
+def next_index(directory, file_name, index):
+    """
+    Returns the next free index of a text file. The sidecar value is only used while
+    the file still has the size and modification time recorded with it.
+
+    Args:
+        directory (str): The folder that holds the question files.
+        file_name (str): The name of the text file.
+        index (dict): The sidecar entries, see read_index().
+
+    Returns:
+        int: The index to give to the next entry of the file.
+    """
+    path = os.path.join(directory, file_name)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return 1
+    entry = index.get(file_name)
+    if entry and entry[1:] == (stat.st_size, stat.st_mtime_ns):
+        return entry[0]
+    return last_index(path) + 1
+
+
+def append_entries(directory, file_name, entries, index=None, number=None):
+    """
+    Appends entries to one text file of the bank with a single write, numbering them
+    after the last entry already in the file, or from number if it is given.
+
+    Args:
+        directory (str): The folder that holds the question files.
+        file_name (str): The name of the text file, for example 'answers.txt'.
+        entries (list): The text of each entry, or the list of options of each option set
+            when writing options.txt.
+        index (dict): The sidecar entries to use and update. When not given the sidecar
+            file is read and written by this call.
+        number (int): The index of the first entry. Empty entries are written for the
+            indexes between the last entry of the file and this one, so the entry lands
+            at the same position as in the other files.
+    """
+    own_index = index is None
+    if own_index:
+        index = read_index(directory)
+    path = os.path.join(directory, file_name)
+    first = next_index(directory, file_name, index)
+    if number is None:
+        number = first
+    blank = {OPTIONS_FILE: [], DIFFICULTY_FILE: 0}.get(file_name, '')
+    entries = [blank] * (number - first) + list(entries)
+    number = first
+
+    parts = []
+    if os.path.isfile(path) and os.path.getsize(path) > 0:
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                # keep the new entry off the last line of the file
+                parts.append('\n')
+    for entry in entries:
+        if file_name == OPTIONS_FILE:
+            # Format the options.txt file to maintain the correct text format
+            parts.append(f"{number}.\n" + ''.join(option + '\n' for option in entry) + '\n')
+        else:
+            parts.append(f"{number}.{entry}\n")
+        number += 1
+
+    with open(path, 'a') as f:
+        f.write(''.join(parts))
+    stat = os.stat(path)
+    index[file_name] = (number, stat.st_size, stat.st_mtime_ns)
+    if own_index:
+        write_index(directory, index)
+
+
+def append_questions(questions, directory='.'):
+    """
+    Appends questions to the question files, writing each file once for all of them.
+    A question gets the same index in every file; files that are behind the others are
+    padded with empty entries first.
+
+    Args:
+        questions (list[tuple]): (question, answer, difficulty, options) of every new
+            question, where options is the list of its answer options.
+        directory (str): The folder that holds the question files.
+
+    Returns:
+        int: The number of questions appended.
+
+    Raises:
+        ValueError: If the difficulty of a question is not an integer. Nothing is
+            written then.
+    """
+    questions = list(questions)
+    if not questions:
+        return 0
+    for question in questions:
+        if parse_difficulty(str(question[2]).strip()) is None:
+            raise ValueError(f"difficulty is not an integer: {question[2]}")
+    index = read_index(directory)
+    # every question gets the same index in all four files, after the longest of them
+    number = max(next_index(directory, file_name, index) for file_name in SOURCE_FILES)
+    append_entries(directory, QUESTIONS_FILE, [question[0] for question in questions], index, number)
+    append_entries(directory, ANSWERS_FILE, [question[1] for question in questions], index, number)
+    append_entries(directory, DIFFICULTY_FILE, [parse_difficulty(str(question[2]).strip()) for question in questions], index, number)
+    append_entries(directory, OPTIONS_FILE, [question[3] for question in questions], index, number)
+    write_index(directory, index)
+    return len(questions)
+
+
+if __name__ == "__main__":
+    count = compile_bank()
+    print(f"Compiled {count} questions into {BANK_FILE}")
@@ -0,0 +1,137 @@
+"""
+Scene Manager for Logic Quest
+
+This module runs every screen of the game inside one Python process. Each screen module
+(Sign_In, landingPage, modemenu, trainingMode, ...) keeps its main() function, which is
+treated as a scene. Instead of launching a new interpreter with subprocess for every
+screen change, screens push, pop or replace scenes on a stack kept by this module.
+
+A scene leaves its own main loop when the stack changes: push(), pop(), replace() and
+pop_to() update the stack and then raise SceneChange, which unwinds the running main()
+back to run(). run() then starts the main() of whatever scene is on top of the stack.
+A scene whose main() simply returns is popped.
+
+Classes:
+    SceneChange: Raised to leave the running scene once the stack has been changed.
+
+Functions:
+    push(name): Opens a scene on top of the current one.
+    pop(): Closes the current scene and goes back to the previous one.
+    replace(name): Swaps the current scene for another one.
+    pop_to(name): Goes back to the closest scene with the given name.
+    current(): Returns the name of the scene on top of the stack.
+    quit_game(): Closes the window and exits the game.
+    run(name): Runs the game starting from the given scene.
+"""
+import importlib
+import sys
+
+import pygame
+
+# names of the scene modules, the last one is the scene being shown
+_stack = []
+
+
+class SceneChange(Exception):
+    """
+    Raised by the stack functions to leave the main loop of the running scene.
+
+    Attributes:
+        name (str): Name of the scene that is on top of the stack after the change.
+    """
+    def __init__(self, name):
+        super().__init__(name)
+        self.name = name
+
+
+def _change():
+    # drop the input of the old screen so it does not leak into the next one
+    pygame.event.clear()
+    raise SceneChange(current())
+
+
+def push(name):
+    """
+    Opens a scene on top of the current one.
+
+    Args:
+        name (str): Module name of the scene, for example 'Settings'.
+    """
+    _stack.append(name)
+    _change()
+
+
+def pop():
+    """
+    Closes the current scene and goes back to the previous one.
+    """
+    if _stack:
+        _stack.pop()
+    _change()
+
+
+def replace(name):
+    """
+    Swaps the current scene for another one without growing the stack.
+
+    Args:
+        name (str): Module name of the new scene.
+    """
+    if _stack:
+        _stack.pop()
+    _stack.append(name)
+    _change()
+
+
+def pop_to(name):
+    """
+    Goes back to the closest scene with the given name. If the scene is not open,
+    the current scene is replaced by it instead.
+
+    Args:
+        name (str): Module name of the scene to go back to.
+    """
+    if name not in _stack:
+        replace(name)
+    while _stack[-1] != name:
+        _stack.pop()
+    _change()
+
+
+def current():
+    """
+    Returns the name of the scene on top of the stack.
+
+    Returns:
+        str: Module name of the current scene, or None when no scene is open.
+    """
+    return _stack[-1] if _stack else None
+
+
+def quit_game():
+    """
+    Closes the window and exits the game.
+    """
+    _stack.clear()
+    pygame.quit()
+    sys.exit()
+
+
+def run(name):
+    """
+    Runs the game starting from the given scene until the stack is empty.
+
+    Args:
+        name (str): Module name of the first scene.
+    """
+    _stack[:] = [name]
+    while _stack:
+        scene = importlib.import_module(_stack[-1])
+        try:
+            scene.main()
+        except SceneChange:
+            continue
+        # the scene returned on its own, go back to the one below it
+        _stack.pop()
+    pygame.quit()
+    sys.exit()
@@ -0,0 +1,208 @@
+"""
+Score Client for Logic Quest
+
+This module is what the game screens use for scores and the leaderboard. If server.txt
+holds the address of a score server (for example "192.168.0.10:5231"), requests go to
+that server through one reused connection. Without server.txt the game keeps using its
+own database, exactly as before.
+
+When the server cannot be reached, submitted scores are stored in the local database and
+appended to score_queue.txt, and leaderboard queries are answered from the local database.
+The queued scores are sent the next time the server answers, so none are lost. After a
+failure the server is left alone for RETRY_INTERVAL seconds so the game does not stall
+on every call.
+
+Classes:
+    ScoreClient: Sends score requests to a score server, falling back to the local database.
+
+Functions:
+    get_scores(): Returns the score store the game should use.
+"""
+import json
+import os
+import socket
+import time
+
+import gameStorage
+
+SERVER_FILE = 'server.txt'
+QUEUE_FILE = 'score_queue.txt'
+
+# seconds to wait for the server to connect or answer
+TIMEOUT = 2.0
+
+# seconds to wait before trying the server again after a failure
+RETRY_INTERVAL = 30.0
+
+
+class ScoreClient:
+    """
+    Sends score requests to a score server. It has the same score methods as
+    gameStorage.GameStorage, so the screens can use either one. Queries the server
+    cannot answer, because it is not reachable or rejects them, are answered from the
+    local game storage.
+
+    Attributes:
+        host (str): The address of the server.
+        port (int): The port of the server.
+        timeout (float): Seconds to wait for the server.
+        queue_file (str): Where scores are queued while the server cannot be reached.
+        connection (socket.socket): The open connection, or None.
+        retry_at (float): The time.monotonic() time before which the server is not tried.
+
+    Methods:
+        request(op, **arguments): Sends one request to the server.
+        send_queued(): Sends the scores queued while the server could not be reached.
+        submit_best(name, mode, score): Submits the score of a finished game.
+        score_count(mode): Returns how many players have a score in a mode.
+        rank(name, mode): Returns the leaderboard rank of a player.
+        score_page(mode, start, count): Returns the high scores from a leaderboard position.
+        close(): Closes the connection.
+    """
+    def __init__(self, host, port, timeout=TIMEOUT, queue_file=QUEUE_FILE):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.queue_file = queue_file
+        self.connection = None
+        self.reader = None
+        self.retry_at = 0
+
+    def close(self):
+        if self.connection is not None:
+            self.reader.close()
+            self.connection.close()
+        self.connection = None
+        self.reader = None
+
+    def exchange(self, line):
+        if self.connection is None:
+            self.connection = socket.create_connection((self.host, self.port), self.timeout)
+            self.reader = self.connection.makefile('rb')
+        self.connection.sendall(line)
+        reply = self.reader.readline()
+        if not reply:
+            raise ConnectionError("the score server closed the connection")
+        return reply
+
+    def request(self, op, **arguments):
+        """
+        Sends one request to the server. A reused connection that has gone stale is
+        opened again once before giving up.
+
+        Args:
+            op (str): The operation, for example 'submit' or 'page'.
+            **arguments: The arguments of the operation.
+
+        Returns:
+            object: The result sent back by the server.
+
+        Raises:
+            OSError: If the server cannot be reached or is waiting for RETRY_INTERVAL.
+            ValueError: If the server rejected the request.
+        """
+        if time.monotonic() < self.retry_at:
+            raise ConnectionError("the score server is not reachable")
+        line = json.dumps(dict(arguments, op=op)).encode() + b'\n'
+        reused = self.connection is not None
+        try:
+            try:
+                reply = self.exchange(line)
+            except OSError:
+                if not reused:
+                    raise
+                self.close()
+                reply = self.exchange(line)
+        except OSError:
+            self.close()
+            self.retry_at = time.monotonic() + RETRY_INTERVAL
+            raise
+        reply = json.loads(reply)
+        if not reply.get('ok'):
+            raise ValueError(reply.get('error'))
+        return reply.get('result')
+
+    def send_queued(self):
+        """
+        Sends the scores queued while the server could not be reached, and empties the queue.
+
+        Raises:
+            OSError: If the server cannot be reached, the queue is then kept.
+        """
+        if not os.path.isfile(self.queue_file):
+            return
+        with open(self.queue_file, 'r') as f:
+            queued = [json.loads(line) for line in f if line.strip()]
+        for score in queued:
+            try:
+                self.request('submit', **score)
+            except ValueError as e:
+                # the server will never take this score, it is kept in the local database only
+                print(f"The score server rejected a queued score: {e}")
+        os.remove(self.queue_file)
+
+    def submit_best(self, name, mode, score):
+        """
+        Submits the score of a finished game. If the server cannot be reached, or it
+        rejects the request, the score is stored locally and queued for later.
+
+        Args:
+            name (str): The player name.
+            mode (str): The game mode, for example gameStorage.LIGHTNING.
+            score (int): The score of the finished game.
+        """
+        try:
+            self.send_queued()
+            self.request('submit', name=name, mode=mode, score=score)
+        except (OSError, ValueError):
+            gameStorage.get_storage().submit_best(name, mode, score)
+            with open(self.queue_file, 'a') as f:
+                f.write(json.dumps({'name': name, 'mode': mode, 'score': score}) + '\n')
+
+    def score_count(self, mode):
+        try:
+            return self.request('count', mode=mode)
+        except (OSError, ValueError):
+            return gameStorage.get_storage().score_count(mode)
+
+    def rank(self, name, mode):
+        try:
+            return self.request('rank', name=name, mode=mode)
+        except (OSError, ValueError):
+            return gameStorage.get_storage().rank(name, mode)
+
+    def score_page(self, mode, start, count):
+        try:
+            return [tuple(row) for row in self.request('page', mode=mode, start=start, count=count)]
+        except (OSError, ValueError):
+            return gameStorage.get_storage().score_page(mode, start, count)
+
+
+_scores = None
+
+
+def get_scores():
+    """
+    Returns the score store the game should use: a ScoreClient if server.txt names a
+    score server, otherwise the local game storage. A server.txt that is not a
+    "host:port" address is reported and the local game storage is used.
+
+    Returns:
+        ScoreClient or gameStorage.GameStorage: The score store.
+    """
+    global _scores
+    if _scores is None:
+        try:
+            with open(SERVER_FILE, 'r') as f:
+                address = f.read().strip()
+        except FileNotFoundError:
+            address = ''
+        host, _, port = address.rpartition(':')
+        if address and (not host or not port.isdigit() or not 0 < int(port) < 65536):
+            print(f"Invalid score server address in {SERVER_FILE}: {address!r}, using the local scores")
+            address = ''
+        if address:
+            _scores = ScoreClient(host, int(port))
+        else:
+            _scores = gameStorage.get_storage()
+    return _scores
@@ -0,0 +1,247 @@
+"""
+Score Server for Logic Quest
+
+This module is an optional asyncio TCP service that keeps the scores and leaderboard of
+a whole classroom in one place. Game instances on several machines send it their scores
+and leaderboard queries through scoreClient instead of using their own database.
+
+Every request and reply is one line of JSON. A request names an operation and its
+arguments, for example:
+
+    {"op": "submit", "name": "kassem", "mode": "lightning", "score": 7}
+    {"op": "page", "mode": "lightning", "start": 0, "count": 5}
+    {"op": "rank", "name": "kassem", "mode": "lightning"}
+    {"op": "count", "mode": "lightning"}
+
+The reply holds "ok" and either "result" or "error". Submitted scores are accepted at
+once and written to the database in batches, one transaction per batch, so a rush of
+submissions at the end of a timed round never waits on the disk. Pending scores are
+written before any query is answered, so queries always include every accepted score.
+
+The database is only used from one worker thread, so a slow or locked database delays
+the queries waiting for it but never the event loop serving the other clients. A batch
+that cannot be written is kept and tried again with the next write.
+
+Usage:
+    python scoreServer.py [--host HOST] [--port PORT] [--database FILE]
+
+Classes:
+    ScoreService: Answers requests and writes submitted scores in batches.
+
+Functions:
+    whole_number(value, name, number_range): Reads a whole number argument of a request.
+    serve(service, host, port): Runs the service until it is stopped.
+    main(argv): Runs the command line tool.
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import sqlite3
+
+import gameStorage
+
+DEFAULT_PORT = 5231
+
+# seconds between two batch writes
+FLUSH_INTERVAL = 0.5
+
+# a batch is written at once when it reaches this many scores
+BATCH_SIZE = 500
+
+# the lowest and highest score accepted
+SCORE_RANGE = (-10 ** 9, 10 ** 9)
+
+# the leaderboard positions a page can start at, and how many scores it can hold
+START_RANGE = (0, 2 ** 31 - 1)
+COUNT_RANGE = (0, 1000)
+
+
+def whole_number(value, name, number_range):
+    """
+    Reads a whole number argument of a request.
+
+    Args:
+        value: The argument as decoded from JSON.
+        name (str): The name of the argument, for the error message.
+        number_range (tuple[int, int]): The lowest and highest value accepted.
+
+    Returns:
+        int: The number.
+
+    Raises:
+        ValueError: If the argument is not a whole number, for example Infinity or 2.5,
+            or it is outside number_range.
+    """
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(f"{name} is not a whole number: {value}")
+    try:
+        number = int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"{name} is not a whole number: {value}")
+    if not number_range[0] <= number <= number_range[1]:
+        raise ValueError(f"{name} out of range: {number}")
+    return number
+
+
+class ScoreService:
+    """
+    Answers score requests and writes submitted scores to the game storage in batches.
+
+    Attributes:
+        storage (gameStorage.GameStorage): The database the scores are kept in. It is
+            used from the worker thread, so it must be opened with check_same_thread=False.
+        pending (list[tuple[str, str, int]]): Accepted scores not written yet.
+        batch_size (int): How many pending scores trigger a write, and the most written
+            in one transaction.
+        executor (concurrent.futures.ThreadPoolExecutor): The one worker thread that uses
+            the database.
+
+    Methods:
+        run(function, *args): Calls a storage function on the worker thread.
+        handle(request): Answers one request.
+        flush(): Writes the pending scores.
+        handle_client(reader, writer): Answers the requests of one connection.
+        flush_periodically(interval): Writes the pending scores at a fixed interval.
+    """
+    def __init__(self, storage, batch_size=BATCH_SIZE):
+        self.storage = storage
+        self.pending = []
+        self.batch_size = batch_size
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    async def run(self, function, *args):
+        # one worker, so the calls reach the database in the order they were made
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def flush(self):
+        while self.pending:
+            batch, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+            try:
+                await self.run(self.storage.submit_scores, batch)
+            except (sqlite3.Error, OverflowError) as e:
+                # keep the scores for the next write
+                print(f"Could not write {len(batch)} scores: {e}")
+                self.pending = batch + self.pending
+                return
+
+    async def handle(self, request):
+        """
+        Answers one request.
+
+        Args:
+            request (dict): The decoded request.
+
+        Returns:
+            object: The result of the request.
+
+        Raises:
+            ValueError: If the operation is unknown, an argument is missing or invalid, or
+                a number is outside SCORE_RANGE, START_RANGE or COUNT_RANGE.
+        """
+        if not isinstance(request, dict):
+            raise ValueError("request is not an object")
+        op = request.get('op')
+        try:
+            if op == 'submit':
+                score = whole_number(request['score'], 'score', SCORE_RANGE)
+                self.pending.append((str(request['name']), str(request['mode']), score))
+                if len(self.pending) >= self.batch_size:
+                    await self.flush()
+                return None
+            if op == 'page':
+                arguments = (self.storage.score_page, str(request['mode']),
+                             whole_number(request['start'], 'start', START_RANGE),
+                             whole_number(request['count'], 'count', COUNT_RANGE))
+            elif op == 'rank':
+                arguments = (self.storage.rank, str(request['name']), str(request['mode']))
+            elif op == 'count':
+                arguments = (self.storage.score_count, str(request['mode']))
+            else:
+                raise ValueError(f"unknown operation {op}")
+        except KeyError as e:
+            raise ValueError(f"missing argument {e}")
+        await self.flush()
+        result = await self.run(*arguments)
+        return [list(row) for row in result] if op == 'page' else result
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # the line is longer than the stream limit, the connection cannot be resynced
+                    writer.write(json.dumps({'ok': False, 'error': "request too long"}).encode() + b'\n')
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                try:
+                    reply = {'ok': True, 'result': await self.handle(json.loads(line))}
+                except (ValueError, TypeError, OverflowError, IndexError) as e:
+                    # a request the checks above missed still only fails itself
+                    reply = {'ok': False, 'error': str(e)}
+                writer.write(json.dumps(reply).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def flush_periodically(self, interval=FLUSH_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                # keep writing the next batches whatever went wrong with this one
+                print(f"Could not write the pending scores: {e!r}")
+
+
+async def serve(service, host='127.0.0.1', port=DEFAULT_PORT, started=None):
+    """
+    Runs the service until it is stopped. The pending scores are written on the way out.
+
+    Args:
+        service (ScoreService): The service answering the requests.
+        host (str): The address to listen on.
+        port (int): The port to listen on, 0 to pick a free one.
+        started (callable): Called with the server once it is listening.
+    """
+    server = await asyncio.start_server(service.handle_client, host, port)
+    flusher = asyncio.create_task(service.flush_periodically())
+    if started is not None:
+        started(server)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        flusher.cancel()
+        await service.flush()
+        service.executor.shutdown()
+
+
+def main(argv=None):
+    """
+    Runs the command line tool.
+
+    Args:
+        argv (list[str]): The command line arguments, sys.argv[1:] by default.
+    """
+    parser = argparse.ArgumentParser(description="Serve Logic Quest scores to several game instances.")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on, 0.0.0.0 for a lab server")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument('--database', default=gameStorage.DATABASE_FILE, help="SQLite database of the scores")
+    args = parser.parse_args(argv)
+
+    service = ScoreService(gameStorage.GameStorage(args.database, check_same_thread=False))
+    print(f"Serving scores from {args.database} on {args.host}:{args.port}")
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
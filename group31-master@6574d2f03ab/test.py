@@ -1,96 +1,832 @@
+import asyncio
+import io
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
 import unittest
 from unittest.mock import patch
+import pygame
+import headless
+# the screens open their window when imported, so this comes first
+headless.enable()
+import assetManager
+# and the scaled images of the test run go to a temporary folder instead of the game folder
+surface_cache = tempfile.TemporaryDirectory()
+assetManager._assets = assetManager.AssetManager(cache_dir=surface_cache.name)
 import lightningMode
 import Sign_In
 import instructorMode
 import Leaderboard
 import addQuestion
 import developerMode
+import questionBank
+import sceneManager
+import importQuestions
+import gameStorage
+import scoreServer
+import scoreClient
+import loadTest
+import timingStats
+import fontRegistry
+import textCache
+import glyphAtlas
+import dirtyRenderer
+import frameScheduler
+import inputReplay
+import frameProfiler
 
 
-class TestLightningMode(unittest.TestCase):
-
-    @patch('lightningMode.read_questions')
-    def test_read_questions(self, mock_read):
-        mock_data = lightningMode.get_question_text()
-        data = "1.if p then r"
-        self.assertEqual(mock_data, data)
-
-class TestSignIn(unittest.TestCase):
-
-    @patch('Sign_In.read_users')
-    def test_read_users(self, mock_read):
-        mock_data = Sign_In.get_user_data()
-        data = "1. user1"
-        self.assertEqual(mock_data, data)
-
-class TestinstructorMode(unittest.TestCase):
-
-    @patch('instructorMode.read_questions')
-    def test_read_questions(self, mock_read):
-        mock_data = instructorMode.get_question_text()
-        data = "1.if p then r"
-        self.assertEqual(mock_data, data)
-
-    @patch('instructorMode.read_questions')
-    def test_read_questions(self, mock_read):
-        mock_data = instructorMode.get_question_text()
-        data = "1.if p then r"
-        self.assertEqual(mock_data, data)
-
-class TestLeaderboard(unittest.TestCase):
-
-    @patch('Leaderboard.read_leaderboard')
-    def test_read_leaderboard(self, mock_read):
-        mock_data = Leaderboard.get_leaderboard_data()
-        data = "1. user1"
-        self.assertEqual(mock_data, data)
-
-    @patch('Leaderboard.read_leaderboard')
-    def test_read_leaderboard(self, mock_read):
-        mock_data = Leaderboard.get_leaderboard_data()
-        data = "1. user1"
-        self.assertEqual(mock_data, data)
-
-class TestAddQuestion(unittest.TestCase):
-
-    @patch('AddQuestion.read_questions')
-    def test_read_questions(self, mock_read):
-        mock_data = addQuestion.get_question_text()
-        data = "1.if p then r"
-        self.assertEqual(mock_data, data)
-
-    @patch('AddQuestion.read_questions')
-    def test_read_questions(self, mock_read):
-        mock_data = addQuestion.get_question_text()
-        data = "1.if p then r"
-        self.assertEqual(mock_data, data)
-    
-    @patch('AddQuestion.read_questions')
-    def test_read_questions(self, mock_read):
-        mock_data = addQuestion.get_question_text()
-        data = "1.if p then r"
-        self.assertEqual(mock_data, data)
-
-class TestDeveloperMode(unittest.TestCase):
-
-    @patch('DeveloperMode.read_questions')
-    def test_read_questions(self, mock_read):
-        mock_data = developerMode.get_question_text()
-        data = "1.if p then r"
-        self.assertEqual(mock_data, data)
-
-    @patch('DeveloperMode.read_questions')
-    def test_read_questions(self, mock_read):
-        mock_data = developerMode.get_question_text()
-        data = "1.if q then p"
-        self.assertEqual(mock_data, data)
-
-    @patch('DeveloperMode.read_questions')
-    def test_read_questions(self, mock_read):
-        mock_data = developerMode.get_question_text()
-        data = "1.if q then r"
-        self.assertEqual(mock_data, data)
+def rendered_texts():
+    return {key[0] for key in textCache.get_cache().surfaces}
+
+def key_event(key, unicode=''):
+    return pygame.event.Event(pygame.KEYDOWN, key=key, unicode=unicode, mod=0, scancode=0)
+
+class SceneTestCase(unittest.TestCase):
+    """
+    Runs screens headless against a temporary database.
+    """
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.storage = gameStorage.GameStorage(os.path.join(tmp.name, 'test.db'))
+        self.addCleanup(self.storage.close)
+        for target in ('gameStorage._storage', 'scoreClient._scores'):
+            patcher = patch(target, self.storage)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        textCache.get_cache().clear()
+
+class TestLightningMode(SceneTestCase):
+
+    def test_first_question(self):
+        driver = headless.run_scene('lightningMode', frames=2)
+        self.assertEqual(driver.frame, 2)
+        self.assertEqual(driver.window.get_size(), headless.screen_size())
+        self.assertTrue({"Question Number: 1", "if p then r"} <= rendered_texts())
+
+    def test_escape_leaves(self):
+        driver = headless.run_scene('lightningMode', frames=10, events={1: [key_event(pygame.K_ESCAPE)]})
+        self.assertTrue(driver.left)
+        self.assertEqual(driver.frame, 1)
+
+class TestSignIn(SceneTestCase):
+
+    def test_suggests_users(self):
+        self.storage.add_user("user1")
+        box = pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(Sign_In.WIDTH // 2, 345), button=1)
+        driver = headless.run_scene('Sign_In', frames=3, events={0: [box, key_event(pygame.K_u, 'u')],
+                                                                1: [key_event(pygame.K_s, 's')]})
+        self.assertFalse(driver.left)
+        self.assertIn("user1", rendered_texts())
+
+class TestinstructorMode(SceneTestCase):
+
+    def test_first_question(self):
+        headless.run_scene('instructorMode', frames=1)
+        self.assertTrue({"Question Number: 1", "if p then r"} <= rendered_texts())
+
+class TestLeaderboard(SceneTestCase):
+
+    def test_read_leaderboard(self):
+        self.storage.submit_best("user1", gameStorage.LIGHTNING, 42)
+        headless.run_scene('Leaderboard', frames=1)
+        self.assertTrue({"user1", "42", "Position 1"} <= rendered_texts())
+
+    def test_tied_scores_share_a_position(self):
+        for name, score in (("user1", 42), ("user2", 42), ("user3", 7), ("user4", 7), ("user5", 7), ("user6", 7)):
+            self.storage.submit_best(name, gameStorage.LIGHTNING, score)
+        headless.run_scene('Leaderboard', frames=3, events={1: [key_event(pygame.K_DOWN)]})
+        self.assertTrue({"Position 1", "Position 3"} <= rendered_texts())
+        self.assertFalse({"Position 2", "Position 4", "Position 5", "Position 6"} & rendered_texts())
+
+class TestAddQuestion(SceneTestCase):
+
+    def test_labels(self):
+        driver = headless.run_scene('addQuestion', frames=1)
+        self.assertEqual(driver.frame, 1)
+        self.assertIn("Submit", rendered_texts())
+
+    def test_difficulty_error(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cwd = os.getcwd()
+        os.chdir(tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        boxes = [addQuestion.TextBox(0, 0, 10, 10, text) for text in ("r or s", "rvs", "hard", "rvs", "r^s", "s->r", "r->s")]
+        self.assertEqual(addQuestion.submit_action(boxes), "Question Difficulty must be a whole number")
+        self.assertEqual(os.listdir(tmp.name), [])
+        boxes[2].text = "2"
+        self.assertIsNone(addQuestion.submit_action(boxes))
+        self.assertEqual(boxes[2].text, "")
+        self.assertIn('difficulty.txt', os.listdir(tmp.name))
+
+class TestDeveloperMode(SceneTestCase):
+
+    def test_first_question(self):
+        driver = headless.run_scene('developerMode', frames=10, events={1: [key_event(pygame.K_ESCAPE)]})
+        self.assertTrue(driver.left)
+        self.assertTrue({"Question Number: 1", "if p then r"} <= rendered_texts())
+
+    def test_profiler_overlay(self):
+        width, _ = headless.screen_size()
+        corner = (width - frameProfiler.PANEL_SIZE[0] - 5, 65)
+        write = sys.stdout.write
+        background = headless.run_scene('developerMode', frames=3).window.get_at(corner)
+        shown = headless.run_scene('developerMode', frames=3, events={0: [key_event(pygame.K_F3)]})
+        # the developer console gives stdout back however the screen is left
+        self.assertEqual(sys.stdout.write, write)
+        self.assertNotEqual(shown.window.get_at(corner), background)
+
+class TestSceneManager(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('sceneManager._stack', ['Sign_In', 'landingPage'])
+        self.stack = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def change(self, function, *args):
+        with self.assertRaises(sceneManager.SceneChange) as change:
+            function(*args)
+        self.assertEqual(change.exception.name, sceneManager.current())
+        return list(self.stack)
+
+    def test_push_pop_replace(self):
+        self.assertEqual(self.change(sceneManager.push, 'modemenu'), ['Sign_In', 'landingPage', 'modemenu'])
+        self.assertEqual(self.change(sceneManager.replace, 'Settings'), ['Sign_In', 'landingPage', 'Settings'])
+        self.assertEqual(self.change(sceneManager.pop), ['Sign_In', 'landingPage'])
+
+    def test_pop_to(self):
+        self.change(sceneManager.push, 'modemenu')
+        self.change(sceneManager.push, 'trainingMode')
+        self.assertEqual(self.change(sceneManager.pop_to, 'landingPage'), ['Sign_In', 'landingPage'])
+        # a scene that is not open replaces the current one
+        self.assertEqual(self.change(sceneManager.pop_to, 'Leaderboard'), ['Sign_In', 'Leaderboard'])
+
+class TestQuestionBank(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        files = {
+            'questions.txt': "1.if p then r\n2.q and s\n",
+            'answers.txt': "1.p->r\n2.q^s\n",
+            'difficulty.txt': "1.2\n2.3",
+            'options.txt': "1.\nsvs\nq^r\np->r\nr->p\n\n2.\nsvs\nq^r\np->r\nq^s\n\n\n",
+        }
+        for name, content in files.items():
+            with open(os.path.join(self.tmp.name, name), 'w') as f:
+                f.write(content)
+
+    def test_load(self):
+        bank = questionBank.QuestionBank(self.tmp.name)
+        self.assertEqual(len(bank), 2)
+        self.assertEqual(bank.question(0), "if p then r")
+        self.assertEqual(bank.options(0), ("svs", "q^r", "p->r", "r->p"))
+        self.assertEqual(bank.answer(1), "q^s")
+        self.assertEqual(bank.difficulty(1), 3)
+
+    def test_invalid_difficulty(self):
+        question = ("r or s", "rvs", "hard", ["rvs", "r^s", "s->r", "r->s"])
+        with self.assertRaises(ValueError):
+            questionBank.append_questions([question], self.tmp.name)
+        with open(os.path.join(self.tmp.name, 'questions.txt')) as f:
+            self.assertEqual(f.read(), "1.if p then r\n2.q and s\n")
+        # a bad line written by hand does not stop the bank from loading
+        with open(os.path.join(self.tmp.name, 'difficulty.txt'), 'w') as f:
+            f.write("1.hard\n2.3\n")
+        with patch('sys.stdout', new_callable=io.StringIO):
+            bank = questionBank.QuestionBank(self.tmp.name)
+        self.assertEqual([bank.difficulty(0), bank.difficulty(1)], [0, 3])
+
+    def test_append_questions(self):
+        bank = questionBank.QuestionBank(self.tmp.name)
+        question = ("r or s", "rvs", "1", ["rvs", "r^s", "s->r", "r->s"])
+        self.assertEqual(questionBank.append_questions([question, question], self.tmp.name), 2)
+        with open(os.path.join(self.tmp.name, 'difficulty.txt')) as f:
+            self.assertEqual(f.read(), "1.2\n2.3\n3.1\n4.1\n")
+        # the next index now comes from the sidecar instead of the end of the files
+        with patch('questionBank.last_index') as mock_last_index:
+            questionBank.append_questions([question], self.tmp.name)
+            mock_last_index.assert_not_called()
+        self.assertEqual(bank.refresh(), 3)
+        self.assertEqual(bank[4], ("r or s", ("rvs", "r^s", "s->r", "r->s"), "rvs", 1))
+
+    def test_append_questions_uneven_files(self):
+        with open(os.path.join(self.tmp.name, 'difficulty.txt'), 'a') as f:
+            f.write("\n3.5\n")
+        question = ("r or s", "rvs", "1", ["rvs", "r^s", "s->r", "r->s"])
+        questionBank.append_questions([question], self.tmp.name)
+        with open(os.path.join(self.tmp.name, 'questions.txt')) as f:
+            self.assertEqual(f.read(), "1.if p then r\n2.q and s\n3.\n4.r or s\n")
+        bank = questionBank.QuestionBank(self.tmp.name)
+        self.assertEqual(len(bank), 4)
+        self.assertEqual(bank[3], ("r or s", ("rvs", "r^s", "s->r", "r->s"), "rvs", 1))
+        self.assertEqual(bank.options(2), ())
+        questionBank.compile_bank(self.tmp.name)
+        compiled = questionBank.open_bank(self.tmp.name)
+        self.addCleanup(compiled.close)
+        self.assertEqual(compiled[3], bank[3])
+
+    def test_compiled_bank(self):
+        questionBank.compile_bank(self.tmp.name)
+        bank = questionBank.open_bank(self.tmp.name)
+        self.addCleanup(bank.close)
+        self.assertIsInstance(bank, questionBank.MappedQuestionBank)
+        text_bank = questionBank.QuestionBank(self.tmp.name)
+        self.assertEqual([bank[i] for i in range(len(bank))], [text_bank[i] for i in range(len(text_bank))])
+
+    def append_question(self, number):
+        for name, line in (('questions.txt', f"{number}.r or s\n"), ('answers.txt', f"{number}.rvs\n"),
+                           ('difficulty.txt', f"\n{number}.1"),
+                           ('options.txt', f"{number}.\nrvs\nr^s\ns->r\nr->s\n\n")):
+            with open(os.path.join(self.tmp.name, name), 'a') as f:
+                f.write(line)
+
+    def test_refresh(self):
+        bank = questionBank.QuestionBank(self.tmp.name)
+        self.append_question(3)
+        self.assertEqual(bank.refresh(), 1)
+        self.assertEqual(bank[2], ("r or s", ("rvs", "r^s", "s->r", "r->s"), "rvs", 1))
+        self.assertEqual(bank.refresh(), 0)
+
+    def test_compile_while_open(self):
+        questionBank.compile_bank(self.tmp.name)
+        bank = questionBank.open_bank(self.tmp.name)
+        self.addCleanup(bank.close)
+        self.append_question(3)
+        questionBank.compile_bank(self.tmp.name)
+        # the open bank keeps reading the file it mapped
+        self.assertEqual(bank.question(1), "q and s")
+        self.assertNotIn('questions.bank.tmp', os.listdir(self.tmp.name))
+        reopened = questionBank.open_bank(self.tmp.name)
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.compiled_counts[0], 3)
+
+    def test_compiled_bank_refresh(self):
+        questionBank.compile_bank(self.tmp.name)
+        self.append_question(3)
+        bank = questionBank.open_bank(self.tmp.name)
+        self.addCleanup(bank.close)
+        self.assertIsInstance(bank, questionBank.MappedQuestionBank)
+        self.assertEqual(len(bank), 3)
+        self.assertEqual(bank.options(2), ("rvs", "r^s", "s->r", "r->s"))
+
+    def test_compiled_bank_rewritten(self):
+        questionBank.compile_bank(self.tmp.name)
+        with open(os.path.join(self.tmp.name, 'questions.txt'), 'w') as f:
+            f.write("1.r or s\n")
+        bank = questionBank.open_bank(self.tmp.name)
+        self.assertNotIsInstance(bank, questionBank.MappedQuestionBank)
+        self.assertEqual(len(bank), 1)
+
+    def edit_first_question(self):
+        # same length as before, so only the content of the read part changes
+        path = os.path.join(self.tmp.name, 'questions.txt')
+        with open(path) as f:
+            text = f.read()
+        with open(path, 'w') as f:
+            f.write(text.replace("if p then r", "if X then r"))
+
+    def test_refresh_edited_and_appended(self):
+        bank = questionBank.QuestionBank(self.tmp.name)
+        self.edit_first_question()
+        self.append_question(3)
+        bank.refresh()
+        self.assertEqual(len(bank), 3)
+        self.assertEqual(bank.question(0), "if X then r")
+
+    def test_refresh_line_continued(self):
+        bank = questionBank.QuestionBank(self.tmp.name)
+        # the last line of difficulty.txt has no newline, so appending to it changes that entry
+        with open(os.path.join(self.tmp.name, 'difficulty.txt'), 'a') as f:
+            f.write("0\n")
+        bank.refresh()
+        self.assertEqual(bank.difficulty(1), 30)
+
+    def test_refresh_checks_only_the_end(self):
+        with patch('questionBank.CHECK_BYTES', 8):
+            bank = questionBank.QuestionBank(self.tmp.name)
+            self.edit_first_question()
+            self.append_question(3)
+            # the edit is before the checked bytes, so only the new question is read
+            self.assertEqual(bank.refresh(), 1)
+            self.assertEqual(bank.question(0), "if p then r")
+            path = os.path.join(self.tmp.name, 'questions.txt')
+            with open(path) as f:
+                text = f.read()
+            with open(path, 'w') as f:
+                f.write(text.replace("3.r or s", "3.r or t") + "4.r or s\n")
+            bank.refresh()
+            self.assertEqual(bank.question(0), "if X then r")
+            self.assertEqual(bank.question(2), "r or t")
+
+    def test_compiled_bank_edited_and_appended(self):
+        questionBank.compile_bank(self.tmp.name)
+        self.edit_first_question()
+        self.append_question(3)
+        bank = questionBank.open_bank(self.tmp.name)
+        self.assertNotIsInstance(bank, questionBank.MappedQuestionBank)
+        self.assertEqual(len(bank), 3)
+        self.assertEqual(bank.question(0), "if X then r")
+
+class TestImportQuestions(unittest.TestCase):
+
+    def test_import_jsonl(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        source = os.path.join(tmp.name, 'import.jsonl')
+        with open(source, 'w') as f:
+            f.write('{"question": "if p then r", "answer": "p->r", "difficulty": 2, "options": ["svs", "q^r", "p->r", "r->p"]}\n')
+            f.write('{"question": "q and s", "answer": "q^s", "difficulty": 1, "options": ["svs", "q^r", "p->r", "r->p"]}\n')
+            f.write('{"question": "q or s", "answer": "qvs", "difficulty": "hard", "options": ["qvs", "q^r", "p->r", "r->p"]}\n')
+            f.write('{"question": "q or r", "answer": "qvr", "difficulty": 99999999999, "options": ["qvr", "q^r", "p->r", "r->p"]}\n')
+        errors = io.StringIO()
+        self.assertEqual(importQuestions.import_questions(source, tmp.name, errors=errors), (1, 3))
+        self.assertIn("import.jsonl:2: answer q^s is not one of the options", errors.getvalue())
+        self.assertIn("import.jsonl:3: difficulty is not an integer", errors.getvalue())
+        self.assertIn("import.jsonl:4: difficulty is not an integer", errors.getvalue())
+        bank = questionBank.QuestionBank(tmp.name)
+        self.assertEqual(bank[0], ("if p then r", ("svs", "q^r", "p->r", "r->p"), "p->r", 2))
+
+class TestGameStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        with open(os.path.join(self.tmp.name, 'usernames.txt'), 'w') as f:
+            f.write("mptturkey\nkassem ")
+        with open(os.path.join(self.tmp.name, 'scores.txt'), 'w') as f:
+            f.write("mptturkey\n4\n\nkassem\n2\nkassem\n7\n")
+        with open(os.path.join(self.tmp.name, 'progress.txt'), 'w') as f:
+            f.write("kassem\n1\nkassem\n3\n")
+        self.storage = gameStorage.GameStorage(os.path.join(self.tmp.name, 'logicquest.db'))
+        self.addCleanup(self.storage.close)
+
+    def test_import_text_files(self):
+        self.assertTrue(self.storage.user_exists("kassem"))
+        self.assertFalse(self.storage.user_exists("kas"))
+        self.assertEqual(self.storage.score_page(gameStorage.LIGHTNING, 0, 10), [("kassem", 7), ("mptturkey", 4)])
+        self.assertEqual(self.storage.load_progress("kassem"), 3)
+        self.assertIsNone(self.storage.load_progress("mptturkey"))
+
+    def test_read_pairs_broken_records(self):
+        path = os.path.join(self.tmp.name, 'progress.txt')
+        with open(path, 'w') as f:
+            f.write("kassem\n1kassem\n3\n\nmptturkey\n2\n")
+        errors = io.StringIO()
+        self.assertEqual(gameStorage.read_pairs(path, errors), [("mptturkey", 2)])
+        self.assertEqual(len(errors.getvalue().splitlines()), 2)
+
+    def test_users_changed_by_another_connection(self):
+        self.assertFalse(self.storage.user_exists("lab student"))
+        other = gameStorage.GameStorage(self.storage.path)
+        self.addCleanup(other.close)
+        other.add_user("lab student")
+        self.assertTrue(self.storage.user_exists("lab student"))
+        self.storage.add_user("second student")
+        self.assertIn("second student", other.users())
+
+    def test_user_suggestions(self):
+        for name in ["kas", "kassem2", "kat", "mptturkey_test"]:
+            self.storage.add_user(name)
+        self.assertEqual(self.storage.user_suggestions("kas", 5), ["kas", "kassem", "kassem2"])
+        self.assertEqual(self.storage.user_suggestions("mpt", 1), ["mptturkey"])
+        self.assertEqual(self.storage.user_suggestions("z", 5), [])
+
+    def test_scores_and_saves(self):
+        self.storage.add_user("new user")
+        self.assertTrue(self.storage.user_exists("new user"))
+        self.assertIsNone(self.storage.get_score("new user", gameStorage.LIGHTNING))
+        self.assertEqual(self.storage.submit_best("new user", gameStorage.LIGHTNING, 5), 5)
+        self.assertEqual(self.storage.submit_best("new user", gameStorage.LIGHTNING, 3), 5)
+        self.assertEqual(self.storage.submit_best("new user", gameStorage.LIGHTNING, 8), 8)
+        self.assertEqual(self.storage.get_score("new user", gameStorage.LIGHTNING), 8)
+        self.assertEqual(self.storage.score_page(gameStorage.LIGHTNING, 0, 2), [("new user", 8), ("kassem", 7)])
+        self.storage.save_progress("new user", 9)
+        self.storage.save_progress("new user", 11)
+        self.storage.save_progress("new user", 2, slot=1)
+        self.assertEqual(self.storage.load_progress("new user"), 11)
+        self.assertEqual(self.storage.load_progress("new user", slot=1), 2)
+        self.assertIsNone(self.storage.load_progress("new"))
+
+    def test_rank_and_pages(self):
+        self.assertEqual(self.storage.rank("kassem", gameStorage.LIGHTNING), 1)
+        self.assertEqual(self.storage.rank("mptturkey", gameStorage.LIGHTNING), 2)
+        self.assertIsNone(self.storage.rank("nobody", gameStorage.LIGHTNING))
+        for i in range(10):
+            self.storage.submit_best(f"player{i}", gameStorage.LIGHTNING, i)
+        self.storage.submit_best("mptturkey", gameStorage.LIGHTNING, 9)
+        self.assertEqual(self.storage.rank("mptturkey", gameStorage.LIGHTNING), 1)
+        self.assertEqual(self.storage.rank("player8", gameStorage.LIGHTNING), 3)
+        self.assertEqual(self.storage.score_page(gameStorage.LIGHTNING, 1, 3),
+                         [("player9", 9), ("player8", 8), ("kassem", 7)])
+        self.assertEqual(self.storage.score_page(gameStorage.LIGHTNING, 4, 2), [("player7", 7), ("player6", 6)])
+        self.assertEqual(self.storage.score_page(gameStorage.LIGHTNING, 11, 5), [("player0", 0)])
+        self.assertEqual(self.storage.score_page(gameStorage.LIGHTNING, 12, 5), [])
+        self.assertRaises(ValueError, self.storage.score_page, gameStorage.LIGHTNING, -1, 5)
+
+    def test_ranks_changed_by_another_connection(self):
+        self.assertEqual(self.storage.rank("mptturkey", gameStorage.LIGHTNING), 2)
+        other = gameStorage.GameStorage(self.storage.path)
+        self.addCleanup(other.close)
+        other.submit_best("mptturkey", gameStorage.LIGHTNING, 10)
+        self.assertEqual(self.storage.rank("mptturkey", gameStorage.LIGHTNING), 1)
+        self.assertEqual(self.storage.score_page(gameStorage.LIGHTNING, 0, 1), [("mptturkey", 10)])
+
+    def test_score_ranks_far_apart(self):
+        # one slot per distinct score, however far apart the scores are
+        ranks = gameStorage.ScoreRanks([(3, 2), (-10 ** 12, 1)])
+        ranks.add(2 ** 62)
+        self.assertEqual([ranks.find(i) for i in range(4)], [(2 ** 62, 0), (3, 1), (3, 1), (-10 ** 12, 3)])
+        self.assertLessEqual(len(ranks.tree), 5)
+        ranks.add(3, -2)
+        self.assertEqual(ranks.count_above(-10 ** 12), 1)
+        self.assertEqual(ranks.find(1), (-10 ** 12, 1))
+
+    def test_score_ranks_rebuilt_once(self):
+        ranks = gameStorage.ScoreRanks([(5, 1)])
+        with patch.object(ranks, 'rebuild', wraps=ranks.rebuild) as rebuild:
+            for score in range(100):
+                ranks.add(score)
+            ranks.add(5)
+            self.assertEqual(ranks.count_above(50), 49)
+            self.assertEqual(ranks.find(0), (99, 0))
+            self.assertEqual(ranks.count_above(5), 94)
+        self.assertEqual(rebuild.call_count, 1)
+
+class TestScoreServer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        thread.start()
+        ready = threading.Event()
+
+        def started(server):
+            self.port = server.sockets[0].getsockname()[1]
+            ready.set()
+
+        async def start():
+            # the database has to be opened and closed on the thread of the server
+            self.server_task = asyncio.current_task()
+            storage = gameStorage.GameStorage(os.path.join(self.tmp.name, 'server.db'), check_same_thread=False)
+            try:
+                await scoreServer.serve(scoreServer.ScoreService(storage), port=0, started=started)
+            finally:
+                storage.close()
+
+        async def shutdown():
+            self.server_task.cancel()
+            await asyncio.wait([self.server_task])
+
+        asyncio.run_coroutine_threadsafe(start(), self.loop)
+        ready.wait(5)
+
+        def stop():
+            asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(5)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            thread.join(5)
+            self.loop.close()
+        self.addCleanup(stop)
+
+    def client(self, port=None):
+        client = scoreClient.ScoreClient('127.0.0.1', port or self.port,
+                                         queue_file=os.path.join(self.tmp.name, 'score_queue.txt'))
+        self.addCleanup(client.close)
+        return client
+
+    def test_concurrent_submissions(self):
+        def submit(player):
+            client = self.client()
+            for score in range(10):
+                client.submit_best(f"player{player}", gameStorage.LIGHTNING, player * 10 + score)
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        client = self.client()
+        self.assertEqual(client.score_count(gameStorage.LIGHTNING), 10)
+        self.assertEqual(client.score_page(gameStorage.LIGHTNING, 0, 2), [("player9", 99), ("player8", 89)])
+        self.assertEqual(client.rank("player0", gameStorage.LIGHTNING), 10)
+        self.assertRaises(ValueError, client.request, 'delete')
+
+    def test_queue_while_server_unreachable(self):
+        local = gameStorage.GameStorage(os.path.join(self.tmp.name, 'local.db'))
+        self.addCleanup(local.close)
+        with socket.socket() as unused:
+            unused.bind(('127.0.0.1', 0))
+            closed_port = unused.getsockname()[1]
+        client = self.client(closed_port)
+        with patch.object(gameStorage, '_storage', local):
+            client.submit_best("kassem", gameStorage.LIGHTNING, 4)
+            self.assertEqual(client.rank("kassem", gameStorage.LIGHTNING), 1)
+        self.assertTrue(os.path.isfile(client.queue_file))
+
+        client.port = self.port
+        client.retry_at = 0
+        client.submit_best("mptturkey", gameStorage.LIGHTNING, 6)
+        self.assertFalse(os.path.isfile(client.queue_file))
+        self.assertEqual(client.score_page(gameStorage.LIGHTNING, 0, 5), [("mptturkey", 6), ("kassem", 4)])
+
+    def test_invalid_server_file(self):
+        server_file = os.path.join(self.tmp.name, 'server.txt')
+        with open(server_file, 'w') as f:
+            f.write("localhost:port\n")
+        local = gameStorage.GameStorage(os.path.join(self.tmp.name, 'local.db'))
+        self.addCleanup(local.close)
+        with patch('scoreClient.SERVER_FILE', server_file), patch('scoreClient._scores', None), \
+                patch.object(gameStorage, '_storage', local), patch('sys.stdout', new_callable=io.StringIO):
+            self.assertIs(scoreClient.get_scores(), local)
+
+    def test_rejected_requests(self):
+        client = self.client()
+        self.assertRaises(ValueError, client.request, 'submit', name="kassem", mode=gameStorage.LIGHTNING, score=2 ** 63)
+        # a rejected score is kept locally instead of failing the end of the game
+        local = gameStorage.GameStorage(os.path.join(self.tmp.name, 'local.db'))
+        self.addCleanup(local.close)
+        with patch.object(gameStorage, '_storage', local), patch('sys.stdout', new_callable=io.StringIO):
+            client.submit_best("kassem", gameStorage.LIGHTNING, 10 ** 12)
+            self.assertEqual(local.get_score("kassem", gameStorage.LIGHTNING), 10 ** 12)
+            client.submit_best("kassem", gameStorage.LIGHTNING, 5)
+            # a page the server rejects is read from the local scores
+            self.assertEqual(client.score_page(gameStorage.LIGHTNING, 0, 5000), [("kassem", 10 ** 12)])
+        self.assertEqual(client.score_page(gameStorage.LIGHTNING, 0, 5), [("kassem", 5)])
+        # malformed arguments get an error and the connection stays usable
+        with socket.create_connection(('127.0.0.1', self.port), 5) as connection:
+            replies = connection.makefile('rb')
+            for request in (b'{"op": "page", "mode": "lightning", "start": -5, "count": 5}',
+                            b'{"op": "page", "mode": "lightning", "start": 0, "count": 12345678901234567890}',
+                            b'{"op": "submit", "name": "kassem", "mode": "lightning", "score": Infinity}',
+                            b'{"op": "submit", "name": "kassem", "mode": "lightning", "score": 2.5}',
+                            b'{"op": "count", "mode": "lightning"}'):
+                connection.sendall(request + b'\n')
+                reply = json.loads(replies.readline())
+                self.assertEqual(reply['ok'], request.startswith(b'{"op": "count"'), reply)
+            self.assertEqual(reply['result'], 1)
+        # a line over the stream limit gets an error and the connection is closed
+        with socket.create_connection(('127.0.0.1', self.port), 5) as connection:
+            connection.sendall(b'{"op": "count", "mode": "' + b'x' * 70000 + b'"}\n')
+            reply = connection.makefile('rb').readline()
+        self.assertEqual(json.loads(reply), {'ok': False, 'error': "request too long"})
+
+class TestLoadTest(unittest.TestCase):
+
+    def test_run_local(self):
+        stats = asyncio.run(loadTest.run_local(clients=5, duration=0.3, think_time=0.05))
+        for op in loadTest.OPERATIONS:
+            self.assertGreater(len(stats.latencies[op]), 0)
+            self.assertEqual(stats.errors[op], 0)
+        self.assertIn("p99 ms", stats.report(0.3))
+
+    def test_request_timeout(self):
+        async def run_silent():
+            # a server that takes connections but never replies
+            async def handler(reader, writer):
+                await reader.read()
+                writer.close()
+            server = await asyncio.start_server(handler, '127.0.0.1', 0)
+            async with server:
+                port = server.sockets[0].getsockname()[1]
+                return await loadTest.run_load('127.0.0.1', port, clients=2, duration=0.2,
+                                               think_time=0.01, timeout=0.05)
+        stats = asyncio.run(run_silent())
+        self.assertGreater(stats.errors['submit'], 0)
+        self.assertEqual(stats.latencies['submit'], [])
+
+class TestTimingStats(unittest.TestCase):
+
+    def test_percentile(self):
+        self.assertEqual(timingStats.percentile([1, 2, 3, 4], 0.5), 3)
+        self.assertEqual(timingStats.percentile([1, 2, 3, 4], 0.99), 4)
+        self.assertEqual(timingStats.percentile([], 0.5), 0.0)
+
+class TestAssetManager(unittest.TestCase):
+
+    def test_image_cache(self):
+        pygame.display.set_mode((200, 100))
+        assets = assetManager.AssetManager(cache_size=2, cache_dir=None)
+        small = assets.image("backgrounds/bg_offwhite.jpg", (200, 100))
+        self.assertEqual(small.get_size(), (200, 100))
+        self.assertEqual(small.get_bitsize(), pygame.display.get_surface().get_bitsize())
+        self.assertIs(assets.image("backgrounds/bg_offwhite.jpg", (200, 100)), small)
+        assets.image("backgrounds/bg_offwhite.jpg", (100, 50))
+        assets.image("backgrounds/bg_offwhite.jpg", (50, 25))
+        self.assertNotIn(("backgrounds/bg_offwhite.jpg", (200, 100)), assets.scaled)
+        self.assertEqual(len(assets.originals), 1)
+
+    def test_disk_cache(self):
+        pygame.display.set_mode((200, 100))
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cache_dir = os.path.join(tmp.name, 'cache')
+        image = os.path.join(tmp.name, 'bg.bmp')
+        surface = pygame.Surface((40, 20))
+        surface.fill((200, 100, 50))
+        pygame.image.save(surface, image)
+
+        first = assetManager.AssetManager(cache_dir=cache_dir).image(image, (80, 40))
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        second = assetManager.AssetManager(cache_dir=cache_dir)
+        cached = second.image(image, (80, 40))
+        self.assertEqual(second.originals, {})
+        self.assertEqual(cached.get_at((5, 5)), first.get_at((5, 5)))
+
+        # a changed image gets a new cache file and the old one is deleted
+        surface.fill((10, 20, 30))
+        pygame.image.save(surface, image)
+        os.utime(image, ns=(0, os.stat(image).st_mtime_ns + 10 ** 9))
+        changed = assetManager.AssetManager(cache_dir=cache_dir).image(image, (80, 40))
+        self.assertEqual(changed.get_at((5, 5)), pygame.Color(10, 20, 30))
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+        # an image with the same name in another folder keeps its own cache file
+        os.mkdir(os.path.join(tmp.name, 'other'))
+        other = os.path.join(tmp.name, 'other', 'bg.bmp')
+        pygame.image.save(surface, other)
+        assetManager.AssetManager(cache_dir=cache_dir).image(other, (80, 40))
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+class TestFontRegistry(unittest.TestCase):
+
+    def test_get_font(self):
+        font = fontRegistry.get_font('Arial', 20)
+        self.assertIs(fontRegistry.get_font('arial', 20), font)
+        self.assertIsNot(fontRegistry.get_font('Arial', 20, bold=True), font)
+
+    def test_cleared_on_quit(self):
+        fontRegistry.get_font(None, 30)
+        pygame.quit()
+        pygame.init()
+        self.assertEqual(fontRegistry._fonts, {})
+        self.assertIsNotNone(fontRegistry.get_font(None, 30).render("x", True, (0, 0, 0)))
+
+class TestTextCache(unittest.TestCase):
+
+    def test_render(self):
+        font = fontRegistry.get_font(None, 30)
+        cache = textCache.TextCache()
+        label = cache.render(font, "Round Score:", True, (0, 0, 0))
+        self.assertIs(cache.render(font, "Round Score:", True, pygame.Color(0, 0, 0)), label)
+        self.assertIsNot(cache.render(font, "Round Score:", True, (255, 0, 0)), label)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_byte_limit(self):
+        font = fontRegistry.get_font(None, 30)
+        cache = textCache.TextCache(max_bytes=textCache.surface_bytes(font.render("00", True, (0, 0, 0))) * 2)
+        for text in ["0", "00", "000"]:
+            cache.render(font, text, True, (0, 0, 0))
+        self.assertNotIn("0", [key[0] for key in cache.surfaces])
+        self.assertIn("000", [key[0] for key in cache.surfaces])
+        self.assertLessEqual(cache.bytes, cache.max_bytes)
+
+class TestGlyphAtlas(unittest.TestCase):
+
+    def test_draw(self):
+        atlas = glyphAtlas.GlyphAtlas(fontRegistry.get_font(None, 30), (0, 0, 0))
+        target = pygame.Surface((200, 50))
+        target.fill((255, 255, 255))
+        drawn = atlas.draw(target, "9.98", (10, 5))
+        self.assertEqual(drawn, pygame.Rect(10, 5, atlas.width("9.98"), atlas.height))
+        self.assertIn(pygame.Color(0, 0, 0), [target.get_at((x, y)) for x in range(drawn.left, drawn.right)
+                                             for y in range(drawn.top, drawn.bottom)])
+
+class TestDirtyRenderer(unittest.TestCase):
+
+    def draw_frame(self, target, item, label):
+        target.fill((112, 128, 144), item)
+        target.blit(label, (item.x + 5, item.y + 5))
+        if isinstance(target, dirtyRenderer.DirtyRenderer):
+            target.rect((10, 10, 10), (80, 40, 50, 30), 2)
+        else:
+            pygame.draw.rect(target, (10, 10, 10), (80, 40, 50, 30), 2)
+
+    def test_only_changes_are_redrawn(self):
+        window = pygame.display.set_mode((200, 100))
+        background = pygame.Surface((200, 100))
+        background.fill((250, 250, 240))
+        label = textCache.render(fontRegistry.get_font(None, 20), "AND", True, (10, 10, 10))
+        screen = dirtyRenderer.DirtyRenderer(window, background)
+        item = pygame.Rect(10, 10, 40, 25)
+
+        self.draw_frame(screen, item, label)
+        self.assertEqual(screen.update(), [window.get_rect()])
+        self.draw_frame(screen, item, label)
+        self.assertEqual(screen.update(), [])
+
+        # dragging the item redraws where it was and where it is now, the same as drawing everything
+        item.move_ip(60, 20)
+        self.draw_frame(screen, item, label)
+        self.assertEqual(screen.update(), [pygame.Rect(10, 10, 40, 25), item])
+        expected = background.copy()
+        self.draw_frame(expected, item, label)
+        self.assertEqual(pygame.image.tobytes(window, 'RGB'), pygame.image.tobytes(expected, 'RGB'))
+
+class TestFrameScheduler(unittest.TestCase):
+
+    def setUp(self):
+        pygame.display.set_mode((200, 100))
+        pygame.event.clear()
+
+    def test_waits_for_input(self):
+        scheduler = frameScheduler.FrameScheduler(idle_timeout=50)
+        self.assertGreaterEqual(scheduler.tick(), 40)
+        self.assertEqual(scheduler.events(), [])
+
+        # the event that ends the wait is handed out by the next events()
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_DOWN))
+        scheduler.tick()
+        self.assertEqual([event.type for event in scheduler.events()], [pygame.KEYDOWN])
+        self.assertEqual(scheduler.events(), [])
+
+    def test_full_rate_while_dragging(self):
+        scheduler = frameScheduler.FrameScheduler(fps=1000, idle_timeout=1000)
+        with patch('pygame.mouse.get_pressed', return_value=(True, False, False)):
+            self.assertTrue(scheduler.busy())
+            scheduler.tick()
+            self.assertLess(scheduler.tick(), 100)
+
+class TestFrameProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.profiler = frameProfiler.FrameProfiler(history=4, budget=0.010, timer=lambda: self.now)
+
+    def frame(self, **phases):
+        self.profiler.begin_frame()
+        for phase, seconds in phases.items():
+            self.now += seconds
+            self.profiler.mark(phase)
+        self.profiler.end_frame()
+
+    def test_phases(self):
+        self.frame(events=0.001, logic=0.002, draw=0.003, update=0.004)
+        self.frame(draw=0.001, events=0.001, update=0.002)
+        stats = self.profiler.stats()
+        self.assertAlmostEqual(stats['events'], 0.001)
+        self.assertAlmostEqual(stats['logic'], 0.001)
+        self.assertAlmostEqual(stats['draw'], 0.002)
+        self.assertAlmostEqual(stats['update'], 0.003)
+
+    def test_percentiles_and_dropped_frames(self):
+        for seconds in (0.0025, 0.0045, 0.0205, 0.0035, 0.0125):
+            self.frame(update=seconds)
+        # only the last 4 frames are kept
+        stats = self.profiler.stats()
+        self.assertAlmostEqual(stats['p50'], 0.0125)
+        self.assertAlmostEqual(stats['p99'], 0.0205)
+        self.assertEqual(stats['dropped'], 2)
+        self.assertEqual(self.profiler.dropped, 2)
+        self.assertEqual(self.profiler.histogram(10), [0, 0, 0, 1, 1, 0, 0, 0, 0, 2])
+
+    def test_hidden(self):
+        target = dirtyRenderer.DirtyRenderer(pygame.Surface((400, 300)), pygame.Surface((400, 300)))
+        self.frame(update=0.001)
+        self.profiler.draw(target, (0, 0))
+        self.assertEqual(target.commands, [])
+        self.profiler.toggle()
+        self.profiler.draw(target, (0, 0))
+        self.assertEqual(len(target.commands), 1)
+
+class TestInputReplay(SceneTestCase):
+
+    def test_record_and_replay(self):
+        # drag the right answer of the first question into the answer box, then leave
+        bank = questionBank.get_bank()
+        options = bank.options(0)
+        width, height = headless.screen_size()
+        start_x = (width - (len(options) - 1) * 120 - len(options) * 100) // 2
+        answer = (start_x + options.index(bank.answer(0)) * 220 + 50, height - 55)
+        box = (width // 2, height // 2)
+        events = {
+            2: [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=answer, button=1)],
+            3: [pygame.event.Event(pygame.MOUSEMOTION, pos=box, rel=(0, 0), buttons=(1, 0, 0))],
+            4: [pygame.event.Event(pygame.MOUSEBUTTONUP, pos=box, button=1)],
+            8: [key_event(pygame.K_ESCAPE)],
+        }
+        with inputReplay.InputRecorder('lightningMode', (width, height)) as recorder:
+            played = headless.run_scene('lightningMode', frames=20, events=events)
+        picture = pygame.image.tobytes(played.window, 'RGB')
+        self.assertTrue(played.left)
+        self.assertIn("Question Number: 2", rendered_texts())
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, 'session.txt')
+        recorder.recording.save(path)
+        textCache.get_cache().clear()
+        replayed = inputReplay.replay(path)
+        self.assertTrue(replayed.left)
+        self.assertEqual(replayed.frame, played.frame)
+        self.assertEqual(len(replayed.frame_times), played.frame)
+        self.assertIn("Question Number: 2", rendered_texts())
+        self.assertEqual(pygame.image.tobytes(replayed.window, 'RGB'), picture)
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Text Cache for Logic Quest
+
+This module keeps the surfaces of rendered text so labels that stay the same from frame
+to frame, like "Round Score:", "ESC to quit" or the leaderboard rows, are rasterized once
+instead of on every frame. Every screen renders its text through render(), which returns
+the cached surface for the same (text, font, antialias, color, background).
+
+The cache is a least recently used list bounded by the bytes of its surfaces, and it
+counts hits and misses so its use can be checked while the game runs.
+
+Classes:
+    TextCache: An LRU cache of rendered text surfaces.
+
+Functions:
+    get_cache(): Returns the text cache shared by the whole process.
+    render(font, text, antialias, color, background): Renders text through the shared cache.
+"""
+from collections import OrderedDict
+
+import pygame
+
+# the most bytes of surfaces kept by the shared cache
+MAX_BYTES = 16 * 1024 * 1024
+
+
+def surface_bytes(surface):
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def color_key(color):
+    # pygame.Color cannot be a dictionary key, opaque ones match the usual RGB tuples
+    if isinstance(color, pygame.Color):
+        return (color.r, color.g, color.b) if color.a == 255 else tuple(color)
+    return color
+
+
+class TextCache:
+    """
+    An LRU cache of rendered text surfaces.
+
+    Attributes:
+        max_bytes (int): The most bytes of surfaces kept.
+        surfaces (OrderedDict[tuple, pygame.Surface]): The rendered text, least recently used first.
+        bytes (int): The bytes of the kept surfaces.
+        hits (int): How many renders were answered from the cache.
+        misses (int): How many renders had to rasterize the text.
+
+    Methods:
+        render(font, text, antialias, color, background): Returns the surface of a text.
+        clear(): Forgets every surface.
+    """
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.surfaces = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.surfaces.clear()
+        self.bytes = 0
+
+    def render(self, font, text, antialias, color, background=None):
+        """
+        Returns the surface of a text, rendering it with font.render() the first time.
+
+        Args:
+            font (pygame.font.Font): The font of the text.
+            text (str): The text.
+            antialias (bool): Whether the text is antialiased.
+            color: The color of the text.
+            background: The background color, or None for a transparent background.
+
+        Returns:
+            pygame.Surface: The text. It is shared, so it must not be drawn on.
+        """
+        key = (text, font, bool(antialias), color_key(color), color_key(background))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color, background)
+        size = surface_bytes(surface)
+        if size > self.max_bytes:
+            return surface
+        if not self.surfaces:
+            # surfaces and fonts must not outlive pygame, it forgets this function once called
+            pygame.register_quit(self.clear)
+        self.surfaces[key] = surface
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, old = self.surfaces.popitem(last=False)
+            self.bytes -= surface_bytes(old)
+        return surface
+
+
+_cache = None
+
+
+def get_cache():
+    """
+    Returns the text cache shared by the whole process.
+
+    Returns:
+        TextCache: The shared cache.
+    """
+    global _cache
+    if _cache is None:
+        _cache = TextCache()
+    return _cache
+
+
+def render(font, text, antialias, color, background=None):
+    """
+    Renders text through the shared cache.
+
+    Args:
+        font (pygame.font.Font): The font of the text.
+        text (str): The text.
+        antialias (bool): Whether the text is antialiased.
+        color: The color of the text.
+        background: The background color, or None for a transparent background.
+
+    Returns:
+        pygame.Surface: The text. It is shared, so it must not be drawn on.
+    """
+    return get_cache().render(font, text, antialias, color, background)
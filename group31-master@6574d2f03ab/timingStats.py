@@ -0,0 +1,27 @@
+"""
+Timing Statistics for Logic Quest
+
+This module holds the statistics shared by the tools that measure the game: the load
+test of the score server, the input replay benchmark and the frame profiler of developer
+mode. It only uses the standard library, so the game screens can import it without
+pulling in the tools.
+
+Functions:
+    percentile(values, fraction): Returns a percentile of a sorted list.
+"""
+
+
+def percentile(values, fraction):
+    """
+    Returns a percentile of a sorted list, using the nearest rank.
+
+    Args:
+        values (list[float]): The sorted values.
+        fraction (float): The percentile as a fraction, for example 0.99.
+
+    Returns:
+        float: The percentile, or 0 for an empty list.
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
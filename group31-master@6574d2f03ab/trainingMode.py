@@ -14,8 +14,14 @@ Date: 30/03/2024
 Version: 1.0
 """
 import pygame
-import sys
-import subprocess
+import sceneManager
+import questionBank
+import gameStorage
+import assetManager
+import fontRegistry
+import textCache
+import headless
+import dirtyRenderer
 
 def main():
     """
@@ -24,18 +30,17 @@ def main():
     """
     pygame.init()
 
-    screen_info = pygame.display.Info()
-    WIDTH, HEIGHT = screen_info.current_w, screen_info.current_h
+    WIDTH, HEIGHT = headless.screen_size()
 
     WIN = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
     pygame.display.set_caption("Training Mode")
 
     clock = pygame.time.Clock()
 
-    BG = pygame.transform.scale(pygame.image.load("backgrounds/bg_offwhite.jpg"),(WIDTH, HEIGHT))
-    font = pygame.font.SysFont("arial", 45)
-    mediumfont = pygame.font.SysFont("arial", 60)
-    smallfont = pygame.font.SysFont("arial", 20)
+    BG = assetManager.load_image("backgrounds/bg_offwhite.jpg", (WIDTH, HEIGHT))
+    font = fontRegistry.get_font("arial", 45)
+    mediumfont = fontRegistry.get_font("arial", 60)
+    smallfont = fontRegistry.get_font("arial", 20)
     black = (10, 10, 10)
     grey = (112, 128, 144)
     red = (255, 0, 0)
@@ -79,37 +84,19 @@ def main():
     with open('cur_username.txt', 'r') as f:
         username = f.read()
 
-    with open('questions.txt', 'r') as f:
-        questions = []
-        for line in f:
-            if '.' in line:
-                # Split line at the first dot and take the second part
-                line_text = line.split('.', 1)[1].strip()
-                questions.append(line_text)
-
-    with open('options.txt', 'r') as f:
-        raw_options = f.read().split('\n\n')
-        options = [option.strip().split('\n') for option in raw_options]
-
-    with open('answers.txt', 'r') as f:
-        answers = []
-        for line in f:
-            if '.' in line:
-                # Split line at the first dot and take the second part
-                line_text = line.split('.', 1)[1].strip()
-                answers.append(line_text)
+    bank = questionBank.get_bank()
 
     def get_question_text():
-        return mediumfont.render(questions[current_question_index], True, black)
+        return textCache.render(mediumfont, bank.question(current_question_index), True, black)
 
     def get_question_number_text():
-        return font.render(f"Question Number: {current_question_index + 1}", True, black)
+        return textCache.render(font, f"Question Number: {current_question_index + 1}", True, black)
 
     def get_current_options():
-        return options[current_question_index]
+        return bank.options(current_question_index)
 
     def get_current_answer():
-        return options[current_question_index]
+        return bank.answer(current_question_index)
 
     class Button:
         """
@@ -135,13 +122,13 @@ def main():
 
         def draw(self, win, outline=None):
             if outline:
-                pygame.draw.rect(win, outline, (self.x-2, self.y-2, self.width+4, self.height+4), 0)
+                win.fill(outline, (self.x-2, self.y-2, self.width+4, self.height+4))
 
-            pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.height), 0)
+            win.fill(self.color, (self.x, self.y, self.width, self.height))
 
             if self.text != '':
-                font = pygame.font.SysFont('Arial', 20)
-                text = font.render(self.text, 1, (0, 0, 0))
+                font = fontRegistry.get_font('Arial', 20)
+                text = textCache.render(font, self.text, 1, (0, 0, 0))
                 win.blit(text, (self.x + (self.width/2 - text.get_width()/2), self.y + (self.height/2 - text.get_height()/2)))
 
         def is_over(self, pos):
@@ -176,8 +163,8 @@ def main():
             self.sol = sol
 
         def draw(self, win):
-            pygame.draw.rect(win, grey, self.rect)
-            text_surface = self.font.render(self.text, True, black)
+            win.fill(grey, self.rect)
+            text_surface = textCache.render(self.font, self.text, True, black)
             win.blit(text_surface, (self.rect.x + 5, self.rect.y + 5))
 
 
@@ -211,12 +198,9 @@ def main():
     next_question_button = Button(grey, WIDTH - 200, HEIGHT - 60, 160, 40, 'Next Question')
 
     def create_draggable_items():
-        answer = answers[current_question_index]
+        answer = bank.answer(current_question_index)
         current_options = get_current_options()
 
-        if current_options[0].strip().endswith('.'):
-            current_options = current_options[1:]
-
         item_width = 100  # Adjust the width as needed to fit the text
         total_width = (len(current_options) - 1) * ANSWER_ITEM_SPACING + len(current_options) * item_width
         start_x = (WIDTH - total_width) // 2  # Center the options
@@ -244,29 +228,11 @@ def main():
     ]
 
 
-    def pause_game():
-        path = "pausemenu.py"
-        subprocess.run([sys.executable, path])
-        pygame.quit()
-
     def quit():
-        path = "landingPage.py"
-        subprocess.run([sys.executable,path])
-        pygame.quit()
+        sceneManager.pop_to("landingPage")
 
     def saveGame():
-        # skip line until empty line is found
-        with open('progress.txt', 'r') as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                if line == '\n':
-                    break
-        # write current users name to progress.txt
-        with open('progress.txt', 'a') as f:
-            f.write(username + '\n')
-        # write current question number to progress.txt
-        with open('progress.txt', 'a') as f:
-            f.write(str(current_question_index) + '\n')
+        gameStorage.get_storage().save_progress(username, current_question_index)
 
 
     # New Function to Draw Pause Menu
@@ -276,8 +242,8 @@ def main():
         """
         WIN.blit(BG, (0, 0))
         # draw a title on screen
-        title_font = pygame.font.SysFont('Arial', 80)
-        text = title_font.render("GAME PAUSED", True, black)
+        title_font = fontRegistry.get_font('Arial', 80)
+        text = textCache.render(title_font, "GAME PAUSED", True, black)
         WIN.blit(text, (WIDTH / 2 - text.get_width() / 2, 100))
 
         # Increased button dimensions for better visibility and interaction
@@ -296,8 +262,7 @@ def main():
         while True:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    sceneManager.quit_game()
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     text
                     if resume_button.is_over(pygame.mouse.get_pos()):
@@ -306,8 +271,8 @@ def main():
                     if save_game_button.is_over(pygame.mouse.get_pos()):
                         saveGame()
                         # Display a message that the game has been saved
-                        font = pygame.font.Font(None, 32)
-                        text = font.render('Game has been saved', True, (0, 0, 0))
+                        font = fontRegistry.get_font(None, 32)
+                        text = textCache.render(font, 'Game has been saved', True, (0, 0, 0))
                         WIN.blit(text, (WIDTH / 2 - text.get_width() / 2, HEIGHT / 2 - text.get_height() / 2 + 70))
                         pygame.display.update()
                         # remove the text after 2 seconds
@@ -324,30 +289,43 @@ def main():
             exit_button.draw(WIN)
             pygame.display.update()
 
+    # only what changed since the previous frame is drawn again and sent to the display
+    screen = dirtyRenderer.DirtyRenderer(WIN, BG)
     run = True
+    last_refresh = pygame.time.get_ticks()
     while run:
 
-        answer = answers[current_question_index]
+        # pick up questions added with addQuestion while this mode is open
+        if pygame.time.get_ticks() - last_refresh >= questionBank.REFRESH_INTERVAL:
+            last_refresh = pygame.time.get_ticks()
+            if bank.refresh() < 0:
+                # the files were rewritten and the bank got shorter
+                current_question_index = min(current_question_index, len(bank) - 1)
+                question_description_text = get_question_text()
+                question_number_text = get_question_number_text()
+                items = create_draggable_items()
 
-        WIN.blit(BG, (0, 0))
-        WIN.blit(question_number_text, (LEFT_MARGIN, TOP_MARGIN))
+        answer = bank.answer(current_question_index)
+
+        screen.blit(question_number_text, (LEFT_MARGIN, TOP_MARGIN))
         # Get the width and height of the question text
         text_width = question_description_text.get_width()
         text_height = question_description_text.get_height()
-        WIN.blit(question_description_text, ((WIDTH - text_width) // 2, (HEIGHT - text_height) // 2))
-        next_question_button.draw(WIN, black)
+        screen.blit(question_description_text, ((WIDTH - text_width) // 2, (HEIGHT - text_height) // 2))
+        next_question_button.draw(screen, black)
         # Create a Font object
-        font = pygame.font.Font(None, 32)
+        font = fontRegistry.get_font(None, 32)
         # Render the text into a Surface object
-        text = font.render('P to pause', True, (0, 0, 0))
+        text = textCache.render(font, 'P to pause', True, (0, 0, 0))
         # Get the width of the text
         text_width = text.get_width()
         # Blit the text Surface onto the window
-        WIN.blit(text, (WIDTH - text_width - 10, 10))
+        screen.blit(text, (WIDTH - text_width - 10, 10))
 
         for event in pygame.event.get():
+            screen.handle_event(event)
             if event.type == pygame.QUIT:
-                run = False
+                sceneManager.quit_game()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_p:  # Toggle pause menu
                     game_state = "paused" if game_state == "training" else "training"
@@ -359,6 +337,7 @@ def main():
                 pass
             elif game_state == "paused":
                 draw_pause_menu()
+                screen.invalidate()
                 game_state = "training"
 
 
@@ -374,7 +353,7 @@ def main():
 
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if next_question_button.is_over(pygame.mouse.get_pos()) and feedback_update:
-                    current_question_index = (current_question_index + 1) % len(questions)
+                    current_question_index = (current_question_index + 1) % len(bank)
                     question_description_text = get_question_text()
                     question_number_text = get_question_number_text()
                     items = create_draggable_items()
@@ -382,23 +361,21 @@ def main():
                     feedback_text=""
 
         for item in items:
-            item.draw(WIN)
+            item.draw(screen)
 
         for blank in blanks:
-            pygame.draw.rect(WIN, black, (SOL_BOX_X, SOL_BOX_Y, 100, 50), outline_thickness)
+            screen.rect(black, (SOL_BOX_X, SOL_BOX_Y, 100, 50), outline_thickness)
 
         if feedback_text != "":
             if feedback_update:
-                feedback_message = font.render("Correct", True,(0, 255, 0))
+                feedback_message = textCache.render(font, "Correct", True,(0, 255, 0))
             else:
-                feedback_message = font.render("Wrong", True, red)
-            WIN.blit(feedback_message, (WIDTH // 2 - feedback_message.get_width() // 2, (HEIGHT // 2) + 150))
+                feedback_message = textCache.render(font, "Wrong", True, red)
+            screen.blit(feedback_message, (WIDTH // 2 - feedback_message.get_width() // 2, (HEIGHT // 2) + 150))
 
 
-        pygame.display.update()
+        screen.update()
         clock.tick(60)
 
-    pygame.quit()
-    sys.exit()
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sceneManager.run("trainingMode")
\ No newline at end of file
@@ -12,17 +12,20 @@ Date: 30/3/2024
 Version: 1.0
 """
 import pygame
-import sys
-import subprocess
 import time
+import sceneManager
+import assetManager
+import fontRegistry
+import textCache
+import headless
+import frameScheduler
 
 
 # Initialize the Pygame
 pygame.init()
 
 # Get the screen size
-screen_info = pygame.display.Info()
-WIDTH, HEIGHT = screen_info.current_w, screen_info.current_h
+WIDTH, HEIGHT = headless.screen_size()
 
 WIN = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
 pygame.display.set_caption("Logic Quest")
@@ -33,7 +36,7 @@ BLACK = (0, 0, 0)
 LIGHT_GRAY = (200, 200, 200)
 
 # load background image
-BG = pygame.transform.scale(pygame.image.load("backgrounds/bg_offwhite.jpg"),(WIDTH, HEIGHT))
+BG = assetManager.load_image("backgrounds/bg_offwhite.jpg", (WIDTH, HEIGHT))
 
 
 class Button:
@@ -73,7 +76,7 @@ class Button:
 
 
         #text
-        self.text_surf = pygame.font.SysFont('Arial', 50).render(text, True, BLACK)
+        self.text_surf = textCache.render(fontRegistry.get_font('Arial', 50), text, True, BLACK)
         self.text_rect = self.text_surf.get_rect(center = self.top_rect.center)
 
 
@@ -111,25 +114,23 @@ class Button:
 
         if self.pressed:
             self.last_click_time = current_time
+            self.pressed = False
             if self.action:
                 self.action()
-            self.pressed = False
 
 
 def main_menu():
     """
     Navigates to the main menu of the application.
     """
-    path = "modemenu.py"
-    subprocess.run([sys.executable, path])
-    pygame.quit()
+    sceneManager.pop()
 
 
 # Define tutorial pages functions here
 
 def draw_text(text, size, position):
-    font = pygame.font.SysFont('Arial', size)
-    text_surf = font.render(text, True, BLACK)
+    font = fontRegistry.get_font('Arial', size)
+    text_surf = textCache.render(font, text, True, BLACK)
     text_rect = text_surf.get_rect(center=position)
     WIN.blit(text_surf, text_rect)
 
@@ -205,8 +206,13 @@ previous_button = Button("Previous", "#89CFF0", 150, 75, (50, HEIGHT - 100), 6,
 
 
 def main():
+    """
+    The main function of the script. Draws the current tutorial page and the navigation buttons.
+    """
     global WIN
     run = True
+    # sleeps until the next input while nothing on the screen is moving
+    scheduler = frameScheduler.FrameScheduler()
     while run:
         WIN.blit(BG, (0, 0))  # Reset background at the start of each loop iteration
 
@@ -216,10 +222,9 @@ def main():
         elif current_page == 2:
             draw_tutorial_page_2()
 
-        for event in pygame.event.get():
+        for event in scheduler.events():
             if event.type == pygame.QUIT:
-                run = False
-                break
+                sceneManager.quit_game()
             if event.type == pygame.VIDEORESIZE:
                 WIN = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
 
@@ -230,38 +235,8 @@ def main():
         if current_page > 1:
             previous_button.draw()
         pygame.display.update()
+        scheduler.tick()
 
-    pygame.quit()
-
-
-if __name__ == "__main__":
-    main()
-
-
-back_button = Button("Back", "#89CFF0", 150, 75, (50,50), 6, main_menu)
-
-def main():
-    """
-    The main function of the script. Initializes the GUI and enters the main loop.
-    """
-    global WIN
-    run = True
-    WIN.blit(BG, (0,0))
-
-    while run:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                run = False
-                break
-            if event.type == pygame.VIDEORESIZE:
-                WIN = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
-        
-        # Draw the buttons
-        back_button.draw()
-        pygame.display.update()
-
-    
-    pygame.quit()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sceneManager.run("tutorial")